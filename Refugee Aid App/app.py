@@ -1,69 +1,111 @@
 from flask import Flask, request, jsonify
-import csv
-from textblob import TextBlob
+import atexit
+import os
+import sys
+import threading
+import click
+from feedback_store import COLUMNS as FEEDBACK_COLUMNS, FeedbackStore, utc_timestamp
+from sentiment import QueueFullError, SentimentService
 
 app = Flask(__name__)
 
-# Simple sentiment analysis using TextBlob
-def analyze_sentiment(text):
-    analysis = TextBlob(text)
-    if analysis.sentiment.polarity > 0:
-        return 'Positive'
-    elif analysis.sentiment.polarity == 0:
-        return 'Neutral'
-    else:
-        return 'Negative'
-
-# CSV file to store data
-CSV_FILE = 'feedback.csv'
-
-# Ensure CSV file exists with headers
-def init_csv():
-    with open(CSV_FILE, 'a', newline='') as file:
-        writer = csv.writer(file)
-        # Write headers if file is empty
-        if file.tell() == 0:
-            writer.writerow([
-                'Name', 'Gender', 'Age', 'Feeding Feedback', 'Shelter Feedback',
-                'Personnel Feedback', 'Environment Feedback', 'Medical Feedback',
-                'Employment Status', 'Marital Status', 'Camp Location',
-                'Feeding Sentiment', 'Shelter Sentiment', 'Personnel Sentiment',
-                'Environment Sentiment', 'Medical Sentiment'
-            ])
+# Sentiment of the feedback fields is scored off the request thread, with one
+# warmed TextBlob analyzer shared by all submissions (see sentiment.py)
+sentiment_service = SentimentService()
+sentiment_service.warm_up()
+
+FEEDBACK_FIELDS = [
+    'feeding_feedback', 'shelter_feedback', 'personnel_feedback',
+    'environment_feedback', 'medical_feedback'
+]
+FORM_FIELDS = [
+    'name', 'gender', 'age', *FEEDBACK_FIELDS,
+    'employment_status', 'marital_status', 'camp_location'
+]
+
+# Submissions are stored in SQLite before they are answered; their sentiments
+# follow through one batching writer (see feedback_store.py)
+feedback_store = FeedbackStore()
+# atexit runs last-registered first: finish scoring, then write what is left
+atexit.register(feedback_store.close)
+atexit.register(sentiment_service.shutdown)
+
+SENTIMENT_FIELDS = [field.replace('_feedback', '_sentiment') for field in FEEDBACK_FIELDS]
+
+def save_sentiments(row_id, sentiments):
+    """Queues the sentiments of a stored submission for the store's writer; runs on a sentiment worker."""
+
+    feedback_store.set_sentiments(row_id, dict(zip(SENTIMENT_FIELDS, sentiments)))
+
+# Unscored rows younger than this may still be on another worker's sentiment pool
+FEEDBACK_RESCORE_AFTER_SECONDS = float(os.getenv('FEEDBACK_RESCORE_AFTER_SECONDS', '300'))
+
+def score_unscored():
+    # Submissions stored before a crash or restart, whose scoring never finished.
+    # Workers starting together may score the same rows; the result is the same either way
+    for row_id, texts in feedback_store.unscored(FEEDBACK_FIELDS, older_than=FEEDBACK_RESCORE_AFTER_SECONDS):
+        save_sentiments(row_id, sentiment_service.score([text or '' for text in texts]))
+
+threading.Thread(target=score_unscored, name='feedback-rescore', daemon=True).start()
+
+@app.cli.command('export-csv')
+@click.argument('path', default='feedback_export.csv')
+def export_csv(path):
+    """Write all stored feedback to PATH in the feedback.csv layout."""
+    count = feedback_store.export_csv(path)
+    click.echo(f'Exported {count} rows to {path}')
+
+@app.cli.command('export-parquet')
+@click.argument('path', default='feedback_parquet')
+def export_parquet(path):
+    """Write all stored feedback to PATH as a Parquet dataset partitioned by camp and month."""
+    # storage.py is shared with the analysis scripts at the repository root
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import pandas as pd
+    from storage import write_table
+
+    feedback = pd.DataFrame(feedback_store.query(), columns=list(FEEDBACK_COLUMNS))
+    # Timestamps are stored as UTC ISO strings; the dataset keeps them as naive UTC
+    feedback['submitted_at'] = pd.to_datetime(feedback['submitted_at'], utc=True).dt.tz_localize(None)
+    write_table(
+        feedback, path, camp_column='camp_location', date_column='submitted_at',
+        categorical=['gender', 'employment_status', 'marital_status', 'camp_location', *SENTIMENT_FIELDS]
+    )
+    click.echo(f'Exported {len(feedback)} rows to {path}')
+
+@app.cli.command('import-csv')
+@click.argument('path', default='feedback.csv')
+def import_csv(path):
+    """Load feedback rows from a CSV written by the old app."""
+    count = feedback_store.import_csv(path)
+    click.echo(f'Imported {count} rows from {path}')
 
 @app.route('/submit', methods=['POST'])
 def submit_feedback():
-    init_csv()
-    data = {
-        'name': request.form['name'],
-        'gender': request.form['gender'],
-        'age': request.form['age'],
-        'feeding_feedback': request.form['feeding_feedback'],
-        'shelter_feedback': request.form['shelter_feedback'],
-        'personnel_feedback': request.form['personnel_feedback'],
-        'environment_feedback': request.form['environment_feedback'],
-        'medical_feedback': request.form['medical_feedback'],
-        'employment_status': request.form['employment_status'],
-        'marital_status': request.form['marital_status'],
-        'camp_location': request.form['camp_location'],
-        'feeding_sentiment': analyze_sentiment(request.form['feeding_feedback']),
-        'shelter_sentiment': analyze_sentiment(request.form['shelter_feedback']),
-        'personnel_sentiment': analyze_sentiment(request.form['personnel_feedback']),
-        'environment_sentiment': analyze_sentiment(request.form['environment_feedback']),
-        'medical_sentiment': analyze_sentiment(request.form['medical_feedback'])
-    }
-    
-    with open(CSV_FILE, 'a', newline='') as file:
-        writer = csv.writer(file)
-        writer.writerow([
-            data['name'], data['gender'], data['age'], data['feeding_feedback'],
-            data['shelter_feedback'], data['personnel_feedback'], data['environment_feedback'],
-            data['medical_feedback'], data['employment_status'], data['marital_status'],
-            data['camp_location'], data['feeding_sentiment'], data['shelter_sentiment'],
-            data['personnel_sentiment'], data['environment_sentiment'], data['medical_sentiment']
-        ])
-
-    return jsonify({'message': 'Feedback submitted successfully!'})
+    missing = [field for field in FORM_FIELDS if not request.form.get(field, '').strip()]
+    if missing:
+        return jsonify({'message': f"Missing fields: {', '.join(missing)}"}), 400
+    if not request.form['age'].strip().isdigit():
+        return jsonify({'message': 'Age must be a whole number'}), 400
+
+    data = {field: request.form[field] for field in FORM_FIELDS}
+    data['submitted_at'] = utc_timestamp()
+    # Committed (with any other submissions queued meanwhile) before answering;
+    # the sentiments are filled in once scored
+    row_id = feedback_store.add(data)
+    try:
+        # All five fields are scored together on the pool
+        sentiment_service.enqueue(
+            [data[field] for field in FEEDBACK_FIELDS],
+            lambda sentiments: save_sentiments(row_id, sentiments)
+        )
+    except QueueFullError as err:
+        # The client is told to retry, so the row must not stay behind as well
+        feedback_store.delete(row_id)
+        return jsonify({'message': str(err)}), 503, {'Retry-After': '1'}
+
+    return jsonify({'message': 'Feedback submitted successfully!'}), 202
+
 
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    app.run(debug=True)
@@ -0,0 +1,265 @@
+# feedback_store.py
+
+# Feedback submissions in SQLite (WAL mode) instead of appending to
+# feedback.csv on every request. All writes go through one writer thread per
+# process, which commits whatever has queued up in a single transaction (group
+# commit): add() queues a submission, with its sentiment columns still NULL,
+# and returns once the transaction holding it is on disk, so a crash can't
+# lose feedback that was already accepted, and a burst of submissions costs
+# one fsync. The sentiments are filled in later through the same writer; rows
+# a crash left unscored are found again with unscored(). WAL lets readers and
+# the writers of other gunicorn workers carry on meanwhile, and SQLite's
+# locking keeps rows from interleaving. Reporting queries by camp and time use
+# the indexes on camp_location and submitted_at. `flask export-csv` writes the
+# old CSV layout.
+
+import csv
+import os
+import queue
+import sqlite3
+import threading
+from collections import namedtuple
+from concurrent.futures import Future
+from datetime import datetime, timedelta, timezone
+
+FEEDBACK_DB_PATH = os.getenv('FEEDBACK_DB_PATH', 'feedback.db')
+FEEDBACK_BATCH_SIZE = int(os.getenv('FEEDBACK_BATCH_SIZE', '100'))
+FEEDBACK_FLUSH_SECONDS = float(os.getenv('FEEDBACK_FLUSH_SECONDS', '0.2'))
+
+# Column name -> header used in feedback.csv, in the CSV's order
+COLUMNS = {
+    'name': 'Name',
+    'gender': 'Gender',
+    'age': 'Age',
+    'feeding_feedback': 'Feeding Feedback',
+    'shelter_feedback': 'Shelter Feedback',
+    'personnel_feedback': 'Personnel Feedback',
+    'environment_feedback': 'Environment Feedback',
+    'medical_feedback': 'Medical Feedback',
+    'employment_status': 'Employment Status',
+    'marital_status': 'Marital Status',
+    'camp_location': 'Camp Location',
+    'feeding_sentiment': 'Feeding Sentiment',
+    'shelter_sentiment': 'Shelter Sentiment',
+    'personnel_sentiment': 'Personnel Sentiment',
+    'environment_sentiment': 'Environment Sentiment',
+    'medical_sentiment': 'Medical Sentiment',
+    'submitted_at': 'Submitted At',
+}
+
+SENTIMENT_COLUMNS = [column for column in COLUMNS if column.endswith('_sentiment')]
+
+_STOP = object()
+
+# Writer queue items; the future of an insert gets the row id once committed
+_Insert = namedtuple('_Insert', ['row', 'future'])
+_Update = namedtuple('_Update', ['row_id', 'sentiments'])
+
+
+def utc_timestamp(moment=None):
+    return (moment or datetime.now(timezone.utc)).isoformat(timespec='seconds')
+
+
+class FeedbackStore:
+    """Group-committed writes through one writer thread; reads on the calling thread."""
+
+    def __init__(self, path=FEEDBACK_DB_PATH, batch_size=FEEDBACK_BATCH_SIZE, flush_seconds=FEEDBACK_FLUSH_SECONDS):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._queue = queue.Queue()
+        self._local = threading.local()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+        with self._connection() as conn:
+            conn.executescript('''
+                CREATE TABLE IF NOT EXISTS feedback (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT,
+                    gender TEXT,
+                    age INTEGER,
+                    feeding_feedback TEXT,
+                    shelter_feedback TEXT,
+                    personnel_feedback TEXT,
+                    environment_feedback TEXT,
+                    medical_feedback TEXT,
+                    employment_status TEXT,
+                    marital_status TEXT,
+                    camp_location TEXT,
+                    feeding_sentiment TEXT,
+                    shelter_sentiment TEXT,
+                    personnel_sentiment TEXT,
+                    environment_sentiment TEXT,
+                    medical_sentiment TEXT,
+                    submitted_at TEXT
+                );
+                CREATE INDEX IF NOT EXISTS feedback_camp_time ON feedback (camp_location, submitted_at);
+                CREATE INDEX IF NOT EXISTS feedback_time ON feedback (submitted_at);
+            ''')
+
+    def _connection(self):
+        # sqlite3 connections can't be shared between threads, so keep one per thread
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            # A submission is on disk, not just in the OS cache, once add() returns;
+            # group commit keeps that to one fsync per batch
+            conn.execute('PRAGMA synchronous=FULL')
+            self._local.conn = conn
+        return conn
+
+    def add(self, row):
+        """Stores one submission (a dict keyed by COLUMNS) through the writer thread and
+        returns its id once the transaction holding it has committed."""
+
+        row = {column: row.get(column) for column in COLUMNS}
+        row['submitted_at'] = row['submitted_at'] or utc_timestamp()
+        future = Future()
+        self._ensure_writer()
+        self._queue.put(_Insert(row, future))
+        return future.result()
+
+    def delete(self, row_id):
+        with self._connection() as conn:
+            conn.execute('DELETE FROM feedback WHERE id = ?', (row_id,))
+
+    def set_sentiments(self, row_id, sentiments):
+        """Queues the sentiment columns (a dict keyed by SENTIMENT_COLUMNS) of a stored
+        row for the writer thread."""
+
+        self._ensure_writer()
+        self._queue.put(_Update(row_id, [sentiments.get(column) for column in SENTIMENT_COLUMNS]))
+
+    def unscored(self, columns, older_than=0):
+        """(id, [values of columns]) for every row submitted at least older_than seconds
+        ago whose sentiments were never filled in."""
+
+        missing = ' AND '.join(f'{column} IS NULL' for column in SENTIMENT_COLUMNS)
+        cutoff = utc_timestamp(datetime.now(timezone.utc) - timedelta(seconds=older_than))
+        cursor = self._connection().execute(
+            f"SELECT id, {', '.join(columns)} FROM feedback WHERE {missing} AND submitted_at <= ? ORDER BY id",
+            (cutoff,),
+        )
+        return [(row_id, list(values)) for row_id, *values in cursor]
+
+    def _ensure_writer(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._start_lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._write_loop, name='feedback-writer', daemon=True)
+                    self._thread.start()
+
+    def _write_loop(self):
+        stop = False
+        while not stop:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                # Submitters block until the commit, so while one waits only what
+                # is already queued joins the transaction; sentiment updates on
+                # their own wait up to flush_seconds for more
+                inserting = any(isinstance(item, _Insert) for item in batch)
+                try:
+                    timeout = 0 if inserting else self.flush_seconds
+                    batch.append(self._queue.get(timeout=timeout) if timeout else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            inserts = [item for item in batch if isinstance(item, _Insert)]
+            updates = [item for item in batch if isinstance(item, _Update)]
+            stop = any(item is _STOP for item in batch)
+            try:
+                row_ids = self._commit(inserts, updates)
+            except Exception as e:
+                print(f'Error saving {len(inserts)} feedback rows and {len(updates)} sentiments: {e}')
+                for insert in inserts:
+                    insert.future.set_exception(e)
+            else:
+                for insert, row_id in zip(inserts, row_ids):
+                    insert.future.set_result(row_id)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _commit(self, inserts, updates):
+        columns = list(COLUMNS)
+        with self._connection() as conn:
+            row_ids = [
+                conn.execute(
+                    f"INSERT INTO feedback ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+                    [insert.row[column] for column in columns],
+                ).lastrowid
+                for insert in inserts
+            ]
+            conn.executemany(
+                f"UPDATE feedback SET {', '.join(f'{column} = ?' for column in SENTIMENT_COLUMNS)} WHERE id = ?",
+                [[*update.sentiments, update.row_id] for update in updates],
+            )
+        return row_ids
+
+    def insert_many(self, rows):
+        columns = list(COLUMNS)
+        with self._connection() as conn:
+            conn.executemany(
+                f"INSERT INTO feedback ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+                [[row.get(column) for column in columns] for row in rows],
+            )
+
+    def flush(self):
+        """Blocks until every queued write has been committed."""
+
+        self._queue.join()
+
+    def close(self):
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def query(self, camp_location=None, since=None, until=None, columns=None):
+        """Rows as dicts, optionally for one camp and a submitted_at range (ISO timestamps)."""
+
+        columns = list(columns or COLUMNS)
+        unknown = set(columns) - set(COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown feedback columns: {', '.join(sorted(unknown))}")
+        clauses, params = [], []
+        if camp_location is not None:
+            clauses.append('camp_location = ?')
+            params.append(camp_location)
+        if since is not None:
+            clauses.append('submitted_at >= ?')
+            params.append(since)
+        if until is not None:
+            clauses.append('submitted_at < ?')
+            params.append(until)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ''
+        cursor = self._connection().execute(
+            f"SELECT {', '.join(columns)} FROM feedback{where} ORDER BY id", params
+        )
+        return [dict(zip(columns, values)) for values in cursor]
+
+    def export_csv(self, path):
+        """Writes every row in the feedback.csv layout; returns the number of rows."""
+
+        columns = list(COLUMNS)
+        count = 0
+        with open(path, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(COLUMNS.values())
+            for values in self._connection().execute(f"SELECT {', '.join(columns)} FROM feedback ORDER BY id"):
+                writer.writerow(['' if value is None else value for value in values])
+                count += 1
+        return count
+
+    def import_csv(self, path):
+        """Loads rows from a feedback.csv file written by the old app; returns the number of rows."""
+
+        headers = {header: column for column, header in COLUMNS.items()}
+        with open(path, newline='') as file:
+            rows = [
+                {headers[header]: value or None for header, value in record.items() if header in headers}
+                for record in csv.DictReader(file)
+            ]
+        if rows:
+            self.insert_many(rows)
+        return len(rows)
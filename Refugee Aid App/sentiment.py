@@ -0,0 +1,94 @@
+# sentiment.py
+
+# Sentiment scoring for feedback submissions. TextBlob(text).sentiment builds
+# a blob and runs its default PatternAnalyzer on the raw text; this service
+# calls one PatternAnalyzer directly, warmed up once so its lexicon is loaded
+# before the first request, and memoizes polarities, since camp feedback
+# repeats a lot ("no food", "okay"). All fields of a submission are scored in
+# one call on a worker pool, so the request thread only validates and enqueues.
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from textblob.sentiments import PatternAnalyzer
+
+SENTIMENT_WORKERS = int(os.getenv('SENTIMENT_WORKERS', '2'))
+SENTIMENT_QUEUE_MAX = int(os.getenv('SENTIMENT_QUEUE_MAX', '256'))
+SENTIMENT_CACHE_SIZE = int(os.getenv('SENTIMENT_CACHE_SIZE', '4096'))
+
+
+class QueueFullError(RuntimeError):
+    """Raised when the service already holds its maximum number of pending submissions."""
+
+
+def sentiment_label(polarity):
+    if polarity > 0:
+        return 'Positive'
+    elif polarity == 0:
+        return 'Neutral'
+    else:
+        return 'Negative'
+
+
+class SentimentService:
+    """Scores batches of texts with one shared analyzer on a bounded worker pool."""
+
+    def __init__(self, workers=SENTIMENT_WORKERS, max_pending=SENTIMENT_QUEUE_MAX, cache_size=SENTIMENT_CACHE_SIZE):
+        self.analyzer = PatternAnalyzer()
+        self.max_pending = max_pending
+        self.polarity = lru_cache(maxsize=cache_size)(self._polarity)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='sentiment')
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def _polarity(self, text):
+        return self.analyzer.analyze(text).polarity
+
+    def warm_up(self):
+        # The first analysis loads the pattern lexicon; do it before workers race for it
+        self.polarity('warm up')
+
+    def score(self, texts):
+        """Sentiment labels for a list of texts, in order. Each distinct text is analyzed once."""
+
+        labels = {}
+        for text in texts:
+            text = text.strip()
+            if text not in labels:
+                labels[text] = sentiment_label(self.polarity(text))
+        return [labels[text.strip()] for text in texts]
+
+    def enqueue(self, texts, on_scored):
+        """Scores `texts` on the pool, then calls on_scored(labels) there. Raises
+        QueueFullError straight away when max_pending submissions are waiting."""
+
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise QueueFullError(f'The sentiment queue is full ({self.max_pending} pending submissions)')
+            self._pending += 1
+        try:
+            future = self.executor.submit(self._run, list(texts), on_scored)
+        except RuntimeError:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def _run(self, texts, on_scored):
+        try:
+            on_scored(self.score(texts))
+        except Exception as e:
+            print(f'Error processing feedback: {e}')
+            raise
+
+    def _release(self, *_):
+        with self._lock:
+            self._pending -= 1
+
+    def stats(self):
+        return {'pending': self._pending, 'max_pending': self.max_pending, **self.polarity.cache_info()._asdict()}
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
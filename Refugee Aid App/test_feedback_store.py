@@ -0,0 +1,105 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from feedback_store import SENTIMENT_COLUMNS, FeedbackStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = FeedbackStore(str(tmp_path / 'feedback.db'))
+    yield store
+    store.close()
+
+
+def submission(name, camp='Camp A', submitted_at='2024-05-01T10:00:00+00:00'):
+    return {'name': name, 'age': 30, 'feeding_feedback': 'not enough food', 'camp_location': camp,
+            'submitted_at': submitted_at}
+
+
+def test_add_returns_once_the_row_is_committed(store):
+    row_id = store.add(submission('Amina'))
+
+    # Another connection, as a crashed and restarted process would use, sees it straight away
+    with sqlite3.connect(store.path) as conn:
+        name, sentiment = conn.execute(
+            'SELECT name, feeding_sentiment FROM feedback WHERE id = ?', (row_id,)
+        ).fetchone()
+    assert (name, sentiment) == ('Amina', None)
+
+
+def test_submissions_queued_during_a_commit_share_the_next_one(store, monkeypatch):
+    commits = []
+    commit = store._commit
+    queued = threading.Event()
+
+    def slow_commit(inserts, updates):
+        # The first commit is held until the other submissions are waiting behind it
+        if not commits:
+            assert queued.wait(5)
+        commits.append(len(inserts))
+        return commit(inserts, updates)
+
+    monkeypatch.setattr(store, '_commit', slow_commit)
+    ids = []
+    threads = [threading.Thread(target=lambda i=i: ids.append(store.add(submission(f'person {i}'))))
+               for i in range(20)]
+    threads[0].start()
+    while store._queue.unfinished_tasks == 0:
+        time.sleep(0.001)
+    for thread in threads[1:]:
+        thread.start()
+    while store._queue.qsize() < 19:
+        time.sleep(0.001)
+    queued.set()
+    for thread in threads:
+        thread.join()
+
+    assert commits == [1, 19]
+    assert sorted(ids) == list(range(1, 21))
+    assert len(store.query()) == 20
+
+
+def test_sentiments_fill_in_the_stored_row(store):
+    row_id = store.add(submission('Amina'))
+    assert [row_id for row_id, _ in store.unscored(['feeding_feedback'])] == [row_id]
+
+    store.set_sentiments(row_id, {column: 'Negative' for column in SENTIMENT_COLUMNS})
+    store.flush()
+
+    assert store.unscored(['feeding_feedback']) == []
+    assert store.query(columns=['feeding_sentiment', 'medical_sentiment']) == [
+        {'feeding_sentiment': 'Negative', 'medical_sentiment': 'Negative'}
+    ]
+
+
+def test_unscored_skips_recent_rows(store):
+    old_id = store.add(submission('Old', submitted_at='2024-05-01T10:00:00+00:00'))
+    store.add(submission('New', submitted_at=None))
+
+    assert [row_id for row_id, _ in store.unscored(['name'], older_than=300)] == [old_id]
+    assert len(store.unscored(['name'])) == 2
+
+
+def test_query_filters_by_camp_and_time(store):
+    store.add(submission('a', camp='Camp A', submitted_at='2024-05-01T10:00:00+00:00'))
+    store.add(submission('b', camp='Camp B', submitted_at='2024-05-02T10:00:00+00:00'))
+    store.add(submission('c', camp='Camp A', submitted_at='2024-06-01T10:00:00+00:00'))
+
+    rows = store.query(camp_location='Camp A', since='2024-05-01', until='2024-06-01', columns=['name'])
+    assert rows == [{'name': 'a'}]
+    with pytest.raises(ValueError):
+        store.query(columns=['password'])
+
+
+def test_csv_round_trip(store, tmp_path):
+    store.add(submission('Amina'))
+    store.add(submission('Omar', camp='Camp B'))
+    path = str(tmp_path / 'feedback.csv')
+    assert store.export_csv(path) == 2
+
+    copy = FeedbackStore(str(tmp_path / 'copy.db'))
+    assert copy.import_csv(path) == 2
+    assert copy.query(columns=['name', 'camp_location']) == store.query(columns=['name', 'camp_location'])
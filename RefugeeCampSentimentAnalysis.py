@@ -9,6 +9,7 @@ import nltk
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.naive_bayes import MultinomialNB
 from sklearn.pipeline import make_pipeline
+from storage import write_table
 
 # Download required NLTK data
 nltk.download('vader_lexicon')
@@ -136,6 +137,10 @@ def train_category_classifier(feedback_df):
     model.fit(X, y)
     return model
 
+# Columns of the routing results, so the frame keeps them even when no feedback is negative
+ROUTING_COLUMNS = ['Feedback ID', 'Camp ID', 'Survey Location', 'Category', 'Feedback Text',
+                   'Sentiment', 'Priority', 'NGOs Notified']
+
 # Function to route feedback to NGOs
 def route_feedback_to_ngos(feedback_df, ngo_data):
     # Placeholder NGO data based on surveylocation countries
@@ -172,7 +177,7 @@ def route_feedback_to_ngos(feedback_df, ngo_data):
             'NGOs Notified': relevant_ngos
         })
     
-    return pd.DataFrame(routing_results)
+    return pd.DataFrame(routing_results, columns=ROUTING_COLUMNS)
 
 # Simulate feedback data
 np.random.seed(42)
@@ -184,9 +189,21 @@ category_model = train_category_classifier(feedback_df)
 # Route negative feedback to NGOs
 routing_df = route_feedback_to_ngos(feedback_df, None)
 
-# Save results
-feedback_df.to_csv('simulated_feedback_data_enhanced.csv', index=False)
-routing_df.to_csv('feedback_routing_results_enhanced.csv', index=False)
+# Save results as Parquet datasets partitioned by camp (and month), see storage.py;
+# read them back with storage.read_table(path, columns=..., camps=...)
+write_table(
+    feedback_df, 'simulated_feedback_data_enhanced', camp_column='Camp ID', date_column='Timestamp',
+    categorical=['Camp ID', 'Survey Location', 'Country', 'Nationality', 'Category', 'Gender',
+                 'Relationship', 'Sentiment', 'Priority']
+)
+# An empty dataset has no files to read the schema back from, so there is nothing to write
+if routing_df.empty:
+    print("No negative feedback to route; skipping feedback_routing_results_enhanced")
+else:
+    write_table(
+        routing_df, 'feedback_routing_results_enhanced', camp_column='Camp ID',
+        categorical=['Camp ID', 'Survey Location', 'Category', 'Sentiment', 'Priority']
+    )
 
 # Example output
 print("Sample Feedback Data:")
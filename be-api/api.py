@@ -1,9 +1,24 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from starlette.concurrency import iterate_in_threadpool
 from pydantic import BaseModel
+from typing import List, Optional
+import asyncio
+import json
+import queue
+import threading
+import time
 from api.knowledge_base import faq_data
-from api.app import generate_response  # We'll need to adapt our chatbot logic for API use
-from api.reddit import bot
+from api.app import generate_response, generate_responses, generation_batcher, preprocess, prepare_stream, finish_stream, knowledge_base_watcher, cache_stats, response_pipeline  # We'll need to adapt our chatbot logic for API use
+from api.general_config import CHAT_BATCH_MAX_SIZE, MODEL_WARMUP, GENERATION_BATCHING, GENERATION_BUDGET_SECONDS, FAQ_RELOAD_INTERVAL, PROFILER_ENABLED
+from api.model_loader import model_loader
+from api.workers import QueueFullError, chat_pool, nlp_pool, stream_pool, worker_stats
+from api.metrics import registry, request_seconds, stage_seconds, stream_ttfb_seconds, timed
+from api.profiler import profiler
+from api.pipeline import PipelineResult, TIER_GENERATIVE
+from api.reddit.dispatcher import reddit_dispatcher
+from api.reddit.dm_sender import dm_sender
 
 app = FastAPI()
 
@@ -21,8 +36,65 @@ app.add_middleware(
     allow_headers=["*"],  # Allows all headers
 )
 
+@app.on_event("startup")
+def warm_up_model():
+    # FAQ traffic is served right away, the model loads behind it if requested
+    if MODEL_WARMUP:
+        model_loader.warm_up_in_background()
+
+@app.on_event("startup")
+async def start_generation_batcher():
+    if GENERATION_BATCHING:
+        await generation_batcher.start()
+
+@app.on_event("startup")
+def watch_knowledge_base():
+    # Edits to the FAQ file are picked up without a restart
+    if FAQ_RELOAD_INTERVAL > 0:
+        knowledge_base_watcher.start()
+
+@app.on_event("startup")
+def start_reddit_dispatcher():
+    reddit_dispatcher.start()
+    # Also resumes DMs left unsent by the previous process
+    dm_sender.start()
+
+@app.on_event("shutdown")
+def stop_reddit_dispatcher():
+    reddit_dispatcher.stop()
+    dm_sender.stop()
+
+@app.on_event("shutdown")
+def stop_knowledge_base_watcher():
+    knowledge_base_watcher.stop()
+
+@app.on_event("shutdown")
+async def stop_generation_batcher():
+    await generation_batcher.stop()
+
+@app.on_event("shutdown")
+def stop_worker_pools():
+    chat_pool.shutdown()
+    if nlp_pool is not None:
+        nlp_pool.shutdown()
+
+@app.middleware("http")
+async def time_chat_requests(request: Request, call_next):
+    # For /chat/stream this ends when the stream starts; see chat_stream_ttfb_seconds
+    started = time.perf_counter()
+    response = await call_next(request)
+    if request.url.path.startswith("/chat"):
+        request_seconds.observe(time.perf_counter() - started, request.url.path)
+    return response
+
+def queue_full(err):
+    return HTTPException(status_code=503, detail=str(err), headers={"Retry-After": "1"})
+
+
 class ChatRequest(BaseModel):
     message: str
+    engine: Optional[str] = None  # "overlap", "bm25" or "embedding", defaults to FAQ_ENGINE
+    session_id: Optional[str] = None  # keeps conversation history for generated replies
 
 class ChatResponse(BaseModel):
     response: str
@@ -30,8 +102,236 @@ class ChatResponse(BaseModel):
 @app.post("/chat")
 async def chat(request: ChatRequest):
     user_message = request.message
-    chatbot_response = generate_response(user_message, faq_data) ## faq_data for nltk
-    return ChatResponse(response=chatbot_response)
+    try:
+        # CPU-bound work runs on the bounded pools so the event loop (and the
+        # generation batcher on it) stays responsive; full pools answer 503
+        processed_message = None
+        if nlp_pool:
+            # Includes the hop to the process pool and back
+            with timed("preprocess"):
+                processed_message = await nlp_pool.run(preprocess, user_message.strip())
+        chatbot_response = await chat_pool.run(
+            profiler.profile, generate_response, user_message, faq_data,
+            engine=request.engine, session_id=request.session_id, processed_message=processed_message,
+        ) ## faq_data for nltk
+    except QueueFullError as err:
+        raise queue_full(err)
+    except ValueError as err:
+        raise HTTPException(status_code=400, detail=str(err))
+
+    with timed("serialization"):
+        body = ChatResponse(response=chatbot_response).model_dump_json()
+    return Response(content=body, media_type="application/json")
+
+
+def sse(data, event=None):
+    """One Server-Sent Events message."""
+    message = f"event: {event}\n" if event else ""
+    return message + f"data: {json.dumps(data)}\n\n"
+
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest, http_request: Request):
+    """Streams the reply as Server-Sent Events: one {"token": ...} message per piece
+    of text, then a "done" event with the tier and the time to first byte."""
+
+    started = time.perf_counter()
+    stop_event = threading.Event()
+    try:
+        result, fallback, prompt = await chat_pool.run(
+            prepare_stream, request.message, faq_data, engine=request.engine, session_id=request.session_id
+        )
+    except QueueFullError as err:
+        raise queue_full(err)
+    except ValueError as err:
+        raise HTTPException(status_code=400, detail=str(err))
+
+    streamer, budget_exceeded, failed = None, False, False
+    if not result:
+        # The whole reply, including loading the model and encoding the prompt,
+        # has to fit in the budget. A load that runs past it carries on in the
+        # background for later requests
+        deadline = started + GENERATION_BUDGET_SECONDS
+        starting = asyncio.ensure_future(chat_pool.run(
+            model_loader.stream_reply, prompt, stop_event, submit=stream_pool.submit, deadline=deadline,
+        ))
+        starting.add_done_callback(lambda task: task.cancelled() or task.exception())
+        try:
+            streamer = await asyncio.wait_for(asyncio.shield(starting), max(deadline - time.perf_counter(), 0))
+        except QueueFullError as err:
+            raise queue_full(err)
+        except asyncio.TimeoutError:
+            # Generation that starts after all stops at its first step
+            stop_event.set()
+            budget_exceeded = True
+        except Exception as e:
+            print(f"Generation failed, falling back to the deterministic answer: {e}")
+            failed = True
+
+    def elapsed_ms():
+        return round((time.perf_counter() - started) * 1000, 1)
+
+    async def events():
+        nonlocal budget_exceeded, failed
+        if result:
+            ttfb = elapsed_ms()
+            stream_ttfb_seconds.observe(ttfb / 1000)
+            yield sse({"token": result.response})
+            yield sse({"tier": result.tier, "ttfb_ms": ttfb}, event="done")
+            return
+
+        chunks, ttfb = [], None
+        if streamer is not None:
+            generation_started = time.perf_counter()
+            try:
+                async for chunk in iterate_in_threadpool(streamer):
+                    if await http_request.is_disconnected():
+                        return
+                    if not chunk:
+                        continue
+                    if ttfb is None:
+                        ttfb = elapsed_ms()
+                    chunks.append(chunk)
+                    yield sse({"token": chunk})
+            except queue.Empty:
+                # The budget ran out; what was already sent stays as the reply
+                budget_exceeded = True
+            except Exception as e:
+                print(f"Streamed generation failed: {e}")
+                failed = True
+            finally:
+                # Covers disconnects too: the generation thread stops at its next step
+                stop_event.set()
+                stage_seconds.observe(time.perf_counter() - generation_started, "generation")
+
+        if chunks:
+            streamed = PipelineResult("".join(chunks), TIER_GENERATIVE, fallback.match, budget_exceeded)
+        else:
+            streamed = fallback._replace(budget_exceeded=budget_exceeded)
+            ttfb = elapsed_ms()
+            yield sse({"token": streamed.response})
+
+        stream_ttfb_seconds.observe(ttfb / 1000)
+        # Counted like /chat: a failed generation is an error, not a budget overrun
+        finish_stream(request.message, streamed, request.session_id, error=failed)
+        yield sse({"tier": streamed.tier, "ttfb_ms": ttfb}, event="done")
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+class ChatBatchRequest(BaseModel):
+    messages: List[str]
+    engine: Optional[str] = None
+
+class ChatBatchItem(BaseModel):
+    response: str
+    score: float = 0
+    matched_key: Optional[str] = None
+
+class ChatBatchResponse(BaseModel):
+    responses: List[ChatBatchItem]
+
+@app.post("/chat/batch")
+async def chat_batch(request: ChatBatchRequest):
+    if len(request.messages) > CHAT_BATCH_MAX_SIZE:
+        raise HTTPException(status_code=413, detail=f"A batch can hold at most {CHAT_BATCH_MAX_SIZE} messages")
+
+    try:
+        results = await chat_pool.run(
+            profiler.profile, generate_responses, request.messages, faq_data, engine=request.engine
+        )
+    except QueueFullError as err:
+        raise queue_full(err)
+    except ValueError as err:
+        raise HTTPException(status_code=400, detail=str(err))
+
+    with timed("serialization"):
+        body = ChatBatchResponse(responses=[
+            ChatBatchItem(response=response, score=match.score, matched_key=match.key) if match
+            else ChatBatchItem(response=response)
+            for response, match in results
+        ]).model_dump_json()
+    return Response(content=body, media_type="application/json")
+
+
+def cache_samples():
+    caches = cache_stats()
+    stemmers = caches.pop("stemmers")
+    caches.update({f"stem_{code}": info for code, info in stemmers.items() if info})
+    caches["prompt_prefix"] = model_loader.prefix_cache.stats()
+    return caches
+
+def ratio(hits, misses):
+    return hits / (hits + misses) if hits + misses else 0.0
+
+# Read from the counters the modules already keep, once per scrape
+registry.collector(
+    "chat_cache_hits_total", "counter", "Cache hits per cache.",
+    lambda: [({"cache": name}, info["hits"]) for name, info in cache_samples().items()],
+)
+registry.collector(
+    "chat_cache_misses_total", "counter", "Cache misses per cache.",
+    lambda: [({"cache": name}, info["misses"]) for name, info in cache_samples().items()],
+)
+registry.collector(
+    "chat_cache_hit_ratio", "gauge", "Share of cache lookups that hit, since startup.",
+    lambda: [({"cache": name}, ratio(info["hits"], info["misses"])) for name, info in cache_samples().items()],
+)
+registry.collector(
+    "chat_queue_depth", "gauge", "Jobs queued or running per worker pool.",
+    lambda: [({"pool": pool}, stats["depth"]) for pool, stats in worker_stats().items()],
+)
+registry.collector(
+    "chat_queue_capacity", "gauge", "Maximum pending jobs per worker pool.",
+    lambda: [({"pool": pool}, stats["max_pending"]) for pool, stats in worker_stats().items()],
+)
+registry.collector(
+    "chat_queue_rejected_total", "counter", "Requests refused with 503 because a pool was full.",
+    lambda: [({"pool": pool}, stats["rejected"]) for pool, stats in worker_stats().items()],
+)
+registry.collector(
+    "chat_tier_responses_total", "counter", "Replies per pipeline tier that answered.",
+    lambda: [({"tier": tier}, count) for tier, count in response_pipeline.tier_stats().items()
+             if tier not in ("budget_exceeded", "generation_errors")],
+)
+registry.collector(
+    "chat_generation_budget_exceeded_total", "counter", "Generations that ran out of time budget.",
+    lambda: [({}, response_pipeline.tier_stats()["budget_exceeded"])],
+)
+registry.collector(
+    "chat_generation_errors_total", "counter", "Generations that failed and fell back to a deterministic answer.",
+    lambda: [({}, response_pipeline.tier_stats()["generation_errors"])],
+)
+registry.collector(
+    "reddit_queue_depth", "gauge", "Aid request jobs waiting for the Reddit dispatcher.",
+    lambda: [({}, reddit_dispatcher.depth)],
+)
+registry.collector(
+    "reddit_dms", "gauge", "NGO DMs in the outbox ledger per status.",
+    lambda: [({"status": status}, count) for status, count in dm_sender.ledger.counts().items()],
+)
+
+@app.get("/metrics")
+def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+class ProfileRequest(BaseModel):
+    threshold_ms: float = 0  # only keep the profile of a request at least this slow
+
+@app.post("/debug/profile")
+def arm_profiler(request: ProfileRequest):
+    """Samples the next /chat or /chat/batch request slower than threshold_ms."""
+    if not PROFILER_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    profiler.arm(request.threshold_ms)
+    return profiler.status()
+
+@app.get("/debug/profile")
+def profiler_status():
+    """Whether the profiler is armed, and the last captured profile in collapsed-stack format."""
+    if not PROFILER_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return profiler.status()
 
 
 
@@ -41,12 +341,19 @@ class AidRequest(BaseModel):
     target_groups: list 
 
 
-@app.post("/request-aid")
+@app.post("/request-aid", status_code=202)
 def request_aid(request: AidRequest):
+    # Posting happens on the dispatcher thread under the Reddit rate limit; poll the job for the outcome
     try:
-        bot.make_post( request )
+        job = reddit_dispatcher.submit("post", request)
+    except QueueFullError as err:
+        raise queue_full(err)
+
+    return {"job_id": job.id, "status": job.status}
 
-    except Exception as err:
-        return {"message": f"Error: {err}"}
-    
-    return {"message": "SUccessfully made posts"}
\ No newline at end of file
+@app.get("/request-aid/{job_id}")
+def request_aid_status(job_id: str):
+    status = reddit_dispatcher.status(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Unknown job id")
+    return status
@@ -1,13 +1,30 @@
-import torch
-from transformers import BlenderbotTokenizer, BlenderbotForConditionalGeneration
 from api.persona import REFUGEE_SUPPORT_PROMPT
-from knowledge_base import get_faq_answer, get_form_help
+from api.knowledge_base import faq_data, faq_source_hash, get_faq_answer, get_form_help, use_faq_data
+from api.kb_snapshot import FileWatcher, read_faq_file, snapshot_for
+from api.faq_index import FaqIndex
+from api.retrieval import Bm25Index
+from api.embeddings import EmbeddingIndex, embedding_cache, sentence_encoder
+from api.metrics import timed
+from api.normalization import english_profile, normalization_key, normalization_stats, normalize, register_language
+from api.model_loader import model_loader
+from api.pipeline import PipelineResult, ResponsePipeline, TIER_FAQ, TIER_FALLBACK, TIER_FORM_HELP
+from api.conversation_store import create_conversation_store
+from api.batching import GenerationBatcher
+from api.general_config import (
+    FAQ_ENGINE, FAQ_MIN_SCORE, LEMMA_CACHE_SIZE, PREPROCESS_CACHE_SIZE,
+    FAQ_CONFIDENCE_THRESHOLD, GENERATION_BUDGET_SECONDS, GENERATION_WORKERS,
+    GENERATION_BATCHING, GENERATION_BATCH_MAX_SIZE, GENERATION_BATCH_MAX_WAIT_MS,
+    FAQ_DATA_PATH, FAQ_SNAPSHOT_DIR, FAQ_RELOAD_INTERVAL,
+)
 from nltk.corpus import stopwords
 from nltk.corpus import wordnet
 from nltk.stem import WordNetLemmatizer
-import re
+import hashlib
 import os
 import nltk
+import threading
+from collections import namedtuple
+from functools import lru_cache
 
 # Set the NLTK data path to the nltk_data directory in the same directory as app.py
 nltk_data_path = os.path.join(os.path.dirname(__file__), "nltk_data")
@@ -20,80 +37,229 @@ stop_words = set(stopwords.words('english'))
 stop_words = set(stopwords.words('english'))
 lemmatizer = WordNetLemmatizer()
 
-# Load model and tokenizer (move outside the function for efficiency)
-model_name = "facebook/blenderbot-1B-distill"
-tokenizer = BlenderbotTokenizer.from_pretrained(model_name)
-model = BlenderbotForConditionalGeneration.from_pretrained(model_name)
+# Refugee questions reuse a small vocabulary, so lemmas are memoized per word
+# instead of going back to the WordNet corpus for every occurrence
+lemmatize = lru_cache(maxsize=LEMMA_CACHE_SIZE)(lemmatizer.lemmatize)
 
-# Conversation history (we'll need to manage this per user in a real API)
-chat_history = []
+# The Blenderbot tokenizer and model are loaded on first use by model_loader
+# (see model_loader.py), so FAQ-only workers never pay for them
 
+# Conversation history, kept per session and bounded (see conversation_store.py)
+conversation_store = create_conversation_store()
+
+# English keeps the stopword + WordNet path above; other languages are
+# detected per message and load their own resources on first use (see normalization.py)
+register_language(english_profile(stop_words, lemmatize))
+
+@lru_cache(maxsize=PREPROCESS_CACHE_SIZE)
 def preprocess(text):
-    text = text.lower()
-    text = re.sub(r'[^\w\s]', '', text) # Remove punctuation
-    words = text.split()
-    words = [lemmatizer.lemmatize(w) for w in words if w not in stop_words]
-    return " ".join(words)
-
-# def generate_response(user_input):
-#     user_input = user_input.strip()
-
-#     # Append user message
-#     chat_history.append(user_input)
-
-#     # Check for functional queries first
-#     form_help_response = get_form_help(user_input)
-#     if form_help_response:
-#         chat_history.append(form_help_response)
-#         return form_help_response
-
-#     faq_response = get_faq_answer(user_input)
-#     if faq_response:
-#         chat_history.append(faq_response)
-#         return faq_response
-
-#     # If no direct function match, use the Blenderbot model
-#     MAX_TURNS = 6
-#     recent_history = chat_history[-MAX_TURNS * 2:]
-#     conversation = "\n".join(recent_history)
-#     full_input = REFUGEE_SUPPORT_PROMPT + "\n\n" + conversation
-
-#     # Tokenize and generate
-#     inputs = tokenizer(full_input, return_tensors="pt", truncation=True)
-#     output_ids = model.generate(
-#         **inputs,
-#         max_length=200,
-#         pad_token_id=tokenizer.eos_token_id,
-#         no_repeat_ngram_size=3,
-#         do_sample=True,
-#         top_k=50,
-#         top_p=0.95,
-#         temperature=0.7
-#     )
-
-def generate_response(user_message, knowledge_base):
-    processed_message = preprocess(user_message)
-    best_match_key = None
-    max_similarity = 0
-
-    for key, answer in knowledge_base.items():
-        processed_key = preprocess(key)
-        # Simple similarity: count of common words
-        common_words = set(processed_message.split()) & set(processed_key.split())
-        similarity = len(common_words)
-
-        if similarity > max_similarity and similarity > 0: # You might need a better threshold
-            max_similarity = similarity
-            best_match_key = key
-
-    if best_match_key:
-        return knowledge_base[best_match_key]
+    return normalize(text)
+
+def preprocess_key():
+    # What preprocess() output depends on besides the code, for the snapshot name
+    english_stopwords = hashlib.sha1("\n".join(sorted(stop_words)).encode("utf-8")).hexdigest()
+    return f"{normalization_key()};english_stopwords={english_stopwords}"
+
+def cache_stats():
+    """Hit/miss counters and sizes of the lemma, language detection and message preprocessing caches."""
+
+    return {
+        "lemma": lemmatize.cache_info()._asdict(),
+        "preprocess": preprocess.cache_info()._asdict(),
+        **normalization_stats(),
+    }
+
+FAQ_ENGINES = ("overlap", "bm25", "embedding")
+
+# Everything built from the FAQ content hangs off one LiveKnowledgeBase, so a
+# reload swaps all of it with a single assignment and a request in flight keeps
+# using the indexes it started with
+LiveKnowledgeBase = namedtuple("LiveKnowledgeBase", ["data", "source_hash", "compiled", "engines"])
+
+def build_knowledge_base(data, source_hash):
+    # The indexes are built on the memory-mapped snapshot of the FAQ (see
+    # kb_snapshot.py), so workers on one host share the preprocessed keys
+    # and only the first one to see new content pays for preprocessing
+    compiled = snapshot_for(data, source_hash, FAQ_SNAPSHOT_DIR, preprocess, preprocess_key())
+    engines = {
+        "overlap": FaqIndex.from_compiled(compiled, preprocess),
+        "bm25": Bm25Index.from_compiled(compiled, preprocess, min_score=FAQ_MIN_SCORE),
+    }
+    # The FAQ keys are already compiled into the indexes, keep the message cache for user traffic
+    preprocess.cache_clear()
+    return LiveKnowledgeBase(data, source_hash, compiled, engines)
+
+live_kb = build_knowledge_base(faq_data, faq_source_hash)
+
+def reload_knowledge_base():
+    """Rebuilds the indexes when FAQ_DATA_PATH has new content and swaps them in.
+    Returns True if the knowledge base changed."""
+
+    global live_kb
+    data, source_hash = read_faq_file(FAQ_DATA_PATH)
+    if source_hash == live_kb.source_hash:
+        return False
+
+    new_kb = build_knowledge_base(data, source_hash)
+    if "embedding" in live_kb.engines:
+        # Embed the new keys before the swap instead of on the next request
+        live_embedding_index(new_kb)
+    use_faq_data(data)
+    live_kb = new_kb
+    print(f"Reloaded knowledge base from {FAQ_DATA_PATH}: {len(data)} entries")
+    return True
+
+# Started by api.py when FAQ_RELOAD_INTERVAL > 0
+knowledge_base_watcher = FileWatcher(FAQ_DATA_PATH, reload_knowledge_base, interval=FAQ_RELOAD_INTERVAL)
+
+embedding_lock = threading.Lock()
+
+def live_embedding_index(kb):
+    # Built on first use rather than in build_knowledge_base, so workers that never
+    # use the embedding engine don't load the sentence encoder. Keys embedded
+    # before (by any worker or an earlier version of the FAQ) come from the cache
+    index = kb.engines.get("embedding")
+    if index is None:
+        with embedding_lock:
+            index = kb.engines.get("embedding")
+            if index is None:
+                index = EmbeddingIndex.from_compiled(kb.compiled, sentence_encoder, embedding_cache)
+                kb.engines["embedding"] = index
+    return index
+
+def get_faq_engine(engine, knowledge_base):
+    """Returns the live index for faq_data, or builds one for any other knowledge base.
+
+    faq_data stands for the live knowledge base, which may have been reloaded
+    since it was imported."""
+
+    if engine not in FAQ_ENGINES:
+        raise ValueError(f"Unknown FAQ engine '{engine}'. Choose one of: {', '.join(FAQ_ENGINES)}")
+
+    kb = live_kb
+    if knowledge_base is faq_data or knowledge_base is kb.data:
+        if engine == "embedding":
+            return live_embedding_index(kb)
+        return kb.engines[engine]
+    if engine == "embedding":
+        return EmbeddingIndex(knowledge_base, sentence_encoder, embedding_cache)
+    if engine == "bm25":
+        return Bm25Index(knowledge_base, preprocess, min_score=FAQ_MIN_SCORE)
+    return FaqIndex(knowledge_base, preprocess)
+
+FALLBACK_RESPONSE = "I'm sorry, I'm not sure how to answer that right now. Can you rephrase your question?"
+
+# Concurrent generations are grouped into one generate call when batching is on.
+# The batcher runs on the server's event loop (started in api.py), and pipeline
+# workers block on it, so there must be enough of them to fill a batch.
+generation_batcher = GenerationBatcher(
+    model_loader.generate_replies,
+    max_batch_size=GENERATION_BATCH_MAX_SIZE,
+    max_wait_ms=GENERATION_BATCH_MAX_WAIT_MS,
+)
+
+# Form help -> FAQ -> Blenderbot, with generation bounded by a time budget
+response_pipeline = ResponsePipeline(
+    form_help=get_form_help,
+    generator=generation_batcher.generate_sync if GENERATION_BATCHING else model_loader.generate_reply,
+    persona_prompt=REFUGEE_SUPPORT_PROMPT,
+    fallback_response=FALLBACK_RESPONSE,
+    min_confidence=FAQ_CONFIDENCE_THRESHOLD,
+    budget_seconds=GENERATION_BUDGET_SECONDS,
+    generation_enabled=model_loader.enabled,
+    max_workers=GENERATION_BATCH_MAX_SIZE if GENERATION_BATCHING else GENERATION_WORKERS,
+)
+
+def uses_raw_messages(index):
+    # The embedding engine encodes the raw message rather than preprocessed tokens
+    return isinstance(index, EmbeddingIndex)
+
+def message_tokens(index, user_message, processed_message=None):
+    # Preprocessing runs here rather than inside index.match() so that it is
+    # timed as its own stage
+    if uses_raw_messages(index):
+        return None
+    if processed_message is not None:
+        return processed_message.split()
+    with timed("preprocess"):
+        return preprocess(user_message).split()
+
+def generate_response(user_message, knowledge_base, engine=None, session_id=None, processed_message=None):
+    # "overlap" counts common words through the inverted index, "bm25" scores
+    # the message against the whole FAQ with one sparse matrix-vector product,
+    # "embedding" compares sentence embeddings of the message and the keys.
+    # processed_message is preprocess(user_message) when it already ran in the NLP
+    # pool; the embedding engine encodes the raw message instead
+    index = get_faq_engine(engine or FAQ_ENGINE, knowledge_base)
+    user_message = user_message.strip()
+    tokens = message_tokens(index, user_message, processed_message)
+
+    history = conversation_store.recent(session_id) if session_id else []
+    result = response_pipeline.run(user_message, index, history, tokens=tokens)
+
+    if session_id:
+        conversation_store.append(session_id, user_message, result.response)
+    return result.response
+
+def prepare_stream(user_message, knowledge_base, engine=None, session_id=None):
+    """First half of a streamed reply. Returns (result, fallback, prompt): result when a
+    deterministic tier answered, otherwise the prompt to stream from the model and the
+    deterministic fallback to send if generation produces nothing in time."""
+
+    index = get_faq_engine(engine or FAQ_ENGINE, knowledge_base)
+    user_message = user_message.strip()
+
+    result, fallback = response_pipeline.answer_deterministic(user_message, index, message_tokens(index, user_message))
+    if result:
+        finish_stream(user_message, result, session_id)
+        return result, None, None
+
+    history = conversation_store.recent(session_id) if session_id else []
+    return None, fallback, response_pipeline.build_prompt(user_message, history)
+
+def finish_stream(user_message, result, session_id=None, error=False):
+    """Records a completed streamed reply like generate_response would; error is True
+    when generation failed and result is the fallback."""
+
+    response_pipeline.record(result, error=error)
+    if session_id:
+        conversation_store.append(session_id, user_message.strip(), result.response)
+
+def generate_responses(user_messages, knowledge_base, engine=None):
+    """Answers a whole list of messages at once. Returns (response, FaqMatch or None) pairs in order."""
+
+    index = get_faq_engine(engine or FAQ_ENGINE, knowledge_base)
+
+    # Bursts from the SMS gateway repeat the same questions, so each distinct
+    # message is answered once. Form help goes first, as in generate_response;
+    # the rest are preprocessed and scored against the FAQ in one matrix product
+    results = {}
+    with timed("form_help"):
+        for message in dict.fromkeys(user_messages):
+            form_help_response = response_pipeline.form_help(message)
+            if form_help_response:
+                results[message] = PipelineResult(form_help_response, TIER_FORM_HELP, None, False)
+
+    unique_messages = [message for message in dict.fromkeys(user_messages) if message not in results]
+    if uses_raw_messages(index):
+        with timed("faq_scoring"):
+            matches = index.match_batch(unique_messages)
     else:
-        return "I'm sorry, I'm not sure how to answer that right now. Can you rephrase your question?"
-    # Decode and display response
-    reply = tokenizer.decode(output_ids[0], skip_special_tokens=True)
-    chat_history.append(reply)
-    return reply
+        with timed("preprocess"):
+            token_lists = [preprocess(message).split() for message in unique_messages]
+        with timed("faq_scoring"):
+            matches = index.match_batch_tokens(token_lists)
+    for message, match in zip(unique_messages, matches):
+        results[message] = (
+            PipelineResult(match.answer, TIER_FAQ, match, False) if match
+            else PipelineResult(FALLBACK_RESPONSE, TIER_FALLBACK, None, False)
+        )
+
+    # Counted per message, like single requests
+    return [
+        (result.response, result.match)
+        for result in map(response_pipeline.record, (results[message] for message in user_messages))
+    ]
 
 if __name__ == '__main__':
     print("🤖 Refugee Support Chatbot is now running in interactive mode. Type your message to begin. Type 'exit' to quit.")
@@ -104,5 +270,5 @@ if __name__ == '__main__':
             print("👋 Goodbye! Stay strong, and take care.")
             break
 
-        response = generate_response(user_input)
+        response = generate_response(user_input, faq_data)
         print("Chatbot:", response)
\ No newline at end of file
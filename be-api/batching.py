@@ -0,0 +1,110 @@
+# batching.py
+
+# Micro-batching for generated replies. Concurrent generation requests are
+# collected for up to max_wait_ms (or until max_batch_size prompts are waiting),
+# padded into a single tokenized batch and answered with one generate call, so
+# the model runs fewer, larger matrix multiplies instead of one per user.
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+
+class GenerationBatcher:
+    """Collects prompts from many requests and runs them through generate_batch together.
+
+    generate_batch takes a list of prompts and returns one reply per prompt,
+    e.g. ModelLoader.generate_replies. The batcher lives on the server's event
+    loop: start() it from an async startup hook before submitting prompts."""
+
+    def __init__(self, generate_batch, max_batch_size=8, max_wait_ms=10):
+        self.generate_batch = generate_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+
+        self._loop = None
+        self._queue = None
+        self._task = None
+        # One model call at a time; the batch itself is what gets parallelised
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="batched-generation")
+
+    @property
+    def running(self):
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def generate(self, prompt):
+        """Queues a prompt and waits for its reply."""
+
+        if not self.running:
+            raise RuntimeError("GenerationBatcher is not running")
+
+        future = self._loop.create_future()
+        await self._queue.put((prompt, future))
+        return await future
+
+    def generate_sync(self, prompt, timeout=None):
+        """Blocking version of generate() for worker threads, e.g. ResponsePipeline's generator.
+        Raises TimeoutError after timeout seconds and drops the prompt from its batch.
+        Must not be called from the event loop thread itself."""
+
+        if not self.running:
+            raise RuntimeError("GenerationBatcher is not running")
+        future = asyncio.run_coroutine_threadsafe(self.generate(prompt), self._loop)
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            # Frees this thread; a prompt still waiting for its batch is skipped
+            future.cancel()
+            raise
+
+    async def _collect(self):
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+
+            # Requests whose caller already gave up don't need a reply
+            batch = [(prompt, future) for prompt, future in batch if not future.done()]
+            if not batch:
+                continue
+
+            try:
+                replies = await self._loop.run_in_executor(
+                    self._executor, self.generate_batch, [prompt for prompt, _ in batch]
+                )
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), reply in zip(batch, replies):
+                if not future.done():
+                    future.set_result(reply)
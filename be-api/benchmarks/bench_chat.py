@@ -0,0 +1,178 @@
+# bench_chat.py
+
+# End-to-end chat latency benchmark on a synthetic query corpus (corpus.py):
+# generate_response() called directly for each FAQ engine, and the FastAPI
+# /chat route through the in-process test client. Reports throughput,
+# p50/p95/p99 latency, how often the reply is the answer of the key the query
+# was made from, and which tiers answered.
+#
+# Run from the directory that contains the api package:
+#     python -m api.benchmarks.bench_chat [--queries 2000] [--concurrency 1 8] [--compare OLD.json]
+#
+# Results are written as JSON to benchmarks/results/<commit>.json (or --output),
+# so runs on two commits can be compared with --compare. Blenderbot is never
+# loaded: generation is replaced by a stub that sleeps --generation-ms, or
+# turned off with --generation-ms 0.
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from api.app import FAQ_ENGINES, generate_response, preprocess, response_pipeline
+from api.benchmarks.corpus import synthetic_corpus
+from api.knowledge_base import faq_data
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BENCHMARKS_DIR, "results")
+
+
+class StubGenerator:
+    """Stands in for Blenderbot with a fixed delay per reply."""
+
+    def __init__(self, delay_ms):
+        self.delay_ms = delay_ms
+
+    def __call__(self, prompt, timeout=None):
+        time.sleep(self.delay_ms / 1000)
+        return "Generated reply."
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BENCHMARKS_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain"], cwd=BENCHMARKS_DIR, capture_output=True, text=True
+        ).stdout.strip()
+        return commit + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_scenario(ask, corpus, concurrency):
+    """Sends every query through ask(query) from `concurrency` threads; returns the summary dict."""
+
+    def timed_ask(item):
+        query, key = item
+        start = time.perf_counter()
+        reply = ask(query)
+        return (time.perf_counter() - start) * 1000, reply == faq_data[key]
+
+    preprocess.cache_clear()
+    tiers_before = response_pipeline.tier_stats()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(timed_ask, corpus))
+    wall = time.perf_counter() - start
+    tiers_after = response_pipeline.tier_stats()
+
+    latencies = np.array([latency for latency, _ in results])
+    return {
+        "queries": len(corpus),
+        "concurrency": concurrency,
+        "throughput_rps": len(corpus) / wall,
+        "mean_ms": float(latencies.mean()),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "source_answer_rate": float(np.mean([correct for _, correct in results])),
+        "tiers": {tier: tiers_after[tier] - tiers_before[tier] for tier in tiers_after},
+    }
+
+
+def chat_client():
+    """TestClient for the FastAPI app, or None with the reason if api.py can't be imported here."""
+
+    try:
+        from fastapi.testclient import TestClient
+        from api.api import app
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+    return TestClient(app), None
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as file:
+        baseline = json.load(file)
+
+    print(f"\nCompared with {baseline['commit']}:")
+    for name, result in results["scenarios"].items():
+        old = baseline["scenarios"].get(name)
+        if not old:
+            continue
+        changes = ", ".join(
+            f"{metric} {(result[metric] - old[metric]) / old[metric] * 100:+.1f}%"
+            for metric in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms") if old[metric]
+        )
+        print(f"  {name}: {changes}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chat latency benchmark on a synthetic query corpus")
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--typo-rate", type=float, default=0.1, help="share of words given a typo")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--engines", nargs="+", default=["overlap", "bm25"], choices=FAQ_ENGINES)
+    parser.add_argument("--generation-ms", type=float, default=50, help="stub generation delay, 0 disables generation")
+    parser.add_argument("--skip-http", action="store_true", help="only call generate_response directly")
+    parser.add_argument("--output", help="where to write the JSON results")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare with")
+    args = parser.parse_args()
+
+    response_pipeline.generation_enabled = args.generation_ms > 0
+    response_pipeline.generator = StubGenerator(args.generation_ms)
+    corpus = synthetic_corpus(faq_data, args.queries, seed=args.seed, typo_rate=args.typo_rate)
+
+    scenarios = {}
+    for engine in args.engines:
+        for concurrency in args.concurrency:
+            scenarios[f"generate_response/{engine}/c{concurrency}"] = run_scenario(
+                lambda query: generate_response(query, faq_data, engine=engine), corpus, concurrency
+            )
+
+    if not args.skip_http:
+        client, error = chat_client()
+        if client is None:
+            print(f"Skipping /chat, the API can't be imported here ({error})")
+        else:
+            for concurrency in args.concurrency:
+                scenarios[f"http_chat/c{concurrency}"] = run_scenario(
+                    lambda query: client.post("/chat", json={"message": query}).json()["response"],
+                    corpus, concurrency,
+                )
+
+    results = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "settings": vars(args),
+        "scenarios": scenarios,
+    }
+
+    print(f"{'scenario':<34} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'source':>7}")
+    for name, result in scenarios.items():
+        print(f"{name:<34} {result['throughput_rps']:>8.0f} {result['p50_ms']:>8.3f} {result['p95_ms']:>8.3f} "
+              f"{result['p99_ms']:>8.3f} {result['source_answer_rate']:>7.2f}")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{results['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as file:
+        json.dump(results, file, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
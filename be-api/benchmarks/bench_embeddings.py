@@ -0,0 +1,95 @@
+# bench_embeddings.py
+
+# Latency of the embedding engine's search step at 1k, 10k and 100k FAQ
+# entries: the exact top-k scan over the float32 matrix versus the HNSW index
+# (when hnswlib is installed), with the HNSW recall@1 against the exact result.
+#
+# Run from the directory that contains the api package:
+#     python -m api.benchmarks.bench_embeddings [--queries 500] [--sizes 1000 10000 100000]
+#
+# Keys and queries are random unit vectors of the encoder's size, so only the
+# search is measured; pass --encoder to also time encoding a query with the
+# real sentence encoder (EMBEDDING_MODEL).
+
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from api.embeddings import EmbeddingCache, EmbeddingIndex, sentence_encoder
+from api.general_config import EMBEDDING_MODEL
+
+
+class RandomVectors:
+    """Encoder with the SentenceEncoder interface that returns seeded random unit vectors."""
+
+    def __init__(self, dim, seed):
+        self.dim = dim
+        self.rng = np.random.default_rng(seed)
+        self.queries = {}
+
+    def encode(self, texts, batch_size=64):
+        vectors = self.rng.standard_normal((len(texts), self.dim)).astype(np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    def encode_query(self, text):
+        if text not in self.queries:
+            self.queries[text] = self.encode([text])[0]
+        return self.queries[text]
+
+
+def time_queries(index, queries):
+    latencies, best = [], []
+    for query in queries:
+        start = time.perf_counter()
+        match = index.match(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+        best.append(match.key if match else None)
+    return np.percentile(latencies, 50), np.percentile(latencies, 99), best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding search latency benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--dim", type=int, default=384, help="all-MiniLM-L6-v2 produces 384 dimensions")
+    parser.add_argument("--encoder", action="store_true", help="also time the real sentence encoder")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.encoder:
+        sentence_encoder.load()
+        texts = [f"How do I find help number {i}?" for i in range(args.queries)]
+        start = time.perf_counter()
+        for text in texts:
+            sentence_encoder.encode([text])
+        print(f"{EMBEDDING_MODEL}: {(time.perf_counter() - start) * 1000 / len(texts):.2f} ms per query\n")
+
+    print(f"{'entries':>8} {'search':>7} {'build s':>8} {'p50 ms':>8} {'p99 ms':>8} {'recall@1':>9}")
+    for size in args.sizes:
+        knowledge_base = {f"key {i}": f"Answer {i}" for i in range(size)}
+        queries = [f"query {i}" for i in range(args.queries)]
+        encoder = RandomVectors(args.dim, args.seed)
+        encoder.queries = dict(zip(queries, encoder.encode(queries)))
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = EmbeddingCache(cache_dir, f"random-{args.dim}")
+            exact_best = None
+            for search, ann_threshold in (("exact", size), ("hnsw", 0)):
+                start = time.perf_counter()
+                index = EmbeddingIndex(knowledge_base, encoder, cache, min_score=-1.0, ann_threshold=ann_threshold)
+                build = time.perf_counter() - start
+                if search == "hnsw" and index.ann is None:
+                    print(f"{size:>8} {search:>7} {'hnswlib not installed':>37}")
+                    continue
+
+                p50, p99, best = time_queries(index, queries)
+                if exact_best is None:
+                    exact_best = best
+                recall = np.mean([a == b for a, b in zip(best, exact_best)])
+                print(f"{size:>8} {search:>7} {build:>8.2f} {p50:>8.3f} {p99:>8.3f} {recall:>9.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+# bench_keyword_matcher.py
+
+# get_faq_answer latency: the ordered substring scan it used to do versus the
+# compiled Aho-Corasick automaton, on faq_data scaled to 1x, 10x and 100x.
+#
+# Run from the directory that contains the api package:
+#     python -m api.benchmarks.bench_keyword_matcher [--queries 300]
+#
+# Scaled knowledge bases repeat the real keys with extra made-up words, so the
+# number of distinct keywords grows along with the number of keys.
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from api.knowledge_base import compile_keywords, faq_data
+
+
+def ordered_scan(faq, query):
+    query = query.lower()
+    for key, answer in faq.items():
+        if any(keyword in query for keyword in key.lower().split()):
+            return answer
+    return None
+
+
+def scaled_faq(factor, rng):
+    faq = dict(faq_data)
+    keys = list(faq_data)
+    copy = 0
+    while len(faq) < len(faq_data) * factor:
+        copy += 1
+        for key in keys:
+            made_up = "".join(rng.choice("bcdfghjklmnpqrstvwxz") for _ in range(8))
+            faq[f"{made_up}{copy} {key}"] = faq_data[key]
+    return faq
+
+
+def synthetic_queries(count, rng):
+    # Mostly words that aren't keywords, so the scan has to go far
+    vocabulary = ["please", "help", "zzq", "xxv", "qqj", "camp", "papers", "today"]
+    return [" ".join(rng.choice(vocabulary) for _ in range(rng.randint(3, 10))) for _ in range(count)]
+
+
+def time_calls(fn, queries):
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keyword matcher benchmark")
+    parser.add_argument("--factors", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    queries = synthetic_queries(args.queries, rng)
+
+    print(f"{'keys':>7} {'method':>10} {'build s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for factor in args.factors:
+        faq = scaled_faq(factor, rng)
+
+        p50, p99 = time_calls(lambda q: ordered_scan(faq, q), queries)
+        print(f"{len(faq):>7} {'scan':>10} {0:>8.2f} {p50:>8.3f} {p99:>8.3f}")
+
+        start = time.perf_counter()
+        automaton, first_key, answers = compile_keywords(faq)
+        build = time.perf_counter() - start
+
+        def automaton_lookup(query):
+            positions = [first_key[i] for i in automaton.find_all(query.lower()) if first_key[i] is not None]
+            return answers[min(positions)] if positions else None
+
+        p50, p99 = time_calls(automaton_lookup, queries)
+        print(f"{len(faq):>7} {'automaton':>10} {build:>8.2f} {p50:>8.3f} {p99:>8.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+# bench_prompt_cache.py
+
+# Time-to-first-token with and without the persona prompt prefix cache. For a
+# set of conversation tails it measures input encoding alone and encoding plus
+# generation of the first token, once by tokenizing the full prompt every time
+# (the old path) and once through ModelLoader.encode, which reuses the cached
+# token ids of REFUGEE_SUPPORT_PROMPT.
+#
+# Run from the directory that contains the api package:
+#     python -m api.benchmarks.bench_prompt_cache [--repeats 20]
+
+import argparse
+import time
+
+import numpy as np
+
+from api.model_loader import model_loader
+from api.persona import REFUGEE_SUPPORT_PROMPT
+
+TAILS = [
+    "I am feeling very lost and scared.",
+    "Where can I find food for my children?\nThere is a distribution point near the school.\nWhen is it open?",
+    "How do I apply for asylum?",
+    "I lost my documents on the way here. What do I need to do now?",
+    "Is there a clinic near the camp?\nMy son has a fever since yesterday.",
+]
+
+
+def measure(encode, model, prompts, repeats):
+    import torch
+
+    encode_ms, first_token_ms = [], []
+    for _ in range(repeats):
+        for prompt in prompts:
+            start = time.perf_counter()
+            inputs = encode(prompt)
+            encoded = time.perf_counter()
+            with torch.inference_mode():
+                model.generate(**inputs, max_new_tokens=1, do_sample=False)
+            done = time.perf_counter()
+            encode_ms.append((encoded - start) * 1000)
+            first_token_ms.append((done - start) * 1000)
+    return np.percentile(encode_ms, 50), np.percentile(first_token_ms, [50, 95])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prompt prefix cache time-to-first-token benchmark")
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    tokenizer, model = model_loader.load()
+    prompts = [REFUGEE_SUPPORT_PROMPT + "\n\n" + tail for tail in TAILS]
+    max_length = getattr(model.config, "max_position_embeddings", None) or tokenizer.model_max_length
+
+    def full_tokenize(prompt):
+        return tokenizer(prompt, return_tensors="pt", truncation=True, max_length=max_length)
+
+    def cached(prompt):
+        return model_loader.encode([prompt])
+
+    # Warm both paths (and the cache) before timing
+    measure(full_tokenize, model, prompts, 1)
+    measure(cached, model, prompts, 1)
+
+    print(f"{'path':>14} {'encode p50':>11} {'TTFT p50':>9} {'TTFT p95':>9}   (ms)")
+    for name, encode in (("full tokenize", full_tokenize), ("prefix cache", cached)):
+        encode_p50, (ttft_p50, ttft_p95) = measure(encode, model, prompts, args.repeats)
+        print(f"{name:>14} {encode_p50:>11.2f} {ttft_p50:>9.1f} {ttft_p95:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+# bench_quantization.py
+
+# Compares the fp32 and dynamic int8 (MODEL_QUANTIZE=int8) inference modes on a
+# fixed prompt set: load time, generated tokens per second, peak RSS, and how
+# close the int8 replies stay to the fp32 ones.
+#
+# Run from the directory that contains the api package:
+#     python -m api.benchmarks.bench_quantization [--threads 4]
+#
+# Each mode runs in its own subprocess so its RSS is measured on its own.
+# Decoding is greedy here so the two modes can be compared reply for reply.
+
+import argparse
+import difflib
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+PROMPTS = [
+    "I am feeling very lost and scared.",
+    "Where can I find food for my children?",
+    "How do I apply for asylum?",
+    "I lost my documents on the way here.",
+    "Is there a clinic near the camp?",
+    "I want to find a job but I don't speak the language.",
+    "My family is still back home and I am worried about them.",
+    "Can my children go to school here?",
+]
+
+
+def run_worker(max_new_tokens):
+    """Loads the model in the mode given by the environment and times the prompt set."""
+
+    import torch
+    from api.model_loader import model_loader
+    from api.persona import REFUGEE_SUPPORT_PROMPT
+
+    start = time.perf_counter()
+    tokenizer, model = model_loader.load()
+    load_seconds = time.perf_counter() - start
+
+    replies, generated_tokens = [], 0
+    start = time.perf_counter()
+    for prompt in PROMPTS:
+        inputs = tokenizer(REFUGEE_SUPPORT_PROMPT + "\n\n" + prompt, return_tensors="pt", truncation=True)
+        with torch.inference_mode():
+            output_ids = model.generate(**inputs, max_new_tokens=max_new_tokens, do_sample=False)
+        generated_tokens += output_ids.shape[-1]
+        replies.append(tokenizer.decode(output_ids[0], skip_special_tokens=True))
+    generate_seconds = time.perf_counter() - start
+
+    print(json.dumps({
+        "load_seconds": load_seconds,
+        "tokens_per_second": generated_tokens / generate_seconds,
+        # ru_maxrss is in kilobytes on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "replies": replies,
+    }))
+
+
+def run_mode(quantize, threads, max_new_tokens):
+    env = dict(os.environ, MODEL_QUANTIZE=quantize, TORCH_NUM_THREADS=str(threads), GENERATION_ENABLED="true")
+    output = subprocess.run(
+        [sys.executable, "-m", __spec__.name, "--worker", "--max-new-tokens", str(max_new_tokens)],
+        env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="fp32 vs int8 Blenderbot inference benchmark")
+    parser.add_argument("--threads", type=int, default=0, help="TORCH_NUM_THREADS for both modes")
+    parser.add_argument("--max-new-tokens", type=int, default=40)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.max_new_tokens)
+        return
+
+    results = {mode: run_mode(mode, args.threads, args.max_new_tokens) for mode in ("none", "int8")}
+    # Run int8 a second time to show the start-up cost once the quantized model is cached
+    results["int8 cached"] = run_mode("int8", args.threads, args.max_new_tokens)
+
+    baseline = results["none"]["replies"]
+    print(f"{'mode':>12} {'load s':>8} {'tok/s':>8} {'RSS MB':>8} {'similarity':>10}")
+    for mode, result in results.items():
+        similarity = sum(
+            difflib.SequenceMatcher(None, reference, reply).ratio()
+            for reference, reply in zip(baseline, result["replies"])
+        ) / len(PROMPTS)
+        print(f"{mode:>12} {result['load_seconds']:>8.1f} {result['tokens_per_second']:>8.1f} "
+              f"{result['peak_rss_mb']:>8.0f} {similarity:>10.2f}")
+
+    print("\nReplies (fp32 | int8):")
+    for prompt, reference, reply in zip(PROMPTS, baseline, results["int8"]["replies"]):
+        print(f"- {prompt}\n    {reference}\n    {reply}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+# bench_reddit.py
+
+# Throughput and retry behaviour of the Reddit bot, offline: make_post() over a
+# list of subreddits and send_dms_to_ngos()-style DM delivery through DmSender
+# at several worker counts. Calls go to FakeReddit, which adds --latency-ms per
+# call, fails a share of targets (--error-rate) and answers RATELIMIT once its
+# --quota per --window is spent, or to a recording played back by ReplayReddit.
+# --ignore-server-limits keeps the client from following the quota the server
+# reports, so the RATELIMIT retries are exercised (the 429s column).
+#
+# Run from the directory that contains the api package:
+#     python -m api.benchmarks.bench_reddit [--dms 500] [--workers 1 4 8] [--replay FILE] [--record FILE]
+#
+# --record writes the fake's calls to FILE, so a session can be replayed later;
+# with REDDIT_BACKEND=record the live bot writes the same format.
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import tempfile
+import time
+
+from api.reddit import bot
+from api.reddit.dm_sender import DmSender
+from api.reddit.fake import FakeReddit
+from api.reddit.rate_limit import TokenBucket
+from api.reddit.replay import RecordingReddit, ReplayReddit
+
+
+def make_client(args, banned_subreddits=(), missing_users=()):
+    if args.replay:
+        return ReplayReddit(args.replay, latency_scale=1.0, loop=True)
+    client = FakeReddit(
+        requests_per_window=args.quota, window_seconds=args.window, latency=args.latency_ms / 1000,
+        banned_subreddits=banned_subreddits, missing_users=missing_users,
+    )
+    return RecordingReddit(client, args.record) if args.record else client
+
+
+def make_limiter(args):
+    limiter = TokenBucket(args.requests_per_minute / 60, args.burst)
+    if args.ignore_server_limits:
+        # Only the configured rate; the server's RATELIMIT answers drive the retries
+        limiter.follow = lambda client: None
+    return limiter
+
+
+def server_stats(client):
+    fake = getattr(client, "client", client)
+    return {"calls": getattr(fake, "calls", None), "rate_limited": getattr(fake, "rate_limited", None)}
+
+
+def bench_posts(args, rng):
+    subreddits = [f"bench{i}" for i in range(args.subreddits)]
+    banned = [name for name in subreddits if rng.random() < args.error_rate]
+    client = make_client(args, banned_subreddits=banned)
+    limiter = make_limiter(args)
+
+    bot.SUBREDDITS_TO_POST_TO = subreddits
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = bot.make_post(None, client=client, limiter=limiter)
+    wall = time.perf_counter() - start
+
+    posted = sum(result["status"] == "posted" for result in results)
+    return {"calls": len(subreddits), "ok": posted, "failed": len(results) - posted, "wall_s": wall,
+            **{f"server_{key}": value for key, value in server_stats(client).items()}}
+
+
+def bench_dms(args, rng, workers):
+    unique = [f"ngo{i}" for i in range(int(args.dms * (1 - args.duplicate_rate)) or 1)]
+    recipients = [rng.choice(unique) for _ in range(args.dms)]
+    missing = [name for name in unique if rng.random() < args.error_rate]
+    client = make_client(args, missing_users=missing)
+    limiter = make_limiter(args)
+
+    with tempfile.TemporaryDirectory() as directory:
+        sender = DmSender(os.path.join(directory, "dms.db"), client=client, limiter=limiter, workers=workers)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            queued = sender.queue(recipients)
+            totals = sender.drain()
+        wall = time.perf_counter() - start
+
+    return {"calls": queued, "ok": totals["sent"], "failed": totals["failed"], "wall_s": wall,
+            "coalesced": len(recipients) - queued,
+            **{f"server_{key}": value for key, value in server_stats(client).items()}}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reddit bot throughput and retry benchmark (offline)")
+    parser.add_argument("--subreddits", type=int, default=50)
+    parser.add_argument("--dms", type=int, default=500, help="DM requests, duplicates included")
+    parser.add_argument("--duplicate-rate", type=float, default=0.2, help="share of DM requests naming a repeat recipient")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--latency-ms", type=float, default=50, help="fake API latency per call")
+    parser.add_argument("--error-rate", type=float, default=0.05, help="share of targets that answer an API error")
+    parser.add_argument("--quota", type=int, default=100, help="fake server requests per window")
+    parser.add_argument("--window", type=float, default=5, help="fake server window in seconds")
+    parser.add_argument("--requests-per-minute", type=float, default=1200, help="client token bucket rate")
+    parser.add_argument("--burst", type=int, default=10)
+    parser.add_argument("--ignore-server-limits", action="store_true",
+                        help="don't slow down on the quota the server reports, to exercise RATELIMIT retries")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--replay", help="play calls back from a recording instead of the fake")
+    parser.add_argument("--record", help="append the fake's calls to this recording")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    scenarios = {"make_post": bench_posts(args, rng)}
+    for workers in args.workers:
+        scenarios[f"dms/w{workers}"] = bench_dms(args, rng, workers)
+
+    print(f"{'scenario':<12} {'calls':>6} {'ok':>6} {'failed':>6} {'wall s':>8} {'calls/s':>8} "
+          f"{'429s':>6} {'coalesced':>10}")
+    for name, result in scenarios.items():
+        print(f"{name:<12} {result['calls']:>6} {result['ok']:>6} {result['failed']:>6} {result['wall_s']:>8.2f} "
+              f"{result['calls'] / result['wall_s']:>8.1f} {str(result['server_rate_limited']):>6} "
+              f"{str(result.get('coalesced', '-')):>10}")
+
+
+if __name__ == '__main__':
+    main()
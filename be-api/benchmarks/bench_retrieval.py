@@ -0,0 +1,79 @@
+# bench_retrieval.py
+
+# Latency of the FAQ retrieval engines on synthetic knowledge bases of 1k, 10k
+# and 100k entries built from the vocabulary of the real faq_data.
+#
+# Run from the directory that contains the api package:
+#     python -m api.benchmarks.bench_retrieval [--queries 500] [--sizes 1000 10000 100000]
+#
+# The WordNet lemmatizer is replaced by a plain lowercase/punctuation split so
+# that the numbers only reflect index lookup and scoring cost.
+
+import argparse
+import random
+import re
+import time
+
+import numpy as np
+
+from api.knowledge_base import faq_data
+from api.faq_index import FaqIndex
+from api.retrieval import Bm25Index
+
+
+def simple_preprocess(text):
+    return " ".join(re.sub(r'[^\w\s]', '', text.lower()).split())
+
+
+def synthetic_faq(size, rng):
+    vocabulary = sorted({word for key in faq_data for word in simple_preprocess(key).split()})
+    knowledge_base = {}
+    while len(knowledge_base) < size:
+        key = " ".join(rng.choice(vocabulary) for _ in range(rng.randint(3, 10)))
+        knowledge_base[key] = f"Answer {len(knowledge_base)}"
+    return knowledge_base
+
+
+def synthetic_queries(knowledge_base, count, rng):
+    keys = list(knowledge_base)
+    queries = []
+    for _ in range(count):
+        words = rng.choice(keys).split()
+        rng.shuffle(words)
+        queries.append(" ".join(words[:rng.randint(1, len(words))]))
+    return queries
+
+
+def time_queries(index, queries):
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        index.match(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FAQ retrieval latency benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    engines = {"overlap": FaqIndex, "bm25": Bm25Index}
+
+    print(f"{'entries':>8} {'engine':>8} {'build s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for size in args.sizes:
+        knowledge_base = synthetic_faq(size, rng)
+        queries = synthetic_queries(knowledge_base, args.queries, rng)
+        for name, engine in engines.items():
+            start = time.perf_counter()
+            index = engine(knowledge_base, simple_preprocess)
+            build = time.perf_counter() - start
+            p50, p99 = time_queries(index, queries)
+            print(f"{size:>8} {name:>8} {build:>8.2f} {p50:>8.3f} {p99:>8.3f}")
+
+
+if __name__ == '__main__':
+    main()
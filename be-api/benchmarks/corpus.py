@@ -0,0 +1,89 @@
+# corpus.py
+
+# Synthetic chat queries built from the faq_data keys, for the benchmarks. Each
+# query starts from a key and goes through a few of the changes real messages
+# show: a conversational wrapper, synonyms, dropped or reordered words, typos,
+# casing and punctuation noise. The same seed always gives the same corpus, so
+# runs on different commits see identical input.
+
+import random
+
+WRAPPERS = [
+    "{}",
+    "{}?",
+    "please {}",
+    "can you tell me {}",
+    "i want to know {}",
+    "hello, {}",
+    "{} please help",
+    "question about {}",
+    "sorry to ask but {}",
+]
+
+SYNONYMS = {
+    "find": ["locate", "get"],
+    "help": ["assist", "support"],
+    "need": ["require", "want"],
+    "children": ["kids", "child"],
+    "job": ["work", "employment"],
+    "doctor": ["physician", "medic"],
+    "house": ["home", "housing"],
+    "food": ["meal", "groceries"],
+    "money": ["cash", "funds"],
+    "school": ["education", "classes"],
+    "where": ["whereabouts", "where exactly"],
+    "how": ["in what way", "how exactly"],
+    "feeling": ["feel"],
+    "lost": ["missing"],
+    "apply": ["register", "sign up"],
+}
+
+KEYBOARD_NEIGHBOURS = {
+    "a": "qsz", "e": "wrd", "i": "uok", "o": "ipl", "u": "yij", "n": "bmh", "s": "adw", "r": "etf",
+    "t": "ryg", "l": "kop", "d": "sfe", "m": "nj", "c": "xvd", "h": "gjn",
+}
+
+
+def typo(word, rng):
+    if len(word) < 4:
+        return word
+    i = rng.randrange(1, len(word) - 1)
+    kind = rng.choice(["swap", "drop", "double", "neighbour"])
+    if kind == "swap":
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    if kind == "drop":
+        return word[:i] + word[i + 1:]
+    if kind == "double":
+        return word[:i] + word[i] + word[i:]
+    neighbours = KEYBOARD_NEIGHBOURS.get(word[i])
+    return word[:i] + rng.choice(neighbours) + word[i + 1:] if neighbours else word
+
+
+def paraphrase(key, rng, typo_rate=0.1):
+    words = key.rstrip("?.!").split()
+
+    words = [rng.choice(SYNONYMS[w.lower()]) if w.lower() in SYNONYMS and rng.random() < 0.4 else w for w in words]
+    if len(words) > 4 and rng.random() < 0.3:
+        del words[rng.randrange(len(words))]
+    if len(words) > 3 and rng.random() < 0.2:
+        i = rng.randrange(len(words) - 1)
+        words[i], words[i + 1] = words[i + 1], words[i]
+    words = [typo(w, rng) if rng.random() < typo_rate else w for w in words]
+
+    query = rng.choice(WRAPPERS).format(" ".join(words))
+    casing = rng.random()
+    if casing < 0.15:
+        query = query.upper()
+    elif casing < 0.5:
+        query = query.lower()
+    if rng.random() < 0.2:
+        query += rng.choice(["!!", "??", " ...", " :("])
+    return query
+
+
+def synthetic_corpus(faq, size, seed=42, typo_rate=0.1):
+    """size (query, source key) pairs, paraphrased from the keys of faq."""
+
+    rng = random.Random(seed)
+    keys = list(faq)
+    return [(paraphrase(key, rng, typo_rate), key) for key in (rng.choice(keys) for _ in range(size))]
@@ -0,0 +1,101 @@
+# load_generation.py
+
+# Load test for generated replies with micro-batching on and off. A number of
+# concurrent clients each send requests back to back; the harness reports
+# throughput and latency percentiles for both modes.
+#
+# Run from the directory that contains the api package:
+#     python -m api.benchmarks.load_generation [--clients 32] [--requests 8] [--real]
+#
+# By default the model is replaced by a stub whose cost is a fixed overhead per
+# generate call plus a smaller cost per prompt in the batch, which is roughly
+# how a CPU forward pass behaves. --real loads MODEL_NAME instead.
+
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from api.batching import GenerationBatcher
+
+
+class StubGenerator:
+    """Sleeps like a model would (sleep releases the GIL, as torch does)."""
+
+    def __init__(self, call_ms, per_prompt_ms):
+        self.call_ms = call_ms
+        self.per_prompt_ms = per_prompt_ms
+
+    def generate_replies(self, prompts):
+        time.sleep((self.call_ms + self.per_prompt_ms * len(prompts)) / 1000)
+        return [f"reply to: {prompt}" for prompt in prompts]
+
+
+async def run_clients(generate, clients, requests_per_client):
+    latencies = []
+
+    async def client(client_id):
+        for request_id in range(requests_per_client):
+            start = time.perf_counter()
+            await generate(f"client {client_id} message {request_id}")
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(clients)))
+    return latencies, time.perf_counter() - start
+
+
+async def unbatched(generate_replies, clients, requests_per_client):
+    # Without batching every request runs its own generate call, one at a time
+    executor = ThreadPoolExecutor(max_workers=1)
+    loop = asyncio.get_running_loop()
+
+    async def generate(prompt):
+        return (await loop.run_in_executor(executor, generate_replies, [prompt]))[0]
+
+    return await run_clients(generate, clients, requests_per_client)
+
+
+async def batched(generate_replies, clients, requests_per_client, max_batch_size, max_wait_ms):
+    batcher = GenerationBatcher(generate_replies, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+    await batcher.start()
+    try:
+        return await run_clients(batcher.generate, clients, requests_per_client)
+    finally:
+        await batcher.stop()
+
+
+def report(name, latencies, elapsed):
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    print(f"{name:>10} {len(latencies) / elapsed:>10.1f} {p50:>9.1f} {p95:>9.1f} {p99:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generation micro-batching load test")
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=8, help="requests per client")
+    parser.add_argument("--max-batch-size", type=int, default=8)
+    parser.add_argument("--max-wait-ms", type=float, default=10)
+    parser.add_argument("--call-ms", type=float, default=80, help="stub cost of one generate call")
+    parser.add_argument("--per-prompt-ms", type=float, default=10, help="stub cost per prompt in a batch")
+    parser.add_argument("--real", action="store_true", help="use the real model instead of the stub")
+    args = parser.parse_args()
+
+    if args.real:
+        from api.model_loader import model_loader
+        model_loader.load()
+        generate_replies = model_loader.generate_replies
+    else:
+        generate_replies = StubGenerator(args.call_ms, args.per_prompt_ms).generate_replies
+
+    print(f"{'mode':>10} {'req/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    report("unbatched", *asyncio.run(unbatched(generate_replies, args.clients, args.requests)))
+    report("batched", *asyncio.run(batched(
+        generate_replies, args.clients, args.requests, args.max_batch_size, args.max_wait_ms
+    )))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,18 +1,19 @@
 import torch
-from transformers import BlenderbotTokenizer, BlenderbotForConditionalGeneration
 import speech_recognition as sr
 from api.persona import REFUGEE_SUPPORT_PROMPT
+from api.model_loader import GENERATION_KWARGS, model_loader
+from api.conversation_store import InMemoryConversationStore
+from api.general_config import MAX_TURNS
 
-# Initialize model and tokenizer
-model_name = "facebook/blenderbot-1B-distill"
-tokenizer = BlenderbotTokenizer.from_pretrained(model_name)
-model = BlenderbotForConditionalGeneration.from_pretrained(model_name)
+# Initialize model and tokenizer (honours MODEL_QUANTIZE and TORCH_NUM_THREADS)
+tokenizer, model = model_loader.load()
 
 # Initialize speech recognizer
 recognizer = sr.Recognizer()
 
-# Conversation history
-chat_history = []
+# Conversation history, a ring buffer of the last MAX_TURNS exchanges (user+bot)
+SESSION_ID = "cli"
+conversation_store = InMemoryConversationStore(max_turns=MAX_TURNS, ttl_seconds=float("inf"))
 
 print("🤖 Refugee Support Chatbot is now running. Type or speak to start. Type 'exit' to quit.")
 
@@ -50,30 +51,26 @@ while True:
         break
 
     # Save user input to chat history
-    chat_history.append(f"You: {user_input}")
+    conversation_store.append(SESSION_ID, f"You: {user_input}")
 
-    # Keep only the last few exchanges to avoid input length errors
-    MAX_TURNS = 6
-    recent_history = chat_history[-MAX_TURNS * 2:]  # 6 exchanges (user+bot)
+    # The store only keeps the last few exchanges, which avoids input length errors
+    recent_history = conversation_store.recent(SESSION_ID)
     conversation = "\n".join(recent_history)
     full_input = REFUGEE_SUPPORT_PROMPT + conversation + "\nBot:"
 
     # Tokenize and generate response
-    inputs = tokenizer(full_input, return_tensors="pt", truncation=True)
-    output_ids = model.generate(
-        **inputs,
-        max_length=200,
-        pad_token_id=tokenizer.eos_token_id,
-        no_repeat_ngram_size=3,
-        do_sample=True,
-        top_k=50,
-        top_p=0.95,
-        temperature=0.7
-    )
+    # The persona prompt's token ids are cached, only the conversation is tokenized
+    inputs = model_loader.encode([full_input])
+    with torch.inference_mode():
+        output_ids = model.generate(
+            **inputs,
+            pad_token_id=tokenizer.eos_token_id,
+            **GENERATION_KWARGS
+        )
 
     reply = tokenizer.decode(output_ids[0], skip_special_tokens=True)
 
     # Extract only the bot's reply
     bot_reply = reply.split("Bot:")[-1].strip()
     print("Chatbot:", bot_reply)
-    chat_history.append(f"Bot: {bot_reply}")
\ No newline at end of file
+    conversation_store.append(SESSION_ID, f"Bot: {bot_reply}")
\ No newline at end of file
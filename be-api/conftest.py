@@ -0,0 +1,13 @@
+# conftest.py
+
+# The API is deployed as the package "api" (imports are "from api.x import ..."),
+# so the tests register this directory under that name before collecting.
+
+import os
+import sys
+import types
+
+if "api" not in sys.modules or not hasattr(sys.modules["api"], "__path__"):
+    package = types.ModuleType("api")
+    package.__path__ = [os.path.dirname(os.path.abspath(__file__))]
+    sys.modules["api"] = package
@@ -0,0 +1,174 @@
+# conversation_store.py
+
+# Per-session conversation history for the chatbot. Each session keeps a ring
+# buffer of its most recent turns, and sessions are evicted once they have been
+# idle longer than the TTL or when there are more than max_sessions of them
+# (least recently used first), so memory stays bounded under many users.
+#
+# InMemoryConversationStore is local to one process. SqliteConversationStore
+# keeps the same data in a SQLite database in WAL mode so several uvicorn
+# workers on one host can share conversations.
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+
+from api.general_config import (
+    CONVERSATION_BACKEND, CONVERSATION_DB_PATH, MAX_TURNS, MAX_SESSIONS, SESSION_TTL_SECONDS,
+)
+
+
+class InMemoryConversationStore:
+    """Session id -> ring buffer of the last max_turns exchanges (user + bot) in this process."""
+
+    def __init__(self, max_turns=MAX_TURNS, ttl_seconds=SESSION_TTL_SECONDS, max_sessions=MAX_SESSIONS):
+        self.max_turns = max_turns
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()  # session_id -> (deque of turns, last seen), oldest first
+        self._lock = threading.Lock()
+
+    def append(self, session_id, *turns):
+        with self._lock:
+            now = time.monotonic()
+            history = self._sessions.pop(session_id, (None, None))[0]
+            if history is None:
+                history = deque(maxlen=self.max_turns * 2)
+            history.extend(turns)
+            self._sessions[session_id] = (history, now)
+            self._evict(now)
+
+    def recent(self, session_id):
+        """The session's turns, oldest first. The buffer only ever holds the
+        MAX_TURNS window, so this never copies more than that."""
+
+        with self._lock:
+            now = time.monotonic()
+            self._evict(now)
+            entry = self._sessions.pop(session_id, None)
+            if entry is None:
+                return []
+            self._sessions[session_id] = (entry[0], now)
+            return list(entry[0])
+
+    def clear(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def _evict(self, now):
+        # Sessions are kept in last-seen order, so idle and LRU ones are at the front
+        while self._sessions:
+            session_id, (_, last_seen) = next(iter(self._sessions.items()))
+            if len(self._sessions) > self.max_sessions or now - last_seen > self.ttl_seconds:
+                self._sessions.popitem(last=False)
+            else:
+                break
+
+
+class SqliteConversationStore:
+    """Same interface as InMemoryConversationStore, backed by a SQLite file in WAL mode."""
+
+    def __init__(self, path=CONVERSATION_DB_PATH, max_turns=MAX_TURNS,
+                 ttl_seconds=SESSION_TTL_SECONDS, max_sessions=MAX_SESSIONS):
+        self.path = path
+        self.max_turns = max_turns
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self._local = threading.local()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS sessions (
+                    session_id TEXT PRIMARY KEY,
+                    last_seen REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS sessions_last_seen ON sessions (last_seen);
+                CREATE TABLE IF NOT EXISTS turns (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    session_id TEXT NOT NULL,
+                    text TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS turns_session ON turns (session_id, id);
+            """)
+
+    def _connection(self):
+        # sqlite3 connections can't be shared between threads, so keep one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def append(self, session_id, *turns):
+        now = time.time()
+        with self._connection() as conn:
+            conn.executemany(
+                "INSERT INTO turns (session_id, text) VALUES (?, ?)",
+                [(session_id, turn) for turn in turns],
+            )
+            # Keep only the ring buffer window for this session
+            conn.execute(
+                """DELETE FROM turns WHERE session_id = ? AND id NOT IN (
+                       SELECT id FROM turns WHERE session_id = ? ORDER BY id DESC LIMIT ?)""",
+                (session_id, session_id, self.max_turns * 2),
+            )
+            conn.execute(
+                "INSERT INTO sessions (session_id, last_seen) VALUES (?, ?) "
+                "ON CONFLICT(session_id) DO UPDATE SET last_seen = excluded.last_seen",
+                (session_id, now),
+            )
+            self._evict(conn, now)
+
+    def recent(self, session_id):
+        now = time.time()
+        with self._connection() as conn:
+            self._evict(conn, now)
+            updated = conn.execute(
+                "UPDATE sessions SET last_seen = ? WHERE session_id = ?", (now, session_id)
+            ).rowcount
+            if not updated:
+                return []
+            rows = conn.execute(
+                "SELECT text FROM turns WHERE session_id = ? ORDER BY id DESC LIMIT ?",
+                (session_id, self.max_turns * 2),
+            ).fetchall()
+        return [text for (text,) in reversed(rows)]
+
+    def clear(self, session_id):
+        with self._connection() as conn:
+            conn.execute("DELETE FROM turns WHERE session_id = ?", (session_id,))
+            conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def __len__(self):
+        return self._connection().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def _evict(self, conn, now):
+        expired = conn.execute(
+            """SELECT session_id FROM sessions WHERE last_seen < ?
+               UNION
+               SELECT session_id FROM (
+                   SELECT session_id FROM sessions ORDER BY last_seen DESC LIMIT -1 OFFSET ?)""",
+            (now - self.ttl_seconds, self.max_sessions),
+        ).fetchall()
+        if expired:
+            conn.executemany("DELETE FROM turns WHERE session_id = ?", expired)
+            conn.executemany("DELETE FROM sessions WHERE session_id = ?", expired)
+
+
+def create_conversation_store(backend=CONVERSATION_BACKEND):
+    """Builds the store selected by CONVERSATION_BACKEND ("memory" or "sqlite")."""
+
+    if backend == "memory":
+        return InMemoryConversationStore()
+    if backend == "sqlite":
+        return SqliteConversationStore()
+    raise ValueError(f"Unknown conversation backend '{backend}'. Choose 'memory' or 'sqlite'")
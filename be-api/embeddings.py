@@ -0,0 +1,236 @@
+# embeddings.py
+
+# Semantic FAQ retrieval. Every FAQ key is embedded once with a small local
+# sentence encoder and the vectors are kept on disk as float16, keyed by a hash
+# of the model name and key text, so entries that didn't change are never
+# encoded again (after a restart or a knowledge base reload). A query is
+# encoded once and scored against all keys with one matrix-vector product of
+# unit vectors (cosine similarity); past EMBEDDING_ANN_THRESHOLD keys an HNSW
+# index (hnswlib) replaces the exact scan when it is installed.
+#
+# Like model_loader.py, nothing heavy is imported until the encoder is first
+# used, so workers on the other engines never load sentence-transformers.
+
+import hashlib
+import os
+import threading
+from functools import lru_cache
+
+import numpy as np
+
+from api.faq_index import FaqMatch, top_k_matches
+from api.general_config import (
+    EMBEDDING_ANN_THRESHOLD, EMBEDDING_CACHE_DIR, EMBEDDING_CONFIDENCE_THRESHOLD, EMBEDDING_MIN_SCORE,
+    EMBEDDING_MODEL,
+)
+
+# Query embeddings kept per encoder; repeated questions skip the encoder
+QUERY_CACHE_SIZE = 4096
+
+
+class SentenceEncoder:
+    """Loads a sentence-transformers model on first use and returns unit-length float32 vectors."""
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+        self._lock = threading.Lock()
+        self._model = None
+        self.encode_query = lru_cache(maxsize=QUERY_CACHE_SIZE)(self._encode_query)
+
+    def load(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    from sentence_transformers import SentenceTransformer
+
+                    self._model = SentenceTransformer(self.model_name, device="cpu")
+        return self._model
+
+    def encode(self, texts, batch_size=64):
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        vectors = self.load().encode(
+            list(texts), batch_size=batch_size, convert_to_numpy=True, normalize_embeddings=True
+        )
+        return vectors.astype(np.float32)
+
+    def _encode_query(self, text):
+        vector = self.encode([text])[0]
+        vector.setflags(write=False)
+        return vector
+
+
+class EmbeddingCache:
+    """float16 key embeddings on disk, one file per encoder, addressed by content hash.
+
+    The file is a single .npy of (hash, vector) records, so it can be memory-mapped
+    and is replaced atomically when new entries are added. The rewrite keeps only
+    the entries asked for at the time, so keys removed from the knowledge base
+    don't pile up."""
+
+    def __init__(self, cache_dir, model_name):
+        self.model_name = model_name
+        slug = model_name.replace("/", "--")
+        self.path = os.path.join(cache_dir, f"{slug}.npy")
+        self._lock = threading.Lock()
+
+    def content_hash(self, text):
+        return hashlib.sha1(f"{self.model_name}\0{text}".encode("utf-8")).hexdigest().encode("ascii")
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return None
+        return np.load(self.path, mmap_mode="r")
+
+    def vectors(self, texts, encoder):
+        """float16 (len(texts) x dim) matrix of embeddings, encoding only texts not cached yet."""
+
+        hashes = [self.content_hash(text) for text in texts]
+        with self._lock:
+            records = self._load()
+            rows = {} if records is None else {h: i for i, h in enumerate(records["hash"].tolist())}
+
+            missing = list(dict.fromkeys(h for h in hashes if h not in rows))
+            if missing:
+                text_for = dict(zip(hashes, texts))
+                new_vectors = encoder.encode([text_for[h] for h in missing])
+                dim = new_vectors.shape[1]
+                new_records = np.empty(len(missing), dtype=[("hash", "S40"), ("vector", np.float16, (dim,))])
+                new_records["hash"] = missing
+                new_records["vector"] = new_vectors
+                if records is not None:
+                    live = sorted({rows[h] for h in hashes if h in rows})
+                    new_records = np.concatenate([records[live], new_records])
+                self._save(new_records)
+                records = self._load()
+                rows = {h: i for i, h in enumerate(records["hash"].tolist())}
+
+        if records is None:
+            return np.zeros((0, 0), dtype=np.float16)
+        return records["vector"][[rows[h] for h in hashes]]
+
+    def _save(self, records):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as file:
+            np.save(file, records)
+        os.replace(tmp_path, self.path)
+
+
+class EmbeddingIndex:
+    """Cosine similarity index over the embedded keys of a FAQ dict."""
+
+    def __init__(self, knowledge_base, encoder, cache, min_score=EMBEDDING_MIN_SCORE,
+                 min_confidence=EMBEDDING_CONFIDENCE_THRESHOLD, ann_threshold=EMBEDDING_ANN_THRESHOLD):
+        keys = list(knowledge_base.keys())
+        self._build(keys, [knowledge_base[key] for key in keys], encoder, cache, min_score, min_confidence,
+                    ann_threshold)
+
+    @classmethod
+    def from_compiled(cls, compiled, encoder, cache, min_score=EMBEDDING_MIN_SCORE,
+                      min_confidence=EMBEDDING_CONFIDENCE_THRESHOLD, ann_threshold=EMBEDDING_ANN_THRESHOLD):
+        """Index over the keys of an already compiled knowledge base (kb_snapshot.py)."""
+
+        index = cls.__new__(cls)
+        index._build(compiled.keys, compiled.answers, encoder, cache, min_score, min_confidence, ann_threshold)
+        return index
+
+    def _build(self, keys, answers, encoder, cache, min_score, min_confidence, ann_threshold):
+        self.keys = keys
+        self.answers = answers
+        self.encoder = encoder
+        self.min_score = min_score
+        # Cosine similarities aren't on the word-count scale of FAQ_CONFIDENCE_THRESHOLD,
+        # so the pipeline uses this threshold for this engine instead
+        self.min_confidence = min_confidence
+
+        # float16 on disk; float32 in memory so the scoring product runs on BLAS
+        self.matrix = np.asarray(cache.vectors(list(keys), encoder), dtype=np.float32)
+        self.ann = self._build_ann(cache, ann_threshold) if len(keys) > ann_threshold else None
+
+    def _build_ann(self, cache, ann_threshold):
+        try:
+            import hnswlib
+        except ImportError:
+            print(f"hnswlib is not installed, using exact search over {len(self.keys)} FAQ embeddings "
+                  f"(EMBEDDING_ANN_THRESHOLD={ann_threshold})")
+            return None
+
+        # The graph only depends on the vectors, so it is cached under their combined hash
+        digest = hashlib.sha1(self.matrix.tobytes()).hexdigest()[:16]
+        path = os.path.join(os.path.dirname(os.path.abspath(cache.path)), f"hnsw-{digest}.bin")
+
+        ann = hnswlib.Index(space="ip", dim=self.matrix.shape[1])
+        if os.path.exists(path):
+            ann.load_index(path, max_elements=len(self.keys))
+        else:
+            ann.init_index(max_elements=len(self.keys), ef_construction=200, M=16)
+            ann.add_items(self.matrix, np.arange(len(self.keys)))
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            ann.save_index(tmp_path)
+            os.replace(tmp_path, path)
+        ann.set_ef(64)
+        return ann
+
+    def __len__(self):
+        return len(self.keys)
+
+    def top_k(self, message, k=5):
+        """Returns up to k FaqMatch results with a similarity above min_score, best first."""
+
+        if not len(self.keys):
+            return []
+        query = self.encoder.encode_query(message)
+
+        if self.ann is not None:
+            labels, distances = self.ann.knn_query(query, k=min(k, len(self.keys)))
+            # hnswlib's inner product distance is 1 - similarity
+            return [
+                FaqMatch(self.keys[int(i)], self.answers[int(i)], float(1.0 - d))
+                for i, d in zip(labels[0], distances[0])
+                if 1.0 - d > self.min_score
+            ]
+        return top_k_matches(self.matrix @ query, k, self.keys, self.answers, self.min_score)
+
+    def match(self, message):
+        """Encodes a raw message and returns its best FaqMatch, or None."""
+
+        best = self.top_k(message, 1)
+        return best[0] if best else None
+
+    def match_tokens(self, tokens):
+        # Only reached with preprocessed tokens (e.g. from the NLP process pool);
+        # the encoder works best on the raw message, which match() uses
+        return self.match(" ".join(tokens))
+
+    def match_batch(self, messages):
+        """Best FaqMatch (or None) for each raw message, encoded as one batch and scored in one matrix product."""
+
+        if not messages:
+            return []
+        if not len(self.keys):
+            return [None] * len(messages)
+
+        queries = self.encoder.encode(list(messages))
+        if self.ann is not None:
+            labels, distances = self.ann.knn_query(queries, k=1)
+            # hnswlib's inner product distance is 1 - similarity
+            return [
+                FaqMatch(self.keys[int(i)], self.answers[int(i)], float(1.0 - d)) if 1.0 - d > self.min_score else None
+                for i, d in zip(labels[:, 0], distances[:, 0])
+            ]
+
+        scores = queries @ self.matrix.T
+        best = np.argmax(scores, axis=1)
+        return [
+            FaqMatch(self.keys[int(i)], self.answers[int(i)], float(row[i])) if row[i] > self.min_score else None
+            for i, row in zip(best, scores)
+        ]
+
+    def match_batch_tokens(self, token_lists):
+        # Preprocessed tokens only, see match_tokens(); generate_responses passes raw messages
+        return self.match_batch([" ".join(tokens) for tokens in token_lists])
+
+
+sentence_encoder = SentenceEncoder(EMBEDDING_MODEL)
+embedding_cache = EmbeddingCache(EMBEDDING_CACHE_DIR, EMBEDDING_MODEL)
@@ -0,0 +1,133 @@
+# faq_index.py
+
+# Precomputed lookup structure for matching user messages against the FAQ keys.
+# Every key is preprocessed once when the index is built, and an inverted index
+# (token -> ids of the keys containing it) lets a lookup visit only the keys
+# that share at least one word with the message.
+#
+# The structures come from a CompiledFaq (kb_snapshot.py), so an index can be
+# built straight from a memory-mapped snapshot without preprocessing any key.
+
+from collections import namedtuple
+
+import numpy as np
+from scipy import sparse
+
+from api.kb_snapshot import compile_faq
+
+FaqMatch = namedtuple("FaqMatch", ["key", "answer", "score"])
+
+
+def query_matrix(token_lists, vocabulary):
+    """Binary (queries x vocabulary) CSR matrix with a 1 for every known token of each query."""
+
+    indptr, indices = [0], []
+    for tokens in token_lists:
+        indices.extend(sorted({vocabulary[token] for token in tokens if token in vocabulary}))
+        indptr.append(len(indices))
+    data = np.ones(len(indices), dtype=np.float32)
+    return sparse.csr_matrix((data, indices, indptr), shape=(len(token_lists), len(vocabulary)))
+
+
+def best_per_row(scores):
+    """(key_id, score) of the highest positive score in every row of a sparse
+    (queries x keys) matrix, or None for rows without any. Ties go to the lowest key id."""
+
+    scores = scores.tocsr()
+    scores.sort_indices()
+    best = []
+    for row in range(scores.shape[0]):
+        start, end = scores.indptr[row], scores.indptr[row + 1]
+        row_scores = scores.data[start:end]
+        if end == start or row_scores.max() <= 0:
+            best.append(None)
+            continue
+        position = int(np.argmax(row_scores))
+        best.append((int(scores.indices[start + position]), float(row_scores[position])))
+    return best
+
+
+def top_k_matches(scores, k, keys, answers, min_score=0.0):
+    """Up to k FaqMatch results scoring above min_score from a dense score per key, best first."""
+
+    k = min(k, len(scores))
+    if k <= 0:
+        return []
+
+    # Everything scoring at least the k-th best score, so ties at the cut-off
+    # are resolved by position in the knowledge base like the other engines
+    kth_score = -np.partition(-scores, k - 1)[k - 1]
+    candidates = np.flatnonzero(scores >= kth_score)
+    order = np.lexsort((candidates, -scores[candidates]))[:k]
+    return [
+        FaqMatch(keys[i], answers[i], float(scores[i]))
+        for i in candidates[order]
+        if scores[i] > min_score
+    ]
+
+
+class FaqIndex:
+    """Token-set index over the keys of a FAQ dict."""
+
+    def __init__(self, knowledge_base, preprocess):
+        self._build(compile_faq(knowledge_base, preprocess), preprocess)
+
+    @classmethod
+    def from_compiled(cls, compiled, preprocess):
+        """Index over an already compiled (e.g. memory-mapped) knowledge base."""
+
+        index = cls.__new__(cls)
+        index._build(compiled, preprocess)
+        return index
+
+    def _build(self, compiled, preprocess):
+        self.preprocess = preprocess
+        self.compiled = compiled
+        self.keys = compiled.keys
+        self.answers = compiled.answers
+        self.vocabulary = compiled.vocabulary
+
+        # (vocabulary x keys) CSR: row t holds the sorted ids of the keys containing token t
+        self.postings = compiled.postings
+
+        # Binary (keys x vocabulary) incidence matrix, used to score many queries at once.
+        # It reuses the index arrays of the term counts, only the data array is new
+        tf = compiled.tf
+        self.matrix = sparse.csr_matrix(
+            (np.ones(len(tf.data), dtype=np.float32), tf.indices, tf.indptr), shape=tf.shape, copy=False
+        )
+
+    def __len__(self):
+        return len(self.keys)
+
+    def match_tokens(self, tokens):
+        """Returns the best FaqMatch for an already preprocessed set of tokens, or None."""
+
+        term_ids = {self.vocabulary[token] for token in tokens if token in self.vocabulary}
+        if not term_ids:
+            return None
+
+        indptr, indices = self.postings.indptr, self.postings.indices
+        overlap = np.bincount(np.concatenate([indices[indptr[t]:indptr[t + 1]] for t in term_ids]))
+
+        # Highest number of common words wins; ties go to the key that comes
+        # first in the knowledge base (argmax returns the first maximum), same
+        # as the original linear scan.
+        key_id = int(np.argmax(overlap))
+        score = int(overlap[key_id])
+        return FaqMatch(self.keys[key_id], self.answers[key_id], score)
+
+    def match(self, message):
+        """Preprocesses a raw message and returns its best FaqMatch, or None."""
+
+        return self.match_tokens(self.preprocess(message).split())
+
+    def match_batch_tokens(self, token_lists):
+        """Best FaqMatch (or None) for each preprocessed query, scored in one sparse
+        matrix product that counts the common words of every (query, key) pair."""
+
+        overlaps = query_matrix(token_lists, self.vocabulary) @ self.matrix.T
+        return [
+            FaqMatch(self.keys[best[0]], self.answers[best[0]], int(best[1])) if best else None
+            for best in best_per_row(overlaps)
+        ]
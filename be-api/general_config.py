@@ -13,3 +13,122 @@ load_dotenv()
 
 DEBUG = os.getenv("DEBUG", 'TRUE').lower() == "true"
 
+
+# FAQ retrieval engine used by /chat: "overlap" (shared word count), "bm25" or
+# "embedding" (sentence encoder, see the EMBEDDING_* settings)
+FAQ_ENGINE = os.getenv("FAQ_ENGINE", "overlap").lower()
+
+# Minimum BM25 score an FAQ entry needs before it is returned as an answer
+FAQ_MIN_SCORE = float(os.getenv("FAQ_MIN_SCORE", "0"))
+
+# Maximum number of messages accepted by a single /chat/batch call
+CHAT_BATCH_MAX_SIZE = int(os.getenv("CHAT_BATCH_MAX_SIZE", "1000"))
+
+# Sizes of the bounded LRU caches in front of the WordNet lemmatizer (per word)
+# and of the full message preprocessing (per message)
+LEMMA_CACHE_SIZE = int(os.getenv("LEMMA_CACHE_SIZE", "50000"))
+PREPROCESS_CACHE_SIZE = int(os.getenv("PREPROCESS_CACHE_SIZE", "10000"))
+
+# Blenderbot model used for generated replies. It is loaded lazily on first use;
+# set GENERATION_ENABLED=false for FAQ-only workers that should never load it,
+# and MODEL_WARMUP=true to load it in the background once the server is up
+MODEL_NAME = os.getenv("MODEL_NAME", "facebook/blenderbot-1B-distill")
+GENERATION_ENABLED = os.getenv("GENERATION_ENABLED", "TRUE").lower() == "true"
+MODEL_WARMUP = os.getenv("MODEL_WARMUP", "FALSE").lower() == "true"
+
+# Tiered chat pipeline: the generative model only answers when the best FAQ
+# score (in the units of the selected engine) is below FAQ_CONFIDENCE_THRESHOLD,
+# and a request never waits more than GENERATION_BUDGET_SECONDS for it
+FAQ_CONFIDENCE_THRESHOLD = float(os.getenv("FAQ_CONFIDENCE_THRESHOLD", "1"))
+GENERATION_BUDGET_SECONDS = float(os.getenv("GENERATION_BUDGET_SECONDS", "10"))
+GENERATION_WORKERS = int(os.getenv("GENERATION_WORKERS", "1"))
+
+# Per-session conversation history: each session keeps its last MAX_TURNS
+# exchanges, and sessions idle for SESSION_TTL_SECONDS (or beyond MAX_SESSIONS,
+# least recently used first) are dropped. CONVERSATION_BACKEND is "memory"
+# (per process) or "sqlite" (shared by all workers through CONVERSATION_DB_PATH)
+MAX_TURNS = int(os.getenv("MAX_TURNS", "6"))
+SESSION_TTL_SECONDS = float(os.getenv("SESSION_TTL_SECONDS", "1800"))
+MAX_SESSIONS = int(os.getenv("MAX_SESSIONS", "10000"))
+CONVERSATION_BACKEND = os.getenv("CONVERSATION_BACKEND", "memory").lower()
+CONVERSATION_DB_PATH = os.getenv("CONVERSATION_DB_PATH", "conversations.db")
+
+# Micro-batching of generated replies: concurrent requests wait up to
+# GENERATION_BATCH_MAX_WAIT_MS for others and run as one batch of at most
+# GENERATION_BATCH_MAX_SIZE prompts
+GENERATION_BATCHING = os.getenv("GENERATION_BATCHING", "FALSE").lower() == "true"
+GENERATION_BATCH_MAX_SIZE = int(os.getenv("GENERATION_BATCH_MAX_SIZE", "8"))
+GENERATION_BATCH_MAX_WAIT_MS = float(os.getenv("GENERATION_BATCH_MAX_WAIT_MS", "10"))
+
+# Worker pools for /chat: CPU-bound work runs on CHAT_THREAD_WORKERS threads
+# (and NLTK preprocessing on NLP_PROCESS_WORKERS processes when > 0). Once
+# CHAT_QUEUE_MAX jobs are pending, new requests get a 503 instead of queueing.
+# With GENERATION_BATCHING, keep CHAT_THREAD_WORKERS >= GENERATION_BATCH_MAX_SIZE
+# so enough requests can wait on the batcher to fill a batch
+CHAT_THREAD_WORKERS = int(os.getenv("CHAT_THREAD_WORKERS", "4"))
+NLP_PROCESS_WORKERS = int(os.getenv("NLP_PROCESS_WORKERS", "0"))
+CHAT_QUEUE_MAX = int(os.getenv("CHAT_QUEUE_MAX", "64"))
+
+# CPU inference: MODEL_QUANTIZE=int8 loads the model with dynamic int8
+# quantization of its Linear layers, cached under QUANTIZED_MODEL_DIR after the
+# first start. TORCH_NUM_THREADS pins torch's intra-op threads (0 = torch default)
+MODEL_QUANTIZE = os.getenv("MODEL_QUANTIZE", "none").lower()
+QUANTIZED_MODEL_DIR = os.getenv("QUANTIZED_MODEL_DIR", "model_cache")
+TORCH_NUM_THREADS = int(os.getenv("TORCH_NUM_THREADS", "0"))
+
+# Maximum number of /chat/stream generations running at the same time
+STREAM_WORKERS = int(os.getenv("STREAM_WORKERS", "2"))
+
+# Knowledge base file (JSON object or question/answer CSV), the directory for its
+# compiled memory-mapped snapshots, and how often (seconds) to check the file
+# for changes and reload it (0 turns hot reload off)
+FAQ_DATA_PATH = os.getenv("FAQ_DATA_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "faq_data.json"))
+FAQ_SNAPSHOT_DIR = os.getenv("FAQ_SNAPSHOT_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "kb_snapshots"))
+FAQ_RELOAD_INTERVAL = float(os.getenv("FAQ_RELOAD_INTERVAL", "5"))
+
+# Embedding retrieval (FAQ_ENGINE=embedding): the local sentence encoder, where
+# the float16 FAQ key embeddings are cached, the cosine similarity a key needs
+# to match at all and to answer without generation, and the FAQ size past which
+# an HNSW index (hnswlib, if installed) replaces the exact top-k scan
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", "embedding_cache")
+EMBEDDING_MIN_SCORE = float(os.getenv("EMBEDDING_MIN_SCORE", "0.3"))
+EMBEDDING_CONFIDENCE_THRESHOLD = float(os.getenv("EMBEDDING_CONFIDENCE_THRESHOLD", "0.6"))
+EMBEDDING_ANN_THRESHOLD = int(os.getenv("EMBEDDING_ANN_THRESHOLD", "20000"))
+
+# Languages preprocess() normalizes (ISO 639-1 codes, English is always on),
+# and the size of the per-message language detection cache
+LANGUAGES = [code.strip() for code in os.getenv("LANGUAGES", "en,fr,ar,sw,so").lower().split(",") if code.strip()]
+LANGUAGE_CACHE_SIZE = int(os.getenv("LANGUAGE_CACHE_SIZE", "10000"))
+
+# Slow request profiler armed through /debug/profile. The endpoint exposes
+# stack traces without authentication, so it is only served when
+# PROFILER_ENABLED is set; the sampling interval is PROFILER_INTERVAL_MS
+PROFILER_ENABLED = os.getenv("PROFILER_ENABLED", "false").lower() == "true"
+PROFILER_INTERVAL_MS = float(os.getenv("PROFILER_INTERVAL_MS", "5"))
+
+# Reddit aid dispatch: REDDIT_BACKEND is "praw" (live, needs the REDDIT_*
+# credentials), "fake" (in-memory, offline), "record" (praw, with every call
+# appended to REDDIT_RECORDING_PATH) or "replay" (answers calls from that
+# recording, offline). API calls go through a token
+# bucket of REDDIT_REQUESTS_PER_MINUTE with bursts of REDDIT_BURST, slowed
+# further when Reddit reports its quota running out. At most REDDIT_QUEUE_MAX
+# aid jobs wait in the queue; rate-limited calls are tried REDDIT_MAX_ATTEMPTS times
+REDDIT_BACKEND = os.getenv("REDDIT_BACKEND", "praw").lower()
+REDDIT_RECORDING_PATH = os.getenv("REDDIT_RECORDING_PATH", "reddit_recording.jsonl")
+REDDIT_REQUESTS_PER_MINUTE = float(os.getenv("REDDIT_REQUESTS_PER_MINUTE", "60"))
+REDDIT_BURST = int(os.getenv("REDDIT_BURST", "5"))
+REDDIT_QUEUE_MAX = int(os.getenv("REDDIT_QUEUE_MAX", "100"))
+REDDIT_MAX_ATTEMPTS = int(os.getenv("REDDIT_MAX_ATTEMPTS", "3"))
+# Posts and DMs rendered for the most recent aid requests (reddit/templates.py)
+REDDIT_TEMPLATE_CACHE_SIZE = int(os.getenv("REDDIT_TEMPLATE_CACHE_SIZE", "256"))
+
+# NGO DMs go through an outbox in REDDIT_DM_LEDGER_PATH (SQLite) that records
+# every (recipient, message) sent, so nobody gets the same DM twice, even across
+# restarts. REDDIT_DM_WORKERS sends run at once within the Reddit rate limit, and
+# a DM that fails is tried REDDIT_DM_MAX_ATTEMPTS times, waiting
+# REDDIT_DM_RETRY_SECONDS after the first failure and twice as long after each next one
+REDDIT_DM_LEDGER_PATH = os.getenv("REDDIT_DM_LEDGER_PATH", "reddit_dms.db")
+REDDIT_DM_WORKERS = int(os.getenv("REDDIT_DM_WORKERS", "4"))
+REDDIT_DM_MAX_ATTEMPTS = int(os.getenv("REDDIT_DM_MAX_ATTEMPTS", "3"))
+REDDIT_DM_RETRY_SECONDS = float(os.getenv("REDDIT_DM_RETRY_SECONDS", "60"))
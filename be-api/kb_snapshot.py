@@ -0,0 +1,289 @@
+# kb_snapshot.py
+
+# Compiled, memory-mapped snapshots of the FAQ knowledge base.
+#
+# compile_faq() preprocesses every FAQ key once and packs the result into flat
+# arrays: the keys and answers as UTF-8 blobs with offsets, the vocabulary, the
+# (keys x vocabulary) term-count matrix in CSR form and its transpose, which is
+# the token -> key ids inverted index. write_snapshot() stores those arrays in a
+# single file and load_snapshot() maps the file back read-only with numpy, so
+# every worker on a host shares one copy of the arrays through the page cache.
+#
+# Snapshot files are named after a hash of the data file's content and of the
+# preprocessing configuration (languages, stopword lists, NLTK data), so workers
+# starting from the same FAQ and settings reuse the file the first one wrote,
+# and a configuration change never picks up tokens built under the old one.
+# Only the few most recently used snapshots are kept.
+
+import csv
+import hashlib
+import io
+import json
+import os
+import threading
+
+import numpy as np
+from scipy import sparse
+
+SNAPSHOT_MAGIC = b"FAQSNAP1"
+ALIGNMENT = 64
+
+# Bump when preprocessing changes, so old snapshots aren't reused with new tokens
+PREPROCESS_VERSION = "3"
+
+# Snapshots kept besides the current one, for workers still on an older FAQ
+SNAPSHOTS_KEPT = 2
+
+
+class StringTable:
+    """Read-only sequence of strings stored as one UTF-8 blob plus offsets."""
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    @classmethod
+    def from_strings(cls, strings):
+        encoded = [s.encode("utf-8") for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(e) for e in encoded])
+        return cls(np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return bytes(self.blob[self.offsets[i]:self.offsets[i + 1]]).decode("utf-8")
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+
+class CompiledFaq:
+    """Preprocessed FAQ: keys, answers, vocabulary and term counts in flat arrays."""
+
+    def __init__(self, keys, answers, vocabulary, tf, postings, source_hash=None, path=None):
+        self.keys = keys              # StringTable
+        self.answers = answers        # StringTable
+        self.vocabulary = vocabulary  # dict token -> term id
+        self.tf = tf                  # CSR (keys x vocabulary) term counts
+        self.postings = postings      # CSR (vocabulary x keys), the inverted index
+        self.source_hash = source_hash
+        self.path = path
+
+    def __len__(self):
+        return len(self.keys)
+
+
+def compile_faq(knowledge_base, preprocess, source_hash=None):
+    """Preprocesses every FAQ key once and packs the knowledge base into a CompiledFaq."""
+
+    keys = list(knowledge_base.keys())
+    vocabulary = {}
+    indptr, indices, counts = [0], [], []
+    for key in keys:
+        term_counts = {}
+        for token in preprocess(key).split():
+            term_id = vocabulary.setdefault(token, len(vocabulary))
+            term_counts[term_id] = term_counts.get(term_id, 0) + 1
+        for term_id in sorted(term_counts):
+            indices.append(term_id)
+            counts.append(term_counts[term_id])
+        indptr.append(len(indices))
+
+    tf = sparse.csr_matrix(
+        (np.asarray(counts, dtype=np.float32), np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int32)),
+        shape=(len(keys), len(vocabulary)),
+    )
+    postings = tf.T.tocsr()
+    postings.sort_indices()
+    return CompiledFaq(
+        StringTable.from_strings(keys),
+        StringTable.from_strings(knowledge_base[key] for key in keys),
+        vocabulary,
+        tf,
+        postings,
+        source_hash=source_hash,
+    )
+
+
+def _snapshot_arrays(compiled):
+    vocab = StringTable.from_strings(sorted(compiled.vocabulary, key=compiled.vocabulary.get))
+    return {
+        "keys_blob": compiled.keys.blob, "keys_offsets": compiled.keys.offsets,
+        "answers_blob": compiled.answers.blob, "answers_offsets": compiled.answers.offsets,
+        "vocab_blob": vocab.blob, "vocab_offsets": vocab.offsets,
+        "tf_indptr": compiled.tf.indptr, "tf_indices": compiled.tf.indices, "tf_data": compiled.tf.data,
+        "postings_indptr": compiled.postings.indptr, "postings_indices": compiled.postings.indices,
+    }
+
+
+def write_snapshot(compiled, path):
+    """Writes a CompiledFaq to path atomically (temporary file + rename)."""
+
+    arrays = {name: np.ascontiguousarray(array) for name, array in _snapshot_arrays(compiled).items()}
+    header = {
+        "source_hash": compiled.source_hash,
+        "shape": [len(compiled.keys), len(compiled.vocabulary)],
+        "arrays": {},
+    }
+    offset = 0
+    for name, array in arrays.items():
+        header["arrays"][name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+
+    header_bytes = json.dumps(header).encode("utf-8")
+    data_start = -(-(len(SNAPSHOT_MAGIC) + 8 + len(header_bytes)) // ALIGNMENT) * ALIGNMENT
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(SNAPSHOT_MAGIC)
+        file.write(np.uint64(len(header_bytes)).tobytes())
+        file.write(header_bytes)
+        for name, array in arrays.items():
+            file.seek(data_start + header["arrays"][name]["offset"])
+            file.write(array.tobytes())
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(path):
+    """Maps a snapshot file read-only and returns it as a CompiledFaq.
+
+    Only the vocabulary dict is rebuilt in this process; every array is a view
+    into the shared mapping."""
+
+    raw = np.memmap(path, dtype=np.uint8, mode="r")
+    if bytes(raw[:len(SNAPSHOT_MAGIC)]) != SNAPSHOT_MAGIC:
+        raise ValueError(f"{path} is not a knowledge base snapshot")
+
+    header_len = int(raw[len(SNAPSHOT_MAGIC):len(SNAPSHOT_MAGIC) + 8].view(np.uint64)[0])
+    header_start = len(SNAPSHOT_MAGIC) + 8
+    header = json.loads(bytes(raw[header_start:header_start + header_len]).decode("utf-8"))
+    data_start = -(-(header_start + header_len) // ALIGNMENT) * ALIGNMENT
+
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"]))
+        start = data_start + spec["offset"]
+        arrays[name] = raw[start:start + count * dtype.itemsize].view(dtype).reshape(spec["shape"])
+
+    n_keys, n_terms = header["shape"]
+    vocab = StringTable(arrays["vocab_blob"], arrays["vocab_offsets"])
+    tf = sparse.csr_matrix(
+        (arrays["tf_data"], arrays["tf_indices"], arrays["tf_indptr"]), shape=(n_keys, n_terms), copy=False
+    )
+    postings = sparse.csr_matrix(
+        (np.ones(len(arrays["postings_indices"]), dtype=np.float32), arrays["postings_indices"], arrays["postings_indptr"]),
+        shape=(n_terms, n_keys), copy=False,
+    )
+    return CompiledFaq(
+        StringTable(arrays["keys_blob"], arrays["keys_offsets"]),
+        StringTable(arrays["answers_blob"], arrays["answers_offsets"]),
+        {token: term_id for term_id, token in enumerate(vocab)},
+        tf,
+        postings,
+        source_hash=header["source_hash"],
+        path=path,
+    )
+
+
+def read_faq_file(path):
+    """Reads the FAQ from a JSON object ({question: answer}) or a CSV file with
+    question and answer columns. Returns (faq_data, content hash); key order is
+    kept since it decides ties between keys."""
+
+    with open(path, "rb") as file:
+        content = file.read()
+    source_hash = hashlib.sha256(PREPROCESS_VERSION.encode() + content).hexdigest()
+
+    text = content.decode("utf-8-sig")
+    if path.lower().endswith(".csv"):
+        faq_data = {row["question"]: row["answer"] for row in csv.DictReader(io.StringIO(text, newline=""))}
+    else:
+        faq_data = json.loads(text)
+    return faq_data, source_hash
+
+
+def snapshot_path_for(source_hash, snapshot_dir, preprocess_key=""):
+    digest = hashlib.sha256(f"{source_hash}\0{preprocess_key}".encode("utf-8")).hexdigest()
+    return os.path.join(snapshot_dir, f"faq-{digest[:16]}.snap")
+
+
+def snapshot_for(faq_data, source_hash, snapshot_dir, preprocess, preprocess_key=""):
+    """Maps the snapshot for this content and preprocessing configuration, building
+    and writing it first if no worker has done so yet.
+
+    preprocess_key describes everything preprocess() output depends on besides
+    the code, which PREPROCESS_VERSION covers."""
+
+    snapshot_path = snapshot_path_for(source_hash, snapshot_dir, preprocess_key)
+    if os.path.exists(snapshot_path):
+        # Marks it as recently used for prune_snapshots()
+        os.utime(snapshot_path)
+    else:
+        write_snapshot(compile_faq(faq_data, preprocess, source_hash=source_hash), snapshot_path)
+    compiled = load_snapshot(snapshot_path)
+    prune_snapshots(snapshot_dir, keep=snapshot_path)
+    return compiled
+
+
+def prune_snapshots(snapshot_dir, keep, kept=SNAPSHOTS_KEPT):
+    """Removes all snapshots but `keep` and the `kept` most recently used others.
+    Workers that have one of them mapped keep reading it after the unlink."""
+
+    others = []
+    for name in os.listdir(snapshot_dir):
+        path = os.path.join(snapshot_dir, name)
+        if name.startswith("faq-") and name.endswith(".snap") and os.path.abspath(path) != os.path.abspath(keep):
+            try:
+                others.append((os.stat(path).st_mtime, path))
+            except OSError:
+                continue
+    for _, path in sorted(others, reverse=True)[kept:]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class FileWatcher:
+    """Polls a file's modification time and size and calls on_change when they move."""
+
+    def __init__(self, path, on_change, interval=2.0):
+        self.path = path
+        self.on_change = on_change
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self._last = self._signature()
+
+    def _signature(self):
+        try:
+            stat = os.stat(self.path)
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="kb-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            signature = self._signature()
+            if signature is None or signature == self._last:
+                continue
+            self._last = signature
+            try:
+                self.on_change()
+            except Exception as e:
+                # Keep serving the previous knowledge base when the new file is broken
+                print(f"Reloading {self.path} failed, keeping the current knowledge base: {e}")
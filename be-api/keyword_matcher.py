@@ -0,0 +1,63 @@
+# keyword_matcher.py
+
+# Aho-Corasick automaton for finding many keywords in a query in one pass.
+# The patterns are compiled once into a trie with failure links, so a search
+# costs O(len(text) + hits) however many patterns there are, instead of one
+# substring test per pattern.
+
+from collections import deque
+
+
+class AhoCorasick:
+    """Multi-pattern substring matcher. Pattern ids are their positions in the input list."""
+
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+
+        # Trie of all patterns; each state remembers which patterns end there
+        ends = [[]]
+        for pattern_id, pattern in enumerate(self.patterns):
+            if not pattern:
+                continue
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    ends.append([])
+                state = next_state
+            ends[state].append(pattern_id)
+
+        # Breadth-first failure links; outputs include those of the failure state,
+        # so a search never has to walk the failure chain to collect matches
+        self._out = [tuple(e) for e in ends]
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._out[next_state] += self._out[self._fail[next_state]]
+
+    def find_all(self, text):
+        """Set of ids of every pattern that occurs in text."""
+
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set()
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if out[state]:
+                found.update(out[state])
+        return found
@@ -0,0 +1,139 @@
+# metrics.py
+
+# Minimal in-process metrics registry rendered in the Prometheus text format
+# (served on /metrics by api.py). Histograms are updated on the hot path;
+# counters that other modules already keep (cache_stats, worker_stats,
+# tier_stats) are read through collector callbacks when /metrics is scraped,
+# so they cost nothing per request.
+
+import threading
+import time
+from contextlib import contextmanager
+
+# Seconds; covers a cached FAQ lookup (sub-millisecond) up to a slow generation
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{escape_label(value)}"' for name, value in labels.items()) + "}"
+
+
+def format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels."""
+
+    def __init__(self, name, documentation, label_names=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {labels: (list(counts), total, count) for labels, (counts, total, count) in self._series.items()}
+        for label_values, (counts, total, count) in sorted(series.items()):
+            labels = dict(zip(self.label_names, label_values))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                bucket_labels = format_labels({**labels, "le": format_value(float(bound))})
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(labels)} {format_value(total)}")
+            lines.append(f"{self.name}_count{format_labels(labels)} {count}")
+        return lines
+
+
+class Collector:
+    """Metric family whose samples come from a callback at scrape time.
+
+    collect() returns (labels dict, value) pairs."""
+
+    def __init__(self, name, metric_type, documentation, collect):
+        self.name = name
+        self.metric_type = metric_type
+        self.documentation = documentation
+        self.collect = collect
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        for labels, value in self.collect():
+            lines.append(f"{self.name}{format_labels(labels)} {format_value(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def histogram(self, name, documentation, label_names=(), buckets=DEFAULT_BUCKETS):
+        metric = Histogram(name, documentation, label_names, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, name, metric_type, documentation, collect):
+        metric = Collector(name, metric_type, documentation, collect)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+
+        lines = []
+        for metric in self._metrics:
+            try:
+                lines.extend(metric.render())
+            except Exception as e:
+                # One broken collector shouldn't take the whole scrape down
+                print(f"Collecting {metric.name} failed: {e}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+# Stages of a chat request: preprocess, form_help, faq_scoring, generation, serialization
+stage_seconds = registry.histogram(
+    "chat_stage_seconds", "Time spent in each stage of answering a chat message.", ["stage"]
+)
+request_seconds = registry.histogram(
+    "chat_request_seconds", "End-to-end handling time of chat requests.", ["endpoint"]
+)
+stream_ttfb_seconds = registry.histogram(
+    "chat_stream_ttfb_seconds", "Time from a /chat/stream request to its first piece of text."
+)
+
+
+@contextmanager
+def timed(stage):
+    """Records the time spent in the with block under chat_stage_seconds{stage=...}."""
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stage_seconds.observe(time.perf_counter() - started, stage)
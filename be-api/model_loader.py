@@ -0,0 +1,233 @@
+# model_loader.py
+
+# Lazy, thread-safe loading of the Blenderbot tokenizer and model. Nothing is
+# loaded at import time: the first code path that needs generation triggers a
+# single load that every other thread waits on, and FAQ-only workers can turn
+# generation off entirely so they never import torch or transformers.
+#
+# With MODEL_QUANTIZE=int8 the Linear layers are dynamically quantized to int8
+# for CPU inference, and the quantized model is cached on disk so later starts
+# don't quantize again.
+
+import os
+import queue
+import threading
+import time
+
+from api.general_config import (
+    GENERATION_ENABLED, MODEL_NAME, MODEL_QUANTIZE, QUANTIZED_MODEL_DIR, TORCH_NUM_THREADS,
+)
+from api.persona import REFUGEE_SUPPORT_PROMPT
+from api.prompt_cache import PromptPrefixCache
+
+# Sampling settings used for every generated reply
+GENERATION_KWARGS = {
+    "max_length": 200,
+    "no_repeat_ngram_size": 3,
+    "do_sample": True,
+    "top_k": 50,
+    "top_p": 0.95,
+    "temperature": 0.7,
+}
+
+
+class GenerationDisabledError(RuntimeError):
+    """Raised when generation is requested on a worker started with GENERATION_ENABLED=false."""
+
+
+class ModelLoader:
+    """Loads a Blenderbot tokenizer and model on first use, exactly once."""
+
+    def __init__(self, model_name, enabled=True, quantize="none", num_threads=0, cache_dir=QUANTIZED_MODEL_DIR,
+                 prompt_prefixes=()):
+        if quantize not in ("none", "int8"):
+            raise ValueError(f"Unknown quantization mode '{quantize}'. Choose 'none' or 'int8'")
+
+        self.model_name = model_name
+        self.enabled = enabled
+        self.quantize = quantize
+        self.num_threads = num_threads
+        self.cache_dir = cache_dir
+        # Prompts starting with one of these only have their remainder tokenized per request
+        self.prefix_cache = PromptPrefixCache(prompt_prefixes)
+        self._lock = threading.Lock()
+        self._tokenizer = None
+        self._model = None
+
+    @property
+    def loaded(self):
+        return self._model is not None
+
+    def load(self):
+        """Returns (tokenizer, model), loading them if this is the first call.
+
+        Concurrent callers block on the same lock, so the weights are only
+        read from disk once however many requests arrive during the load."""
+
+        if not self.enabled:
+            raise GenerationDisabledError("Text generation is disabled on this worker")
+
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    import torch
+                    from transformers import BlenderbotTokenizer
+
+                    if self.num_threads:
+                        torch.set_num_threads(self.num_threads)
+
+                    tokenizer = BlenderbotTokenizer.from_pretrained(self.model_name)
+                    model = self._load_quantized() if self.quantize == "int8" else self._load_full()
+                    model.eval()
+                    self._tokenizer = tokenizer
+                    self._model = model
+
+        return self._tokenizer, self._model
+
+    def _load_full(self):
+        from transformers import BlenderbotForConditionalGeneration
+
+        return BlenderbotForConditionalGeneration.from_pretrained(self.model_name)
+
+    def quantized_cache_path(self):
+        """Cache file for the int8 model. Versions are part of the name because
+        the whole module is pickled, which ties it to the torch/transformers code."""
+
+        import torch
+        import transformers
+
+        name = self.model_name.replace("/", "--")
+        return os.path.join(
+            self.cache_dir, f"{name}-int8-torch{torch.__version__}-transformers{transformers.__version__}.pt"
+        )
+
+    def _load_quantized(self):
+        import torch
+
+        path = self.quantized_cache_path()
+        if os.path.exists(path):
+            # Only ever reads a file this process family wrote itself
+            return torch.load(path, weights_only=False)
+
+        model = torch.ao.quantization.quantize_dynamic(
+            self._load_full().eval(), {torch.nn.Linear}, dtype=torch.qint8
+        )
+
+        # Write to a temporary file first so concurrent workers never read half a model
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        torch.save(model, tmp_path)
+        os.replace(tmp_path, path)
+        return model
+
+    def warm_up_in_background(self):
+        """Starts loading in a daemon thread so the first generation request doesn't pay for it."""
+
+        if not self.enabled or self.loaded:
+            return None
+
+        thread = threading.Thread(target=self._warm_up, name="model-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def _warm_up(self):
+        try:
+            self.load()
+            print(f"Model {self.model_name} loaded in the background")
+        except Exception as e:
+            print(f"Background load of {self.model_name} failed: {e}")
+
+    def encode(self, prompts):
+        """Padded model inputs for a list of prompts, truncated to the model's input size."""
+
+        tokenizer, model = self.load()
+        max_length = getattr(model.config, "max_position_embeddings", None) or tokenizer.model_max_length
+        return self.prefix_cache.encode(tokenizer, prompts, max_length)
+
+    def generate_reply(self, prompt, timeout=None):
+        """Generates and decodes a reply for a full prompt string. timeout is part of
+        ResponsePipeline's generator interface; a running generate call can't be cut short."""
+
+        return self.generate_replies([prompt])[0]
+
+    def generate_replies(self, prompts):
+        """Generates replies for several prompts at once, padded into one batch."""
+
+        import torch
+
+        tokenizer, model = self.load()
+        inputs = self.encode(prompts)
+        with torch.inference_mode():
+            output_ids = model.generate(
+                **inputs,
+                pad_token_id=tokenizer.eos_token_id,
+                **GENERATION_KWARGS
+            )
+        return tokenizer.batch_decode(output_ids, skip_special_tokens=True)
+
+    def stream_reply(self, prompt, stop_event, timeout=None, submit=None, deadline=None):
+        """Starts generating a reply and returns an iterator over its text as it is produced.
+
+        Generation stops early once stop_event is set (e.g. the client went away).
+        timeout is the longest wait for the next piece of text, and deadline (a
+        time.perf_counter() value) the end of the whole reply; past either, the
+        iterator raises queue.Empty. If generation fails, it raises that error
+        once the text produced before the failure is consumed. submit runs the
+        generation in the background and defaults to a new daemon thread."""
+
+        import torch
+        from transformers import StoppingCriteria, StoppingCriteriaList, TextIteratorStreamer
+
+        class StopWhenSet(StoppingCriteria):
+            def __call__(self, input_ids, scores, **kwargs):
+                return stop_event.is_set()
+
+        tokenizer, model = self.load()
+        inputs = self.encode([prompt])
+        streamer = TextIteratorStreamer(tokenizer, skip_prompt=True, skip_special_tokens=True, timeout=timeout)
+        errors = []
+
+        def generate():
+            try:
+                with torch.inference_mode():
+                    model.generate(
+                        **inputs,
+                        pad_token_id=tokenizer.eos_token_id,
+                        streamer=streamer,
+                        stopping_criteria=StoppingCriteriaList([StopWhenSet()]),
+                        **GENERATION_KWARGS
+                    )
+            except Exception as e:
+                errors.append(e)
+                streamer.end()
+
+        def pieces():
+            while True:
+                if deadline is not None:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        raise queue.Empty("The generation budget ran out")
+                    # The streamer reads its timeout on every wait
+                    streamer.timeout = remaining if timeout is None else min(timeout, remaining)
+                try:
+                    piece = next(streamer)
+                except StopIteration:
+                    break
+                yield piece
+            if errors:
+                raise errors[0]
+
+        if submit is None:
+            threading.Thread(target=generate, name="stream-generation", daemon=True).start()
+        else:
+            submit(generate)
+        return pieces()
+
+
+model_loader = ModelLoader(
+    MODEL_NAME,
+    enabled=GENERATION_ENABLED,
+    quantize=MODEL_QUANTIZE,
+    num_threads=TORCH_NUM_THREADS,
+    prompt_prefixes=[REFUGEE_SUPPORT_PROMPT],
+)
@@ -0,0 +1,239 @@
+# normalization.py
+
+# Per-language query normalization: language ID, then the tokenizer, stopwords
+# and stemmer registered for the detected language. preprocess() in app.py
+# runs every message and FAQ key through normalize().
+#
+# Language ID is cheap on purpose: the script decides Arabic, and Latin-script
+# text is scored against a handful of very common function words per language,
+# falling back to English. Stopword lists and stemmers are only loaded the first
+# time a message in that language comes in, and then stay cached, so adding a
+# language costs English traffic nothing.
+
+import re
+import threading
+import unicodedata
+from functools import lru_cache
+
+from api.general_config import LANGUAGE_CACHE_SIZE, LANGUAGES, LEMMA_CACHE_SIZE
+
+DEFAULT_LANGUAGE = "en"
+
+ARABIC_LETTER_RE = re.compile("[\u0600-\u06ff\u0750-\u077f\u08a0-\u08ff]")
+LATIN_LETTER_RE = re.compile("[A-Za-z\u00c0-\u024f]")
+WORD_RE = re.compile(r"\w+")
+
+
+def default_tokenize(text):
+    text = text.lower()
+    text = re.sub(r'[^\w\s]', '', text)  # Remove punctuation
+    return text.split()
+
+
+def french_tokenize(text):
+    # Elided articles and pronouns (l'aide, j'ai, qu'il) become separate words
+    return default_tokenize(re.sub(r"['’]", " ", text))
+
+
+# Alef with hamza/madda/wasla -> bare alef, alef maqsura -> ya, ta marbuta -> ha, tatweel removed
+ARABIC_NORMALIZATION = str.maketrans({
+    "\u0623": "\u0627", "\u0625": "\u0627", "\u0622": "\u0627", "\u0671": "\u0627",
+    "\u0649": "\u064a", "\u0629": "\u0647", "\u0640": None,
+})
+
+
+def arabic_tokenize(text):
+    # Drop the short vowel marks and tatweel and fold the alef/ya/ta marbuta
+    # variants, which users type inconsistently
+    text = "".join(c for c in text if unicodedata.category(c) != "Mn")
+    return default_tokenize(text.translate(ARABIC_NORMALIZATION))
+
+
+class LanguageProfile:
+    """Tokenizer, stopwords and stemmer for one language.
+
+    stopwords and stemmer are zero-argument loaders, called once on first use;
+    a stemmer that should be memoized is returned already wrapped in lru_cache.
+    markers are frequent words of the language, used to detect it."""
+
+    def __init__(self, code, tokenize=default_tokenize, stopwords=None, stemmer=None, markers=()):
+        self.code = code
+        self.tokenize = tokenize
+        self.markers = frozenset(markers)
+        self._load_stopwords = stopwords
+        self._load_stemmer = stemmer
+        self._stopwords = None
+        self._stem = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._stopwords is not None
+
+    def _load(self):
+        with self._lock:
+            if self._stopwords is None:
+                self._stem = self._load_stemmer() if self._load_stemmer else None
+                self._stopwords = frozenset(self._load_stopwords()) if self._load_stopwords else frozenset()
+
+    def normalize(self, text):
+        if self._stopwords is None:
+            self._load()
+        words = [w for w in self.tokenize(text) if w not in self._stopwords]
+        if self._stem:
+            words = [self._stem(w) for w in words]
+        return " ".join(words)
+
+    def cache_info(self):
+        cache_info = getattr(self._stem, "cache_info", None)
+        return cache_info()._asdict() if cache_info else None
+
+
+def nltk_stopwords(language, fallback=(), tokenize=None):
+    """Loader for an NLTK stopword list, falling back to a built-in list when the
+    corpus isn't downloaded (see nltk_download.py). With tokenize, the NLTK words
+    are normalized the same way as the messages they are removed from."""
+
+    def load():
+        from nltk.corpus import stopwords
+        try:
+            words = stopwords.words(language)
+        except (LookupError, OSError):
+            print(f"NLTK stopwords for {language} are not installed, using the built-in list")
+            return fallback
+        return [token for word in words for token in tokenize(word)] if tokenize else words
+    return load
+
+
+def snowball_stemmer(language):
+    def load():
+        from nltk.stem.snowball import SnowballStemmer
+        return lru_cache(maxsize=LEMMA_CACHE_SIZE)(SnowballStemmer(language).stem)
+    return load
+
+
+# Words frequent enough to identify a language in a one-line message. Words
+# that also show up in English messages (un, ma, au, si, ah, oo, ...) are left
+# out of the other lists so that English stays the safe default
+ENGLISH_MARKERS = [
+    "the", "is", "are", "and", "i", "you", "we", "to", "of", "a", "in", "for", "my", "can", "how", "where",
+    "what", "need", "do", "help", "with", "it", "me", "have", "there", "get", "find",
+]
+FRENCH_MARKERS = [
+    "le", "les", "des", "du", "est", "et", "je", "j", "vous", "nous", "pour", "avec", "dans", "une",
+    "mon", "mes", "où", "comment", "quoi", "pas", "besoin", "suis", "sont", "qui", "que", "avez",
+]
+# Used when the NLTK stopword corpora for French and Arabic aren't downloaded
+FRENCH_STOPWORDS = FRENCH_MARKERS + [
+    "la", "de", "d", "l", "qu", "au", "aux", "en", "ce", "il", "elle", "sur", "par", "se", "sa", "son", "ses",
+    "ai", "a", "y", "ne", "me", "te", "moi", "toi", "mais", "ou", "où",
+]
+# Written after ARABIC_NORMALIZATION, since stopwords are removed from normalized tokens
+ARABIC_STOPWORDS = [
+    "في", "من", "علي", "الي", "عن", "مع", "اين", "هل", "ما", "ماذا", "كيف", "متي", "هذا", "هذه", "ذلك",
+    "انا", "انت", "نحن", "هو", "هي", "هم", "ان", "او", "ثم", "لا", "لم", "لن", "قد", "كان", "التي", "الذي",
+]
+SWAHILI_MARKERS = [
+    "na", "ya", "wa", "kwa", "ni", "za", "katika", "kama", "hii", "hiyo", "mimi", "wewe", "yeye", "sisi",
+    "wao", "lakini", "pia", "sana", "kuwa", "hata", "bila", "kwamba", "nina", "ninahitaji", "wapi",
+    "gani", "nini", "je", "msaada", "tafadhali", "naweza",
+]
+SOMALI_MARKERS = [
+    "iyo", "waa", "ayaa", "ka", "ku", "aan", "uu", "ay", "soo", "haddii", "laakiin",
+    "waxaa", "waxa", "ugu", "aad", "maxaa", "xagee", "sidee", "caawimo", "fadlan", "waxaan", "baan",
+]
+
+
+def english_profile(stopwords, lemmatize):
+    """The original English path: NLTK stopwords and WordNet lemmas instead of a stemmer."""
+
+    return LanguageProfile("en", stopwords=lambda: stopwords, stemmer=lambda: lemmatize, markers=ENGLISH_MARKERS)
+
+
+# Swahili and Somali have no NLTK stopword list or Snowball stemmer; their
+# markers double as stopwords and words are left unstemmed
+PROFILES = {
+    "fr": lambda: LanguageProfile(
+        "fr", tokenize=french_tokenize, stopwords=nltk_stopwords("french", FRENCH_STOPWORDS, tokenize=french_tokenize),
+        stemmer=snowball_stemmer("french"), markers=FRENCH_MARKERS,
+    ),
+    "ar": lambda: LanguageProfile(
+        "ar", tokenize=arabic_tokenize, stopwords=nltk_stopwords("arabic", ARABIC_STOPWORDS, tokenize=arabic_tokenize),
+        stemmer=snowball_stemmer("arabic"),
+    ),
+    "sw": lambda: LanguageProfile("sw", stopwords=lambda: SWAHILI_MARKERS, markers=SWAHILI_MARKERS),
+    "so": lambda: LanguageProfile("so", stopwords=lambda: SOMALI_MARKERS, markers=SOMALI_MARKERS),
+}
+
+languages = {}
+
+
+def register_language(profile):
+    """Adds or replaces the profile used for profile.code."""
+
+    languages[profile.code] = profile
+    detect_language.cache_clear()
+
+
+@lru_cache(maxsize=LANGUAGE_CACHE_SIZE)
+def detect_language(text):
+    """ISO 639-1 code of the registered language text is most likely in."""
+
+    arabic = len(ARABIC_LETTER_RE.findall(text))
+    if arabic and "ar" in languages and arabic >= len(LATIN_LETTER_RE.findall(text)):
+        return "ar"
+
+    words = WORD_RE.findall(text.lower())
+    english = languages.get(DEFAULT_LANGUAGE)
+    best, best_hits = DEFAULT_LANGUAGE, sum(w in english.markers for w in words) if english else 0
+    for code, profile in languages.items():
+        if code == DEFAULT_LANGUAGE or not profile.markers:
+            continue
+        hits = sum(w in profile.markers for w in words)
+        if hits > best_hits:
+            best, best_hits = code, hits
+
+    # A single marker word is weak evidence whatever the message length, and
+    # ties already went to English above
+    if best != DEFAULT_LANGUAGE and best_hits < 2:
+        return DEFAULT_LANGUAGE
+    return best
+
+
+def normalize(text):
+    """Tokenizes, removes stopwords and stems text with its language's profile."""
+
+    profile = languages.get(detect_language(text)) or languages[DEFAULT_LANGUAGE]
+    return profile.normalize(text)
+
+
+def normalization_key():
+    """Describes the normalization configuration outside the code: the registered
+    languages and whether the NLTK stopword lists were found or the built-in
+    fallbacks are used. Part of the knowledge base snapshot key."""
+
+    import nltk
+    try:
+        nltk.data.find("corpora/stopwords")
+        nltk_stopwords_found = True
+    except LookupError:
+        nltk_stopwords_found = False
+    return f"languages={','.join(sorted(languages))};nltk={nltk.__version__};nltk_stopwords={nltk_stopwords_found}"
+
+
+def normalization_stats():
+    """Language detection cache counters and the stem caches of the languages loaded so far."""
+
+    return {
+        "language": detect_language.cache_info()._asdict(),
+        # English uses app.py's lemma cache, which cache_stats() already reports
+        "stemmers": {
+            code: profile.cache_info() for code, profile in languages.items()
+            if profile.loaded and code != DEFAULT_LANGUAGE
+        },
+    }
+
+
+for code in LANGUAGES:
+    if code in PROFILES:
+        register_language(PROFILES[code]())
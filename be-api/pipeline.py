@@ -0,0 +1,135 @@
+# pipeline.py
+
+# Tiered response pipeline for the chatbot. Cheap deterministic tiers run first:
+#   1. form help  (get_form_help)
+#   2. FAQ        (the retrieval engine picked for the request)
+#   3. generative (Blenderbot), only when the FAQ confidence is too low
+# Generation runs on a worker thread and is bounded by a per-request time
+# budget; if the budget runs out the best deterministic answer is returned.
+
+import threading
+import time
+from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from api.metrics import timed
+
+TIER_FORM_HELP = "form_help"
+TIER_FAQ = "faq"
+TIER_GENERATIVE = "generative"
+TIER_FALLBACK = "fallback"
+
+# tier: which tier produced the response
+# match: the best FaqMatch found, if the FAQ tier ran and matched anything
+# budget_exceeded: True when generation was attempted but didn't finish in time
+PipelineResult = namedtuple("PipelineResult", ["response", "tier", "match", "budget_exceeded"])
+
+
+class ResponsePipeline:
+    """Runs the form help -> FAQ -> generative tiers and counts which tier answered."""
+
+    def __init__(self, form_help, generator, persona_prompt, fallback_response,
+                 min_confidence=1.0, budget_seconds=10.0, generation_enabled=True, max_workers=1):
+        self.form_help = form_help
+        self.generator = generator
+        self.persona_prompt = persona_prompt
+        self.fallback_response = fallback_response
+        self.min_confidence = min_confidence
+        self.budget_seconds = budget_seconds
+        self.generation_enabled = generation_enabled
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="generation")
+        self._lock = threading.Lock()
+        self._tier_counts = Counter()
+        self._budget_exceeded = 0
+        self._generation_errors = 0
+
+    def build_prompt(self, user_message, history=()):
+        conversation = "\n".join(list(history) + [user_message])
+        return self.persona_prompt + "\n\n" + conversation
+
+    def answer_deterministic(self, user_message, faq_engine, tokens=None):
+        """Runs the cheap tiers. Returns (result, fallback): result is set when one of
+        them answers, otherwise the generative tier should run and fallback is the
+        best deterministic answer to use if generation fails or runs out of time."""
+
+        with timed("form_help"):
+            form_help_response = self.form_help(user_message)
+        if form_help_response:
+            return PipelineResult(form_help_response, TIER_FORM_HELP, None, False), None
+
+        with timed("faq_scoring"):
+            match = faq_engine.match(user_message) if tokens is None else faq_engine.match_tokens(tokens)
+        # Engines scoring on another scale (e.g. cosine similarity) bring their own threshold
+        min_confidence = getattr(faq_engine, "min_confidence", self.min_confidence)
+        if match and (match.score >= min_confidence or not self.generation_enabled):
+            return PipelineResult(match.answer, TIER_FAQ, match, False), None
+
+        if not self.generation_enabled:
+            return self._deterministic(match), None
+        return None, self._deterministic(match)
+
+    def run(self, user_message, faq_engine, history=(), tokens=None):
+        """Answers one message. history is the list of recent turns used for generation,
+        tokens the already preprocessed message if it was done elsewhere."""
+
+        started = time.perf_counter()
+
+        result, fallback = self.answer_deterministic(user_message, faq_engine, tokens)
+        if result:
+            return self.record(result)
+
+        deadline = started + self.budget_seconds
+        remaining = deadline - time.perf_counter()
+        future = self._executor.submit(self._generate, self.build_prompt(user_message, history), deadline)
+        try:
+            with timed("generation"):
+                reply = future.result(timeout=max(remaining, 0))
+            if reply:
+                return self.record(PipelineResult(reply, TIER_GENERATIVE, fallback.match, False))
+        except TimeoutError:
+            # The queued job is dropped; one already running finishes in the background
+            future.cancel()
+            return self.record(fallback._replace(budget_exceeded=True))
+        except Exception as e:
+            print(f"Generation failed, falling back to the deterministic answer: {e}")
+            return self.record(fallback, error=True)
+
+        return self.record(fallback)
+
+    def _generate(self, prompt, deadline):
+        # Runs on a generation worker, possibly after waiting for one to be free.
+        # The generator gets what is left of the budget, so a worker never stays
+        # blocked on a request whose caller has already given up
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            raise TimeoutError("The generation budget ran out before a worker was free")
+        return self.generator(prompt, timeout=remaining)
+
+    def _deterministic(self, match, budget_exceeded=False):
+        if match:
+            return PipelineResult(match.answer, TIER_FAQ, match, budget_exceeded)
+        return PipelineResult(self.fallback_response, TIER_FALLBACK, None, budget_exceeded)
+
+    def record(self, result, error=False):
+        """Counts the tier that answered, and error=True when it did because generation
+        failed. run() calls this itself; callers that produce the reply some other
+        way (e.g. streaming) call it when done."""
+
+        with self._lock:
+            self._tier_counts[result.tier] += 1
+            if result.budget_exceeded:
+                self._budget_exceeded += 1
+            if error:
+                self._generation_errors += 1
+        return result
+
+    def tier_stats(self):
+        """How many requests each tier answered, plus how often generation ran out of
+        budget or failed."""
+
+        with self._lock:
+            stats = {tier: self._tier_counts[tier] for tier in (TIER_FORM_HELP, TIER_FAQ, TIER_GENERATIVE, TIER_FALLBACK)}
+            stats["budget_exceeded"] = self._budget_exceeded
+            stats["generation_errors"] = self._generation_errors
+        return stats
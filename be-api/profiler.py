@@ -0,0 +1,108 @@
+# profiler.py
+
+# Sampling profiler for catching one slow chat request in production. It is
+# armed at runtime (POST /debug/profile) with a latency threshold; while armed,
+# the next request is sampled by a background thread that reads the request
+# thread's stack every PROFILER_INTERVAL_MS. The first request that takes longer
+# than the threshold keeps its profile and disarms the profiler. Faster requests
+# are thrown away and the profiler stays armed.
+#
+# Profiles are in the collapsed-stack format ("outer;inner;leaf count" per
+# line), which flamegraph.pl and speedscope read directly. When the profiler
+# isn't armed, profile() costs a single attribute check.
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+from api.general_config import PROFILER_INTERVAL_MS
+
+
+def frame_name(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+class StackSampler:
+    """Counts the stacks of one thread, sampled at a fixed interval on a daemon thread."""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(frame_name(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def collapsed(self):
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+
+class SlowRequestProfiler:
+    def __init__(self, interval_ms=PROFILER_INTERVAL_MS):
+        self.interval = interval_ms / 1000
+        self.armed = False
+        self.threshold = 0.0
+        self.last_profile = None
+        self._busy = threading.Lock()
+
+    def arm(self, threshold_ms=0):
+        self.threshold = threshold_ms / 1000
+        self.armed = True
+
+    def disarm(self):
+        self.armed = False
+
+    def profile(self, fn, *args, **kwargs):
+        """Calls fn, sampling it if the profiler is armed and not already busy with another request."""
+
+        if not self.armed or not self._busy.acquire(blocking=False):
+            return fn(*args, **kwargs)
+
+        sampler = StackSampler(threading.get_ident(), self.interval)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            sampler.stop()
+            elapsed = time.perf_counter() - started
+            if self.armed and elapsed >= self.threshold:
+                self.armed = False
+                self.last_profile = {
+                    "function": getattr(fn, "__name__", str(fn)),
+                    "duration_ms": round(elapsed * 1000, 1),
+                    "samples": sum(sampler.stacks.values()),
+                    "interval_ms": self.interval * 1000,
+                    "captured_at": time.time(),
+                    "collapsed": sampler.collapsed(),
+                }
+            self._busy.release()
+
+    def status(self):
+        return {
+            "armed": self.armed,
+            "threshold_ms": self.threshold * 1000,
+            "last_profile": self.last_profile,
+        }
+
+
+profiler = SlowRequestProfiler()
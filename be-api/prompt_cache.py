@@ -0,0 +1,102 @@
+# prompt_cache.py
+
+# Token id cache for long, fixed prompt prefixes such as REFUGEE_SUPPORT_PROMPT.
+# The prefix is tokenized once; each request then only tokenizes the part of
+# the prompt that follows it (the conversation tail) and joins the two id lists.
+#
+# Blenderbot's encoder attends in both directions, so the encoder states of the
+# prefix depend on the tail that follows it and can't be reused across requests.
+# Caching the prefix token ids is the part that is safe to share.
+#
+# Tokenizing the two parts separately only gives the same ids as tokenizing the
+# whole prompt if no token spans the boundary. The prefix is cut before its
+# trailing whitespace, where byte-level BPE pre-tokenizers always split, and the
+# first prompt using a prefix is also tokenized in full to check; when the ids
+# differ (e.g. a tokenizer that adds a leading space) that prefix is no longer
+# cached and prompts starting with it are tokenized whole.
+
+import threading
+
+
+class PromptPrefixCache:
+    """Builds model inputs for prompts, reusing the token ids of known prefixes."""
+
+    def __init__(self, prefixes=()):
+        self.prefixes = list(prefixes)
+        self._ids = {}  # prefix -> token ids, or None when they don't join cleanly
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _prefix_ids(self, tokenizer, prefix, tail):
+        # Tail is the rest of the first prompt seen with this prefix, for the check
+        if prefix in self._ids:
+            return self._ids[prefix]
+        with self._lock:
+            if prefix not in self._ids:
+                ids = tokenizer(prefix, add_special_tokens=False)["input_ids"]
+                joined = ids + tokenizer(tail, add_special_tokens=False)["input_ids"]
+                if joined != tokenizer(prefix + tail, add_special_tokens=False)["input_ids"]:
+                    print("Prompt prefix tokens don't join cleanly with the rest of the prompt; not caching them")
+                    ids = None
+                self._ids[prefix] = ids
+            return self._ids[prefix]
+
+    def _split(self, prompt):
+        # Longest registered prefix the prompt starts with, if any, cut before its
+        # trailing whitespace so the tail starts on a token boundary
+        for prefix in sorted(self.prefixes, key=len, reverse=True):
+            if prompt.startswith(prefix):
+                prefix = prefix.rstrip()
+                if prefix:
+                    return prefix, prompt[len(prefix):]
+        return None, prompt
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def token_ids(self, tokenizer, prompt, max_length):
+        """Token ids for one prompt, ending with the tokenizer's eos token.
+
+        When the prompt is too long, the end of the conversation tail is kept
+        and the prefix gives way, since the latest turns matter most for the reply."""
+
+        prefix, tail = self._split(prompt)
+        prefix_ids = None if prefix is None else self._prefix_ids(tokenizer, prefix, tail)
+        self._count(prefix_ids is not None)
+        if prefix_ids is None:
+            prefix_ids, tail = [], prompt
+
+        tail_ids = tokenizer(tail, add_special_tokens=False)["input_ids"]
+        budget = max_length - 1  # room for eos
+        tail_ids = tail_ids[-budget:] if budget > 0 else []
+        prefix_ids = prefix_ids[:budget - len(tail_ids)]
+        return prefix_ids + tail_ids + [tokenizer.eos_token_id]
+
+    def encode(self, tokenizer, prompts, max_length=None):
+        """Padded input_ids/attention_mask tensors for a batch of prompts."""
+
+        import torch
+
+        max_length = max_length or tokenizer.model_max_length
+        rows = [self.token_ids(tokenizer, prompt, max_length) for prompt in prompts]
+        width = max(len(row) for row in rows)
+
+        input_ids = torch.full((len(rows), width), tokenizer.pad_token_id, dtype=torch.long)
+        attention_mask = torch.zeros((len(rows), width), dtype=torch.long)
+        for i, row in enumerate(rows):
+            input_ids[i, :len(row)] = torch.tensor(row, dtype=torch.long)
+            attention_mask[i, :len(row)] = 1
+        return {"input_ids": input_ids, "attention_mask": attention_mask}
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "prefixes": sum(ids is not None for ids in self._ids.values()),
+            }
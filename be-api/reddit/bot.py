@@ -1,7 +1,7 @@
-import praw
-import time
-from settings import reddit
-from text import POST_TITLE, POST_TEXT, DM_SUBJECT, DM_MESSAGE
+from api.reddit.client import get_reddit, reddit_limiter
+from api.reddit.dm_sender import dm_sender
+from api.reddit.rate_limit import call_with_limits, error_types
+from api.reddit.templates import render_post
 from api.general_config import DEBUG
 
 # Subreddits for posting
@@ -23,60 +23,56 @@ NGO_ACCOUNTS_TO_DM = [
 ]
 
 
-def make_post():
-    """Makes a new text post in specified subreddits."""
+def make_post(request=None, client=None, limiter=reddit_limiter, stop_event=None):
+    """Makes a new text post in specified subreddits.
+
+    The post describes `request` (an AidRequest) when given, otherwise it is the
+    general call for opportunities. Returns one result dict per subreddit."""
+
+    client = client or get_reddit()
+    results = []
+    # Rendered once per request (and cached), then posted as is to every subreddit
+    title, text = render_post(request)
 
     print("Attempting to make posts...")
     for subreddit_name in SUBREDDITS_TO_POST_TO:
         try:
-            subreddit = reddit.subreddit(subreddit_name)
-            # Check if the post already exists (simple check, could be more robust)
-            # This is a very basic check. A more robust solution would involve
-            # keeping a record of previous posts (e.g., in a database or file).
-            # For now, let's just assume we post once.
-            
-            # To avoid spamming during development, you might want to uncomment
-            # the following line and comment out the actual submit line.
-            print(f"Would post to r/{subreddit_name} with title: {POST_TITLE}")
-            
-            submission = subreddit.submit(title=POST_TITLE, selftext=POST_TEXT)
+            subreddit = client.subreddit(subreddit_name)
+            print(f"Posting to r/{subreddit_name} with title: {title}")
+
+            submission = call_with_limits(
+                lambda: subreddit.submit(title=title, selftext=text), client, limiter, stop_event
+            )
             print(f"Successfully posted to r/{subreddit_name}. Post ID: {submission.id}")
-            time.sleep(5) # Small delay to respect API limits
-            
-        except praw.exceptions.APIException as e:
-            print(f"Error posting to r/{subreddit_name}: {e}")
-            if "SUBREDDIT_NOTALLOWED" in str(e):
-                print(f"Bot not allowed to post in r/{subreddit_name}. Please check permissions or subreddit rules.")
+            results.append({"subreddit": subreddit_name, "status": "posted", "post_id": submission.id})
 
+        except InterruptedError:
+            raise
         except Exception as e:
-            print(f"An unexpected error occurred while posting to r/{subreddit_name}: {e}")
+            errors = error_types(e)
+            if errors:
+                print(f"Error posting to r/{subreddit_name}: {e}")
+                if "SUBREDDIT_NOTALLOWED" in errors:
+                    print(f"Bot not allowed to post in r/{subreddit_name}. Please check permissions or subreddit rules.")
+            else:
+                print(f"An unexpected error occurred while posting to r/{subreddit_name}: {e}")
+            results.append({"subreddit": subreddit_name, "status": "failed", "error": str(e)})
     print("Finished attempting to make posts.")
+    return results
+
 
 
+def send_dms_to_ngos(array, client=None, request=None):
+    """Sends direct messages to a list of NGO accounts, about `request` if given.
 
-def send_dms_to_ngos(array):
-    """Sends direct messages to a list of NGO accounts."""
+    Accounts that were already sent this message, by this call or an earlier one,
+    are skipped. Returns {"queued": n, "sent": n, "failed": n}."""
 
     print("Attempting to send DMs to NGOs...")
     listed_accounts = array if array else NGO_ACCOUNTS_TO_DM
 
-    for ngo_username in listed_accounts:
-        try:
-            # Replace placeholder in message
-            current_dm_message = DM_MESSAGE.replace("[NGO Account Name/Organization Name]", ngo_username)
-            
-            # Get the redditor object
-            redditor = reddit.redditor(ngo_username)
-            
-            # Send the message
-            redditor.message(subject=DM_SUBJECT, message=current_dm_message)
-            print(f"Successfully sent DM to u/{ngo_username}")
-            time.sleep(5) # Small delay to respect API limits
-        except praw.exceptions.RedditAPIException as e:
-            print(f"Error sending DM to u/{ngo_username}: {e}")
-            if "USER_DOES_NOT_EXIST" in str(e):
-                print(f"u/{ngo_username} does not exist or has blocked DMs.")
-        except Exception as e:
-            print(f"An unexpected error occurred while sending DM to u/{ngo_username}: {e}")
-            
-    print("Finished attempting to send DMs.")
\ No newline at end of file
+    queued = dm_sender.queue(listed_accounts, request)
+    totals = dm_sender.drain(client)
+
+    print("Finished attempting to send DMs.")
+    return {"queued": queued, **totals}
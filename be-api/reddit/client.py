@@ -0,0 +1,54 @@
+# client.py
+
+# The Reddit client and rate limiter shared by everything that talks to Reddit.
+# The client is built on first use from REDDIT_BACKEND:
+#   praw:   the live praw.Reddit client (settings.py)
+#   fake:   in-memory FakeReddit with a request quota and errors (fake.py)
+#   record: praw, recording every call to REDDIT_RECORDING_PATH (replay.py)
+#   replay: answers calls from that recording, offline (replay.py)
+
+import threading
+
+from api.general_config import REDDIT_BACKEND, REDDIT_BURST, REDDIT_RECORDING_PATH, REDDIT_REQUESTS_PER_MINUTE
+from api.reddit.rate_limit import TokenBucket
+
+# One bucket per process, since Reddit counts the quota per OAuth client
+reddit_limiter = TokenBucket(REDDIT_REQUESTS_PER_MINUTE / 60, REDDIT_BURST)
+
+_client = None
+_lock = threading.Lock()
+
+
+class RedditConfigError(ValueError):
+    """Raised when the configured backend can't be built, e.g. the praw credentials are missing."""
+
+
+def create_client(backend=REDDIT_BACKEND, recording_path=REDDIT_RECORDING_PATH):
+    """Builds a Reddit client for one of the backends above."""
+
+    if backend == "fake":
+        from api.reddit.fake import FakeReddit
+        return FakeReddit()
+    if backend == "replay":
+        from api.reddit.replay import ReplayReddit
+        return ReplayReddit(recording_path)
+    if backend in ("praw", "record"):
+        from api.reddit.settings import create_reddit
+        try:
+            client = create_reddit()
+        except ValueError as e:
+            raise RedditConfigError(str(e)) from e
+        if backend == "record":
+            from api.reddit.replay import RecordingReddit
+            client = RecordingReddit(client, recording_path)
+        return client
+    raise RedditConfigError(f"Unknown REDDIT_BACKEND '{backend}'. Choose 'praw', 'fake', 'record' or 'replay'")
+
+
+def get_reddit():
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = create_client()
+    return _client
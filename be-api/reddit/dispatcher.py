@@ -0,0 +1,130 @@
+# dispatcher.py
+
+# Background dispatch of Reddit work for /request-aid. The endpoint only
+# enqueues a job and returns its id; one worker thread drains the queue and
+# makes the API calls under the shared token bucket (client.py), so requests
+# no longer block for the 5 s sleeps between posts and bursts of aid requests
+# can't push the bot past Reddit's quota. Job state is kept in memory and can
+# be polled with GET /request-aid/{job_id}.
+
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from api.general_config import REDDIT_QUEUE_MAX
+from api.reddit import bot
+from api.reddit.dm_sender import dm_sender
+from api.workers import QueueFullError
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class DispatchJob:
+    def __init__(self, kind, payload):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.payload = payload
+        self.status = QUEUED
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.results = None
+        self.error = None
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "results": self.results,
+            "error": self.error,
+        }
+
+
+class RedditDispatcher:
+    """Runs jobs one at a time on a background thread.
+
+    handlers maps a job kind to fn(payload, stop_event) -> results. At most max_queue
+    jobs may wait; the last max_jobs jobs are remembered for status lookups."""
+
+    def __init__(self, handlers, max_queue=REDDIT_QUEUE_MAX, max_jobs=1000):
+        self.handlers = handlers
+        self.max_queue = max_queue
+        self.max_jobs = max_jobs
+        self.jobs = OrderedDict()
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def submit(self, kind, payload):
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind '{kind}'")
+        job = DispatchJob(kind, payload)
+        with self._lock:
+            self.jobs[job.id] = job
+            while len(self.jobs) > self.max_jobs:
+                self.jobs.popitem(last=False)
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                self.jobs.pop(job.id, None)
+            raise QueueFullError(f"The reddit queue is full ({self.max_queue} pending jobs)")
+        return job
+
+    def status(self, job_id):
+        with self._lock:
+            job = self.jobs.get(job_id)
+        return job.to_dict() if job else None
+
+    @property
+    def depth(self):
+        return self._queue.qsize()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="reddit-dispatcher", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                job = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            job.status, job.started = RUNNING, time.time()
+            try:
+                job.results = self.handlers[job.kind](job.payload, self._stop)
+                job.status = DONE
+            except InterruptedError as e:
+                # Shutting down mid-job; the job is reported as failed rather than lost silently
+                job.status, job.error = FAILED, str(e)
+            except Exception as e:
+                print(f"Reddit job {job.id} ({job.kind}) failed: {e}")
+                job.status, job.error = FAILED, str(e)
+            finally:
+                job.finished = time.time()
+
+
+def post_aid_request(request, stop_event):
+    """Posts the request, then queues DMs to the accounts it targets. The DMs are
+    sent by dm_sender, which skips accounts already sent the same message."""
+
+    posts = bot.make_post(request, stop_event=stop_event)
+    dms_queued = dm_sender.queue(getattr(request, "targets_users", None) or bot.NGO_ACCOUNTS_TO_DM, request)
+    return {"posts": posts, "dms_queued": dms_queued}
+
+
+reddit_dispatcher = RedditDispatcher({"post": post_aid_request})
@@ -0,0 +1,344 @@
+# dm_sender.py
+
+# NGO direct messages. Instead of messaging accounts one at a time with a
+# 5 s sleep, DMs go through an outbox in SQLite (DmLedger):
+#   - a DM is identified by (recipient, template hash), the hash of the
+#     templates before any request is filled in, so an account named several
+#     times is messaged once, and an account that already got a message is
+#     never sent it again;
+#   - an account targeted by several aid requests while its DM is still
+#     pending gets one DM covering all of them;
+#   - rows move pending -> sending -> sent/failed, so after a crash the sender
+#     picks up the unsent rows where it stopped;
+#   - a DM that failed for a reason worth retrying goes back to pending with a
+#     not-before time that doubles with every attempt.
+# DmSender drains the outbox with a few worker threads, each taking tokens
+# from the shared Reddit rate limiter, so sends overlap network latency and
+# fill the rate budget without going past it.
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from api.general_config import (
+    REDDIT_DM_LEDGER_PATH, REDDIT_DM_MAX_ATTEMPTS, REDDIT_DM_RETRY_SECONDS, REDDIT_DM_WORKERS,
+)
+from api.reddit.client import RedditConfigError, get_reddit, reddit_limiter
+from api.reddit.rate_limit import call_with_limits, error_types
+from api.reddit.templates import dm_templates, render_dm, request_fields
+
+PENDING, SENDING, SENT, FAILED = "pending", "sending", "sent", "failed"
+
+# Retrying these can't succeed
+PERMANENT_ERRORS = {"USER_DOESNT_EXIST", "NOT_WHITELISTED_BY_USER_MESSAGE", "INVALID_USER"}
+
+# Longest wait of the background sender after a drain that failed
+MAX_DRAIN_BACKOFF_SECONDS = 300.0
+
+
+def template_hash(subject, template):
+    """Identifies a message independently of its recipient and requests: the sources of
+    the subject and body templates, with every field still open."""
+
+    return hashlib.sha1(f"{subject}\0{template}".encode("utf-8")).hexdigest()
+
+
+class DmLedger:
+    """Outbox and record of sent DMs, one row per (recipient, template hash)."""
+
+    def __init__(self, path=REDDIT_DM_LEDGER_PATH, max_attempts=REDDIT_DM_MAX_ATTEMPTS,
+                 retry_seconds=REDDIT_DM_RETRY_SECONDS, clock=time.time):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.retry_seconds = retry_seconds
+        self.clock = clock
+        self._local = threading.local()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS dms (
+                    recipient TEXT NOT NULL,
+                    template_hash TEXT NOT NULL,
+                    username TEXT NOT NULL,
+                    subject TEXT NOT NULL,
+                    message TEXT NOT NULL,
+                    requests TEXT NOT NULL DEFAULT '[]',
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    queued_at REAL NOT NULL,
+                    not_before REAL NOT NULL DEFAULT 0,
+                    sent_at REAL,
+                    PRIMARY KEY (recipient, template_hash)
+                );
+                CREATE INDEX IF NOT EXISTS dms_status ON dms (status, queued_at);
+            """)
+            # Outboxes created before retries were delayed or requests merged
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(dms)")]
+            if "not_before" not in columns:
+                conn.execute("ALTER TABLE dms ADD COLUMN not_before REAL NOT NULL DEFAULT 0")
+            if "requests" not in columns:
+                conn.execute("ALTER TABLE dms ADD COLUMN requests TEXT NOT NULL DEFAULT '[]'")
+
+    def _connection(self):
+        # sqlite3 connections can't be shared between threads, so keep one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def enqueue(self, usernames, digest, request, render):
+        """Adds a DM with template hash `digest` about `request` (a JSON-able record, None
+        for the general DM) to the outbox for each username.
+
+        A recipient whose DM is still pending gets the request merged into it; one that
+        was sent it, or is being sent it, is skipped. render(username, requests) returns
+        the (subject, message) for a list of requests. Returns how many DMs were added
+        or changed."""
+
+        now = self.clock()
+        changed = 0
+        conn = self._connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for username in usernames:
+                recipient = username.lower()
+                row = conn.execute(
+                    "SELECT status, requests FROM dms WHERE recipient = ? AND template_hash = ?", (recipient, digest),
+                ).fetchone()
+                if row is None:
+                    requests = [request] if request is not None else []
+                    subject, message = render(username, requests)
+                    conn.execute(
+                        "INSERT INTO dms (recipient, template_hash, username, subject, message, requests, status, "
+                        "queued_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (recipient, digest, username, subject, message, json.dumps(requests), PENDING, now),
+                    )
+                else:
+                    status, requests = row[0], json.loads(row[1])
+                    if status != PENDING or request is None or request in requests:
+                        continue
+                    requests.append(request)
+                    subject, message = render(username, requests)
+                    conn.execute(
+                        "UPDATE dms SET subject = ?, message = ?, requests = ? WHERE recipient = ? AND template_hash = ?",
+                        (subject, message, json.dumps(requests), recipient, digest),
+                    )
+                changed += 1
+        return changed
+
+    def claim(self, limit):
+        """Marks up to `limit` pending rows that are due as sending and returns them, oldest first."""
+
+        conn = self._connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                "SELECT recipient, template_hash, username, subject, message FROM dms "
+                "WHERE status = ? AND not_before <= ? ORDER BY queued_at LIMIT ?",
+                (PENDING, self.clock(), limit),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE dms SET status = ?, attempts = attempts + 1 WHERE recipient = ? AND template_hash = ?",
+                [(SENDING, recipient, digest) for recipient, digest, *_ in rows],
+            )
+        return rows
+
+    def mark_sent(self, recipient, digest):
+        with self._connection() as conn:
+            conn.execute(
+                "UPDATE dms SET status = ?, sent_at = ?, error = NULL WHERE recipient = ? AND template_hash = ?",
+                (SENT, self.clock(), recipient, digest),
+            )
+
+    def mark_failed(self, recipient, digest, error, retry=True):
+        """Puts the row back in the outbox, due after retry_seconds * 2^(attempts - 1),
+        or fails it for good when retry is False or it has used up max_attempts."""
+
+        with self._connection() as conn:
+            conn.execute(
+                "UPDATE dms SET status = CASE WHEN ? AND attempts < ? THEN ? ELSE ? END, error = ?, "
+                "not_before = ? + ? * (1 << MAX(attempts - 1, 0)) "
+                "WHERE recipient = ? AND template_hash = ?",
+                (retry, self.max_attempts, PENDING, FAILED, error, self.clock(), self.retry_seconds,
+                 recipient, digest),
+            )
+
+    def release(self, recipient, digest):
+        """Returns a claimed row to the outbox without counting the attempt."""
+
+        with self._connection() as conn:
+            conn.execute(
+                "UPDATE dms SET status = ?, attempts = attempts - 1 WHERE recipient = ? AND template_hash = ?",
+                (PENDING, recipient, digest),
+            )
+
+    def recover(self):
+        """Requeues rows left in sending by a crashed sender. Whether Reddit got those
+        messages is unknown; at most one DM per worker can be sent twice this way."""
+
+        with self._connection() as conn:
+            return conn.execute("UPDATE dms SET status = ? WHERE status = ?", (PENDING, SENDING)).rowcount
+
+    def next_due(self):
+        """Seconds until the next pending row is due (0 if one already is), or None if none is pending."""
+
+        row = self._connection().execute(
+            "SELECT MIN(not_before) FROM dms WHERE status = ?", (PENDING,),
+        ).fetchone()
+        return None if row[0] is None else max(row[0] - self.clock(), 0.0)
+
+    def status(self, username, digest):
+        row = self._connection().execute(
+            "SELECT status FROM dms WHERE recipient = ? AND template_hash = ?", (username.lower(), digest),
+        ).fetchone()
+        return row[0] if row else None
+
+    def counts(self):
+        rows = self._connection().execute("SELECT status, COUNT(*) FROM dms GROUP BY status").fetchall()
+        return {status: 0 for status in (PENDING, SENDING, SENT, FAILED)} | dict(rows)
+
+
+class DmSender:
+    """Sends the outbox of a DmLedger through a Reddit client, within a rate limiter.
+
+    drain() sends everything pending and returns; start() runs a background thread
+    that drains whenever queue() adds something."""
+
+    def __init__(self, ledger_path=REDDIT_DM_LEDGER_PATH, client=None, limiter=reddit_limiter,
+                 workers=REDDIT_DM_WORKERS):
+        self.ledger_path = ledger_path
+        self.client = client
+        self.limiter = limiter
+        self.workers = workers
+        self._ledger = None
+        self._ledger_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def ledger(self):
+        # Opened on first use so importing the bot doesn't create the database
+        if self._ledger is None:
+            with self._ledger_lock:
+                if self._ledger is None:
+                    self._ledger = DmLedger(self.ledger_path)
+        return self._ledger
+
+    def queue(self, usernames, request=None):
+        """Adds a DM about `request` (the general one without) for each username to the
+        outbox, or merges the request into a DM still pending for them; returns how
+        many DMs were added or changed."""
+
+        record = request_fields(request)
+        subject_template, body_template = dm_templates([record] if record else [])
+        digest = template_hash(subject_template.source, body_template.source)
+
+        def render(username, requests):
+            subject, body = render_dm(requests)
+            return subject, body.render({"recipient": username})
+
+        unique = {username.lower(): username for username in usernames if username}
+        changed = self.ledger.enqueue(unique.values(), digest, record, render)
+        if changed:
+            self._wake.set()
+        return changed
+
+    def drain(self, client=None, stop_event=None):
+        """Sends the pending DMs that are due until none is left. Returns {"sent": n, "failed": n}.
+
+        The Reddit client is only built once there is something to send; a
+        RedditConfigError from building it is raised with the claimed rows put back."""
+
+        stop_event = stop_event or self._stop
+        totals = {SENT: 0, FAILED: 0}
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="reddit-dm") as executor:
+            while not stop_event.is_set():
+                batch = self.ledger.claim(self.workers * 4)
+                if not batch:
+                    break
+                try:
+                    client = client or self.client or get_reddit()
+                except RedditConfigError:
+                    for recipient, digest, *_ in batch:
+                        self.ledger.release(recipient, digest)
+                    raise
+                for outcome in executor.map(lambda row: self._send(row, client, stop_event), batch):
+                    if outcome in totals:
+                        totals[outcome] += 1
+        return totals
+
+    def _send(self, row, client, stop_event):
+        recipient, digest, username, subject, message = row
+        try:
+            call_with_limits(
+                lambda: client.redditor(username).message(subject=subject, message=message),
+                client, self.limiter, stop_event,
+            )
+        except InterruptedError:
+            self.ledger.release(recipient, digest)
+            return None
+        except Exception as e:
+            errors = error_types(e)
+            permanent = bool(PERMANENT_ERRORS.intersection(errors))
+            if permanent:
+                print(f"u/{username} does not exist or has blocked DMs.")
+            else:
+                print(f"Error sending DM to u/{username}: {e}")
+            self.ledger.mark_failed(recipient, digest, str(e), retry=not permanent)
+            return FAILED
+        self.ledger.mark_sent(recipient, digest)
+        print(f"Successfully sent DM to u/{username}")
+        return SENT
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            # Rows a previous process was sending when it died go back in the outbox
+            recovered = self.ledger.recover()
+            if recovered:
+                print(f"Resuming {recovered} DMs interrupted by the last shutdown")
+            self._wake.set()
+            self._thread = threading.Thread(target=self._run, name="reddit-dm-sender", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        failures = 0
+        while not self._stop.is_set():
+            # Wakes up for new DMs, or when a delayed retry is due
+            self._wake.wait(self.ledger.next_due())
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                self.drain()
+                failures = 0
+            except RedditConfigError as e:
+                # Retrying can't help until the server is reconfigured and restarted
+                print(f"DM sender stopped, the Reddit client can't be built: {e}")
+                return
+            except Exception as e:
+                failures += 1
+                backoff = min(5 * 2 ** (failures - 1), MAX_DRAIN_BACKOFF_SECONDS)
+                print(f"DM sender stopped draining, retrying in {backoff:.0f}s: {e}")
+                self._stop.wait(backoff)
+                self._wake.set()
+
+
+dm_sender = DmSender()
@@ -0,0 +1,120 @@
+# fake.py
+
+# In-memory stand-in for praw.Reddit, used with REDDIT_BACKEND=fake so the aid
+# dispatch path runs offline. It implements the parts of PRAW the bot uses
+# (subreddit().submit, redditor().message, auth.limits) and enforces a request
+# quota per window the way Reddit does, answering RATELIMIT once it is spent.
+
+import itertools
+import threading
+import time
+
+
+class FakeErrorItem:
+    def __init__(self, error_type, message, field=None):
+        self.error_type = error_type
+        self.message = message
+        self.field = field
+
+
+class FakeRedditAPIException(Exception):
+    """Shaped like praw.exceptions.RedditAPIException: the errors are in .items."""
+
+    def __init__(self, error_type, message):
+        super().__init__(f"{error_type}: '{message}'")
+        self.items = [FakeErrorItem(error_type, message)]
+
+
+class FakeSubmission:
+    def __init__(self, id, subreddit, title, selftext):
+        self.id = id
+        self.subreddit = subreddit
+        self.title = title
+        self.selftext = selftext
+
+
+class FakeSubreddit:
+    def __init__(self, reddit, name):
+        self.reddit = reddit
+        self.display_name = name
+
+    def submit(self, title, selftext=""):
+        self.reddit._call()
+        if self.display_name in self.reddit.banned_subreddits:
+            raise FakeRedditAPIException("SUBREDDIT_NOTALLOWED", "you aren't allowed to post there.")
+        submission = FakeSubmission(f"fake{next(self.reddit._ids)}", self.display_name, title, selftext)
+        with self.reddit._lock:
+            self.reddit.submissions.append(submission)
+        return submission
+
+
+class FakeRedditor:
+    def __init__(self, reddit, name):
+        self.reddit = reddit
+        self.name = name
+
+    def message(self, subject, message):
+        self.reddit._call()
+        if self.name in self.reddit.missing_users:
+            raise FakeRedditAPIException("USER_DOESNT_EXIST", "that user doesn't exist")
+        with self.reddit._lock:
+            self.reddit.messages.append((self.name, subject, message))
+
+
+class FakeAuth:
+    def __init__(self):
+        self.limits = {"remaining": None, "reset_timestamp": None, "used": None}
+
+
+class FakeReddit:
+    """Records submissions and messages instead of sending them.
+
+    At most `requests_per_window` calls are accepted per `window_seconds`; past
+    that, calls fail with RATELIMIT until the window resets, and auth.limits
+    reports the quota like Reddit's X-Ratelimit-* headers."""
+
+    def __init__(self, requests_per_window=100, window_seconds=60.0, latency=0.0, clock=time.time,
+                 banned_subreddits=(), missing_users=()):
+        self.requests_per_window = requests_per_window
+        self.window_seconds = window_seconds
+        self.latency = latency
+        self.clock = clock
+        self.banned_subreddits = set(banned_subreddits)
+        self.missing_users = set(missing_users)
+        self.auth = FakeAuth()
+        self.submissions = []
+        self.messages = []
+        self.calls = 0
+        self.rate_limited = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._window_start = clock()
+        self._used = 0
+
+    def subreddit(self, name):
+        return FakeSubreddit(self, name)
+
+    def redditor(self, name):
+        return FakeRedditor(self, name)
+
+    def _call(self):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            now = self.clock()
+            if now - self._window_start >= self.window_seconds:
+                self._window_start, self._used = now, 0
+            reset_in = self._window_start + self.window_seconds - now
+            self.calls += 1
+            if self._used >= self.requests_per_window:
+                self.rate_limited += 1
+                self.auth.limits = {"remaining": 0, "reset_timestamp": time.time() + reset_in, "used": self._used}
+                raise FakeRedditAPIException(
+                    "RATELIMIT", f"Take a break for {max(int(reset_in), 1)} seconds before trying again."
+                )
+            self._used += 1
+            self.auth.limits = {
+                "remaining": self.requests_per_window - self._used,
+                "reset_timestamp": time.time() + reset_in,
+                "used": self._used,
+            }
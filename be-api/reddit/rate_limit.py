@@ -0,0 +1,140 @@
+# rate_limit.py
+
+# Token bucket for Reddit API calls. Instead of sleeping a fixed 5 s between
+# calls, every call takes a token; tokens refill at the configured rate, and
+# after each call the bucket follows the rate-limit state Reddit reports
+# (X-Ratelimit-Remaining / X-Ratelimit-Reset, which PRAW exposes as
+# reddit.auth.limits): when the server has little quota left, the remaining
+# calls are spread over the time until its window resets.
+
+import re
+import threading
+import time
+
+from api.general_config import REDDIT_MAX_ATTEMPTS
+
+
+class TokenBucket:
+    """Blocking token bucket; rate is in tokens per second."""
+
+    def __init__(self, rate, capacity, clock=time.monotonic, sleep=time.sleep):
+        self.base_rate = rate
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.clock = clock
+        self.sleep = sleep
+        self._updated = clock()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self):
+        """Seconds until a token is available."""
+
+        with self._lock:
+            now = self.clock()
+            self._refill(now)
+            wait = max(self._blocked_until - now, 0.0)
+            if self.tokens < 1:
+                wait = max(wait, (1 - self.tokens) / self.rate if self.rate > 0 else float("inf"))
+            return wait
+
+    def try_acquire(self):
+        with self._lock:
+            now = self.clock()
+            self._refill(now)
+            if now < self._blocked_until or self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+    def acquire(self, stop_event=None):
+        """Blocks until a token is taken. Returns the seconds spent waiting, or None if
+        stop_event was set while waiting."""
+
+        waited = 0.0
+        while not self.try_acquire():
+            wait = min(self.wait_time(), 60.0) or 0.001
+            if stop_event is not None:
+                if stop_event.wait(wait):
+                    return None
+            else:
+                self.sleep(wait)
+            waited += wait
+        return waited
+
+    def pause(self, seconds):
+        """Takes no tokens out for the next `seconds` (e.g. Reddit answered RATELIMIT)."""
+
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, self.clock() + seconds)
+
+    def update_from_limits(self, remaining, reset_seconds):
+        """Follows the server's view: at most `remaining` calls in the next `reset_seconds`."""
+
+        if remaining is None or reset_seconds is None:
+            return
+        with self._lock:
+            self._refill(self.clock())
+            if remaining < 1:
+                self._blocked_until = max(self._blocked_until, self.clock() + reset_seconds)
+                self.rate = self.base_rate
+                return
+            # Never faster than configured, slower when the server's window is nearly spent
+            self.rate = min(self.base_rate, remaining / max(reset_seconds, 1.0))
+            self.tokens = min(self.tokens, remaining)
+
+    def follow(self, client):
+        """Reads the rate-limit state of a PRAW-like client (client.auth.limits)."""
+
+        limits = getattr(getattr(client, "auth", None), "limits", None) or {}
+        reset_timestamp = limits.get("reset_timestamp")
+        reset_seconds = max(reset_timestamp - time.time(), 0.0) if reset_timestamp else None
+        self.update_from_limits(limits.get("remaining"), reset_seconds)
+
+
+def error_types(error):
+    """Reddit error codes (RATELIMIT, SUBREDDIT_NOTALLOWED, ...) carried by an API exception.
+
+    PRAW's RedditAPIException keeps them in .items; older APIException has .error_type."""
+
+    items = getattr(error, "items", None)
+    if items:
+        return [item.error_type for item in items]
+    error_type = getattr(error, "error_type", None)
+    return [error_type] if error_type else []
+
+
+def retry_after(error, default=60.0):
+    """Seconds Reddit asked us to wait in a RATELIMIT error ("...try again in 9 minutes")."""
+
+    found = re.search(r"(\d+)\s*(millisecond|second|minute)", str(error))
+    if not found:
+        return default
+    amount, unit = int(found.group(1)), found.group(2)
+    return amount * {"millisecond": 0.001, "second": 1, "minute": 60}[unit]
+
+
+def call_with_limits(call, client, limiter, stop_event=None, max_attempts=REDDIT_MAX_ATTEMPTS):
+    """Runs one Reddit API call under the rate limiter, retrying when Reddit answers
+    RATELIMIT. Returns the call's result; other API errors are raised."""
+
+    for attempt in range(1, max_attempts + 1):
+        if limiter.acquire(stop_event) is None:
+            raise InterruptedError("Stopped while waiting for the rate limiter")
+        try:
+            result = call()
+        except Exception as e:
+            if "RATELIMIT" not in error_types(e) or attempt == max_attempts:
+                raise
+            wait = retry_after(e)
+            print(f"Reddit rate limit hit, waiting {wait:.0f}s before retrying")
+            limiter.pause(wait)
+        else:
+            return result
+        finally:
+            limiter.follow(client)
@@ -0,0 +1,161 @@
+# replay.py
+
+# Record/replay backends for the Reddit client. RecordingReddit wraps a real
+# (or fake) client and appends every submit/message call to a JSON-lines file:
+# its target, latency, outcome (id or Reddit error) and the rate-limit state
+# reported after it. ReplayReddit plays such a file back offline, with the same
+# errors, limits and (scaled) latencies, so a session captured once against
+# Reddit can be rerun in benchmarks without network access.
+
+import json
+import threading
+import time
+from collections import defaultdict, deque
+
+from api.reddit.fake import FakeAuth, FakeRedditAPIException, FakeSubmission
+from api.reddit.rate_limit import error_types
+
+
+class RecordingReddit:
+    """Passes calls through to `client` and writes one JSON line per call to `path`."""
+
+    def __init__(self, client, path):
+        self.client = client
+        self.path = path
+        self._lock = threading.Lock()
+
+    @property
+    def auth(self):
+        return self.client.auth
+
+    def subreddit(self, name):
+        subreddit = self.client.subreddit(name)
+        return _RecordingTarget(self, "submit", name, subreddit.submit)
+
+    def redditor(self, name):
+        redditor = self.client.redditor(name)
+        return _RecordingTarget(self, "message", name, redditor.message)
+
+    def _record(self, call, target, started, result=None, error=None):
+        entry = {"call": call, "target": target, "latency": time.perf_counter() - started}
+        if error is None:
+            entry["id"] = getattr(result, "id", None)
+        else:
+            items = getattr(error, "items", None)
+            entry["error_type"] = (error_types(error) or [None])[0]
+            entry["error_message"] = items[0].message if items else str(error)
+        limits = dict(getattr(self.client.auth, "limits", None) or {})
+        if limits.get("reset_timestamp"):
+            # Stored relative to the call, so a replay can rebase it on its own clock
+            limits["reset_in"] = max(limits.pop("reset_timestamp") - time.time(), 0.0)
+        entry["limits"] = limits
+        with self._lock, open(self.path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(entry) + "\n")
+
+
+class _RecordingTarget:
+    def __init__(self, reddit, call, name, method):
+        self.reddit = reddit
+        self.call = call
+        self.name = name
+        self.method = method
+        self.display_name = name
+
+    def _invoke(self, **kwargs):
+        started = time.perf_counter()
+        try:
+            result = self.method(**kwargs)
+        except Exception as e:
+            self.reddit._record(self.call, self.name, started, error=e)
+            raise
+        self.reddit._record(self.call, self.name, started, result=result)
+        return result
+
+    def submit(self, title, selftext=""):
+        return self._invoke(title=title, selftext=selftext)
+
+    def message(self, subject, message):
+        return self._invoke(subject=subject, message=message)
+
+
+class ReplayReddit:
+    """Answers submit/message calls from a recording, in recorded order per target.
+
+    latency_scale multiplies the recorded latencies (0 replays instantly). With
+    loop=True a target's outcomes repeat once used up, and targets missing from
+    the recording borrow the outcomes of any recorded target of the same call;
+    otherwise running past the recording raises LookupError."""
+
+    def __init__(self, path, latency_scale=1.0, loop=False):
+        self.path = path
+        self.latency_scale = latency_scale
+        self.loop = loop
+        self.auth = FakeAuth()
+        self.submissions = []
+        self.messages = []
+        self._entries = defaultdict(deque)
+        self._by_call = defaultdict(list)
+        self._lock = threading.Lock()
+
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries[(entry["call"], entry["target"])].append(entry)
+                    self._by_call[entry["call"]].append(entry)
+        self._cycle = {call: 0 for call in self._by_call}
+
+    def subreddit(self, name):
+        return _ReplayTarget(self, "submit", name)
+
+    def redditor(self, name):
+        return _ReplayTarget(self, "message", name)
+
+    def _next(self, call, target):
+        with self._lock:
+            entries = self._entries.get((call, target))
+            if entries:
+                entry = entries.popleft()
+                if self.loop:
+                    entries.append(entry)
+                return entry
+            if self.loop and self._by_call.get(call):
+                recorded = self._by_call[call]
+                entry = recorded[self._cycle[call] % len(recorded)]
+                self._cycle[call] += 1
+                return entry
+        raise LookupError(f"No recorded {call} call left for '{target}' in {self.path}")
+
+    def _play(self, call, target):
+        entry = self._next(call, target)
+        if self.latency_scale:
+            time.sleep(entry["latency"] * self.latency_scale)
+        limits = dict(entry.get("limits") or {})
+        if "reset_in" in limits:
+            limits["reset_timestamp"] = time.time() + limits.pop("reset_in")
+        self.auth.limits = limits
+        if "error_message" in entry:
+            if entry.get("error_type"):
+                raise FakeRedditAPIException(entry["error_type"], entry["error_message"])
+            raise RuntimeError(entry["error_message"])
+        return entry
+
+
+class _ReplayTarget:
+    def __init__(self, reddit, call, name):
+        self.reddit = reddit
+        self.call = call
+        self.name = name
+        self.display_name = name
+
+    def submit(self, title, selftext=""):
+        entry = self.reddit._play(self.call, self.name)
+        submission = FakeSubmission(entry.get("id"), self.name, title, selftext)
+        with self.reddit._lock:
+            self.reddit.submissions.append(submission)
+        return submission
+
+    def message(self, subject, message):
+        self.reddit._play(self.call, self.name)
+        with self.reddit._lock:
+            self.reddit.messages.append((self.name, subject, message))
@@ -1,6 +1,5 @@
 
 import os
-import praw
 from api.general_config import app_id
 
 # --- CONFIGURATION ---
@@ -21,16 +20,22 @@ required_credentials = [
     "REDDIT_PASSWORD",
 ]
 
-not_filled = [cred for cred in required_credentials if not os.environ.get(cred)]
-if not_filled:
-    raise ValueError(f"Missing required environment variables: {', '.join(not_filled)}")
 
+def create_reddit():
+    """Builds the PRAW client. Called on first use rather than at import, so the
+    rest of the bot can be imported (and run against the fake) without credentials."""
 
-# --- PRAW Setup ---
-reddit = praw.Reddit(
-    client_id=REDDIT_CLIENT_ID,
-    client_secret=REDDIT_CLIENT_SECRET,
-    username=REDDIT_USERNAME,
-    password=REDDIT_PASSWORD,
-    user_agent=REDDIT_USER_AGENT,
-)
+    not_filled = [cred for cred in required_credentials if not os.environ.get(cred)]
+    if not_filled:
+        raise ValueError(f"Missing required environment variables: {', '.join(not_filled)}")
+
+    import praw
+
+    # --- PRAW Setup ---
+    return praw.Reddit(
+        client_id=REDDIT_CLIENT_ID,
+        client_secret=REDDIT_CLIENT_SECRET,
+        username=REDDIT_USERNAME,
+        password=REDDIT_PASSWORD,
+        user_agent=REDDIT_USER_AGENT,
+    )
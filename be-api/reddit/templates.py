@@ -0,0 +1,182 @@
+# templates.py
+
+# Rendering of aid request posts and DMs. The sources in text.py are
+# string.Template strings; each is parsed once into literal text and $fields
+# (CompiledTemplate), so rendering is a join instead of a scan. Rendered
+# bodies are kept in an LRU keyed by (template, request hash): posting one
+# request to every subreddit and messaging every NGO renders its body once.
+# DM bodies are cached with ${recipient} still open, so each extra recipient
+# only costs filling in one field. One DM can cover several aid requests for
+# the same NGO (see dm_sender.py). Post titles and DM subjects are kept within
+# Reddit's length limits by shortening the list of target groups.
+
+import hashlib
+import json
+import string
+import threading
+from collections import OrderedDict
+
+from api.general_config import REDDIT_TEMPLATE_CACHE_SIZE
+from api.reddit.text import (
+    AID_DM_MESSAGE, AID_DM_SUBJECT, AID_POST_TEXT, AID_POST_TITLE, DM_MESSAGE, DM_SUBJECT, POST_TEXT, POST_TITLE,
+)
+
+
+class CompiledTemplate:
+    """A string.Template source split once into literal chunks and the field names between them."""
+
+    def __init__(self, source):
+        self.source = source
+        self.literals, self.fields = [], []
+        literal, position = [], 0
+        for match in string.Template.pattern.finditer(source):
+            literal.append(source[position:match.start()])
+            position = match.end()
+            if match.group("escaped") is not None:
+                literal.append("$")
+            elif match.group("named") or match.group("braced"):
+                self.literals.append("".join(literal))
+                self.fields.append(match.group("named") or match.group("braced"))
+                literal = []
+            else:
+                raise ValueError(f"Invalid placeholder in template at position {match.start()}")
+        literal.append(source[position:])
+        self.literals.append("".join(literal))
+        self.digest = hashlib.sha1(source.encode("utf-8")).hexdigest()
+
+    def render(self, values):
+        """Like Template.substitute: every field must have a value."""
+
+        if not self.fields:
+            return self.literals[0]
+        parts = [self.literals[0]]
+        for field, literal in zip(self.fields, self.literals[1:]):
+            parts.append(str(values[field]))
+            parts.append(literal)
+        return "".join(parts)
+
+    def fill(self, values):
+        """A template with the fields in `values` filled in and the others left open."""
+
+        source = [self.literals[0].replace("$", "$$")]
+        for field, literal in zip(self.fields, self.literals[1:]):
+            source.append(str(values[field]).replace("$", "$$") if field in values else "${" + field + "}")
+            source.append(literal.replace("$", "$$"))
+        return CompiledTemplate("".join(source))
+
+
+POST_TEMPLATES = (CompiledTemplate(POST_TITLE), CompiledTemplate(POST_TEXT))
+DM_TEMPLATES = (CompiledTemplate(DM_SUBJECT), CompiledTemplate(DM_MESSAGE))
+AID_POST_TEMPLATES = (CompiledTemplate(AID_POST_TITLE), CompiledTemplate(AID_POST_TEXT))
+AID_DM_TEMPLATES = (CompiledTemplate(AID_DM_SUBJECT), CompiledTemplate(AID_DM_MESSAGE))
+
+# Reddit rejects longer post titles and message subjects
+POST_TITLE_MAX_LENGTH = 300
+DM_SUBJECT_MAX_LENGTH = 100
+
+
+def request_fields(request):
+    """Details and target groups of an AidRequest (or a dict with the same keys, such as
+    this function's own output); None without a request."""
+
+    if request is None:
+        return None
+    get = request.get if isinstance(request, dict) else lambda name: getattr(request, name, None)
+    return {
+        "details": (get("details") or "").strip(),
+        "target_groups": [str(group) for group in get("target_groups") or []],
+    }
+
+
+def join_groups(groups, max_length=None):
+    """The target groups as "a, b and 3 more", within max_length characters."""
+
+    text = ", ".join(groups) or "refugees"
+    if max_length is None or len(text) <= max_length:
+        return text
+    for count in range(len(groups) - 1, 0, -1):
+        text = f"{', '.join(groups[:count])} and {len(groups) - count} more"
+        if len(text) <= max_length:
+            return text
+    return f"{len(groups)} groups"[:max_length]
+
+
+def template_values(records, max_groups_length=None):
+    """Template fields for one or more request_fields() records: their details and
+    the target groups of all of them."""
+
+    details = [record["details"] for record in records]
+    groups = list(dict.fromkeys(group for record in records for group in record["target_groups"]))
+    return {
+        "details": details[0] if len(details) == 1 else "\n\n".join(f"* {detail}" for detail in details),
+        "target_groups": join_groups(groups, max_groups_length),
+    }
+
+
+def request_key(fields):
+    return hashlib.sha1(json.dumps(fields, sort_keys=True).encode("utf-8")).hexdigest() if fields else ""
+
+
+class RenderCache:
+    """LRU of templates filled in with one request's fields, keyed by (template, request hash)."""
+
+    def __init__(self, max_entries=REDDIT_TEMPLATE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, template, fields, key):
+        cache_key = (template.digest, key)
+        with self._lock:
+            filled = self._entries.get(cache_key)
+            if filled is not None:
+                self._entries.move_to_end(cache_key)
+                self.hits += 1
+                return filled
+            self.misses += 1
+        filled = template.fill(fields) if fields else template
+        with self._lock:
+            self._entries[cache_key] = filled
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return filled
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "currsize": len(self._entries), "maxsize": self.max_entries}
+
+
+render_cache = RenderCache()
+
+
+def _filled(template, records, max_length=None):
+    if not records:
+        return template
+    # The title and subject templates have target_groups as their only field
+    room = None if max_length is None else max_length - sum(len(literal) for literal in template.literals)
+    fields = template_values(records, room)
+    return render_cache.get(template, fields, request_key(fields))
+
+
+def render_post(request=None):
+    """(title, text) of the post for an aid request, or the general post without one."""
+
+    records = [request_fields(request)] if request is not None else []
+    title, text = AID_POST_TEMPLATES if records else POST_TEMPLATES
+    return _filled(title, records, POST_TITLE_MAX_LENGTH).render({}), _filled(text, records).render({})
+
+
+def dm_templates(requests=()):
+    """The (subject, body) templates render_dm() fills for these requests."""
+
+    return AID_DM_TEMPLATES if requests else DM_TEMPLATES
+
+
+def render_dm(requests=()):
+    """(subject, body) of one DM about all of `requests` (AidRequests or request_fields()
+    records), or the general DM without any; body still has ${recipient} open."""
+
+    records = [request_fields(request) for request in requests]
+    subject, body = dm_templates(records)
+    return _filled(subject, records, DM_SUBJECT_MAX_LENGTH).render({}), _filled(body, records)
@@ -0,0 +1,147 @@
+import pytest
+
+from api.reddit import dm_sender as dm_sender_module
+from api.reddit.client import RedditConfigError
+from api.reddit.dm_sender import FAILED, PENDING, SENDING, SENT, DmLedger, DmSender
+from api.reddit.fake import FakeReddit
+from api.reddit.rate_limit import TokenBucket
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def sender(tmp_path, clock):
+    sender = DmSender(str(tmp_path / "dms.db"), limiter=TokenBucket(1000, 1000), workers=2)
+    sender._ledger = DmLedger(sender.ledger_path, max_attempts=3, retry_seconds=60, clock=clock)
+    return sender
+
+
+def digest_of(sender):
+    return sender.ledger._connection().execute("SELECT template_hash FROM dms LIMIT 1").fetchone()[0]
+
+
+def test_empty_outbox_does_not_build_a_client(sender, monkeypatch):
+    def no_client():
+        raise AssertionError("get_reddit() called with nothing to send")
+
+    monkeypatch.setattr(dm_sender_module, "get_reddit", no_client)
+    assert sender.drain() == {SENT: 0, FAILED: 0}
+
+
+def test_config_error_puts_claimed_rows_back(sender, monkeypatch):
+    def missing_credentials():
+        raise RedditConfigError("Missing required environment variables: REDDIT_CLIENT_ID")
+
+    monkeypatch.setattr(dm_sender_module, "get_reddit", missing_credentials)
+    sender.queue(["ngo_one"])
+    with pytest.raises(RedditConfigError):
+        sender.drain()
+    assert sender.ledger.counts()[PENDING] == 1
+    attempts = sender.ledger._connection().execute("SELECT attempts FROM dms").fetchone()[0]
+    assert attempts == 0
+
+
+def test_background_sender_stops_on_config_error(sender, monkeypatch):
+    def missing_credentials():
+        raise RedditConfigError("Missing required environment variables")
+
+    monkeypatch.setattr(dm_sender_module, "get_reddit", missing_credentials)
+    sender.queue(["ngo_one"])
+    sender.start()
+    sender._thread.join(5)
+    assert not sender._thread.is_alive()
+
+
+def test_each_recipient_gets_a_message_once(sender):
+    client = FakeReddit()
+    assert sender.queue(["NGO_One", "ngo_one", "ngo_two", ""]) == 2
+    assert sender.drain(client) == {SENT: 2, FAILED: 0}
+    assert sorted(name for name, _, _ in client.messages) == ["ngo_one", "ngo_two"]
+
+    # Queued again later, nothing new is sent
+    assert sender.queue(["ngo_one"]) == 0
+    assert sender.drain(client) == {SENT: 0, FAILED: 0}
+    assert sender.ledger.status("ngo_one", digest_of(sender)) == SENT
+
+
+def test_requests_for_a_pending_recipient_are_merged_into_one_dm(sender):
+    client = FakeReddit()
+    coats = {"details": "Winter coats", "target_groups": ["children"]}
+    formula = {"details": "Baby formula", "target_groups": ["mothers"]}
+
+    assert sender.queue(["ngo_one", "ngo_two"], coats) == 2
+    assert sender.queue(["ngo_one"], formula) == 1
+    # Already part of the pending DM
+    assert sender.queue(["ngo_one"], coats) == 0
+
+    assert sender.drain(client) == {SENT: 2, FAILED: 0}
+    messages = {name: message for name, _, message in client.messages}
+    assert "Winter coats" in messages["ngo_one"] and "Baby formula" in messages["ngo_one"]
+    assert "Baby formula" not in messages["ngo_two"]
+
+    # Once sent, the same template isn't sent to them again
+    assert sender.queue(["ngo_one"], {"details": "Blankets", "target_groups": []}) == 0
+
+
+def test_permanent_failure_is_not_retried(sender):
+    client = FakeReddit(missing_users={"ghost"})
+    sender.queue(["ghost"])
+    assert sender.drain(client) == {SENT: 0, FAILED: 1}
+    assert sender.ledger.status("ghost", digest_of(sender)) == FAILED
+
+
+def test_retryable_failure_waits_before_the_next_attempt(sender, clock):
+    class Flaky:
+        def __init__(self):
+            self.calls = 0
+
+        def message(self, subject, message):
+            self.calls += 1
+            raise RuntimeError("connection reset")
+
+    flaky = Flaky()
+    client = FakeReddit()
+    client.redditor = lambda name: flaky
+
+    sender.queue(["ngo_one"])
+    assert sender.drain(client) == {SENT: 0, FAILED: 1}
+    assert flaky.calls == 1
+    assert sender.ledger.counts()[PENDING] == 1
+    assert sender.ledger.next_due() == 60
+
+    # Not due yet: the same drain, or one right after, doesn't retry it
+    assert sender.drain(client) == {SENT: 0, FAILED: 0}
+    assert flaky.calls == 1
+
+    clock.now += 60
+    sender.drain(client)
+    assert flaky.calls == 2
+    # The second failure doubles the wait
+    assert sender.ledger.next_due() == 120
+
+    clock.now += 120
+    sender.drain(client)
+    assert flaky.calls == 3
+    assert sender.ledger.counts()[FAILED] == 1
+    assert sender.ledger.next_due() is None
+
+
+def test_recover_requeues_rows_left_sending(sender):
+    sender.queue(["ngo_one", "ngo_two"])
+    assert len(sender.ledger.claim(10)) == 2
+    assert sender.ledger.counts()[SENDING] == 2
+
+    assert sender.ledger.recover() == 2
+    assert sender.ledger.counts()[PENDING] == 2
+    assert sender.drain(FakeReddit()) == {SENT: 2, FAILED: 0}
@@ -0,0 +1,53 @@
+import string
+
+from api.reddit.templates import (
+    DM_SUBJECT_MAX_LENGTH, POST_TITLE_MAX_LENGTH, CompiledTemplate, join_groups, render_dm, render_post,
+)
+from api.reddit.text import AID_POST_TEXT, AID_POST_TITLE, POST_TEXT, POST_TITLE
+
+REQUEST = {"details": "  Winter coats for 40 children  ", "target_groups": ["families", "children"]}
+
+
+def test_compiled_template_renders_like_string_template():
+    source = "Hello $name, ${what} costs $$5"
+    values = {"name": "Amina", "what": "bread"}
+    template = CompiledTemplate(source)
+    assert template.render(values) == string.Template(source).substitute(values)
+    assert template.fill({"name": "Amina"}).render({"what": "bread"}) == string.Template(source).substitute(values)
+
+
+def test_render_post_fills_in_the_request():
+    title, text = render_post(REQUEST)
+    expected = {"details": "Winter coats for 40 children", "target_groups": "families, children"}
+    assert title == string.Template(AID_POST_TITLE).substitute(expected)
+    assert text == string.Template(AID_POST_TEXT).substitute(expected)
+    assert render_post() == (POST_TITLE, POST_TEXT)
+
+
+def test_long_group_lists_are_shortened_to_fit_titles_and_subjects():
+    request = {"details": "Tents", "target_groups": [f"group number {i}" for i in range(100)]}
+    title, _ = render_post(request)
+    subject, body = render_dm([request])
+
+    assert len(title) <= POST_TITLE_MAX_LENGTH
+    assert len(subject) <= DM_SUBJECT_MAX_LENGTH
+    assert "more" in title and "more" in subject
+    # The body has room for all of them
+    assert "group number 99" in body.render({"recipient": "ngo"})
+
+
+def test_join_groups():
+    assert join_groups([]) == "refugees"
+    assert join_groups(["a", "b", "c"]) == "a, b, c"
+    assert join_groups(["alpha", "beta", "gamma"], max_length=16) == "alpha and 2 more"
+    assert len(join_groups(["x" * 50, "y"], max_length=10)) <= 10
+
+
+def test_one_dm_covers_several_requests():
+    other = {"details": "Baby formula", "target_groups": ["children", "mothers"]}
+    subject, body = render_dm([REQUEST, other])
+    message = body.render({"recipient": "ngo_one"})
+
+    assert "Hello ngo_one" in message
+    assert "* Winter coats for 40 children" in message and "* Baby formula" in message
+    assert "families, children, mothers" in subject
@@ -31,7 +31,7 @@ DM_SUBJECT = "Urgent: Opportunities for Refugees - A Call to Action from Refugee
 
 
 DM_MESSAGE = """
-Hello [NGO Account Name/Organization Name],
+Hello ${recipient},
 
 This is RefugeeAidBot. Our purpose is to connect refugees on Reddit with crucial funding, grants, and job opportunities. We've identified your account as potentially relevant to humanitarian aid or non-profit work.
 
@@ -47,4 +47,59 @@ Thank you for your critical work and consideration.
 
 Best regards,
 RefugeeAidBot
-"""
\ No newline at end of file
+"""
+
+
+
+# Request-specific versions, rendered from the AidRequest fields by
+# templates.py: ${details}, ${target_groups} and, in DMs, ${recipient}
+
+AID_POST_TITLE = "Aid Request: Support Needed for ${target_groups} - Connecting Needs with Resources"
+
+
+AID_POST_TEXT = """
+Hello, fellow Redditors!
+
+This is a bot dedicated to helping refugees in need connect with vital funding, grants, and job opportunities. A new request for support has come in:
+
+**What is needed:**
+${details}
+
+**Who it is for:** ${target_groups}
+
+**For NGOs and Organizations:**
+If your organization offers grants, funding, or job placements that could meet this need, please consider sharing these opportunities publicly. You can:
+* Post directly in relevant subreddits (e.g., `r/humanitarian`, `r/grants`, `r/jobs`)
+* Provide a link to your organization's "opportunities" or "support" page in the comments.
+* Reach out to us via DM if you have a program you'd like to highlight.
+
+Thank you for your understanding and cooperation.
+
+---
+*This is an automated bot. Please direct questions or feedback to [link to your GitHub/contact info if applicable].*
+"""
+
+
+AID_DM_SUBJECT = "Urgent: Support Needed for ${target_groups} - A Call to Action from RefugeeAidBot"
+
+
+AID_DM_MESSAGE = """
+Hello ${recipient},
+
+This is RefugeeAidBot. Our purpose is to connect refugees on Reddit with crucial funding, grants, and job opportunities. We've identified your account as potentially relevant to the following request for support:
+
+${details}
+
+It concerns: ${target_groups}
+
+If your organization has programs, grants, or job opportunities that could help, we would be grateful if you could:
+
+* Share these opportunities on relevant Reddit communities.
+* Provide links to your official program pages.
+* Reply to this message so we can point those in need to you.
+
+Thank you for your critical work and consideration.
+
+Best regards,
+RefugeeAidBot
+"""
@@ -0,0 +1,99 @@
+# retrieval.py
+
+# BM25 retrieval over the FAQ keys. The knowledge base is compiled once into a
+# sparse (entries x vocabulary) CSR matrix of BM25 term weights, so scoring a
+# query against every entry is a single sparse matrix-vector product. The term
+# counts come from a CompiledFaq (kb_snapshot.py), so only the weights are
+# computed in each process when the index is built from a snapshot.
+
+import numpy as np
+from scipy import sparse
+
+from api.faq_index import FaqMatch, best_per_row, query_matrix, top_k_matches
+from api.kb_snapshot import compile_faq
+
+
+class Bm25Index:
+    """Precompiled BM25 matrix over the keys of a FAQ dict."""
+
+    def __init__(self, knowledge_base, preprocess, k1=1.5, b=0.75, min_score=0.0):
+        self._build(compile_faq(knowledge_base, preprocess), preprocess, k1, b, min_score)
+
+    @classmethod
+    def from_compiled(cls, compiled, preprocess, k1=1.5, b=0.75, min_score=0.0):
+        """Index over an already compiled (e.g. memory-mapped) knowledge base."""
+
+        index = cls.__new__(cls)
+        index._build(compiled, preprocess, k1, b, min_score)
+        return index
+
+    def _build(self, compiled, preprocess, k1, b, min_score):
+        self.preprocess = preprocess
+        self.min_score = min_score
+        self.compiled = compiled
+        self.keys = compiled.keys
+        self.answers = compiled.answers
+        self.vocabulary = compiled.vocabulary
+        self.matrix = self._bm25_weights(compiled.tf, k1, b)
+
+    @staticmethod
+    def _bm25_weights(tf, k1, b):
+        n_docs = tf.shape[0]
+        doc_freq = np.bincount(tf.indices, minlength=tf.shape[1])
+        idf = np.log1p((n_docs - doc_freq + 0.5) / (doc_freq + 0.5)).astype(np.float32)
+
+        doc_len = np.asarray(tf.sum(axis=1)).ravel()
+        avg_len = doc_len.mean() if n_docs else 0.0
+        norm = k1 * (1 - b + b * doc_len / (avg_len or 1.0))
+
+        # New data array over the same index arrays as tf
+        row_norm = np.repeat(norm, np.diff(tf.indptr)).astype(np.float32)
+        data = idf[tf.indices] * tf.data * (k1 + 1) / (tf.data + row_norm)
+        return sparse.csr_matrix((data, tf.indices, tf.indptr), shape=tf.shape, copy=False)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def query_vector(self, tokens):
+        """Dense query vector with a 1 for every known token."""
+
+        vector = np.zeros(len(self.vocabulary), dtype=np.float32)
+        term_ids = [self.vocabulary[token] for token in set(tokens) if token in self.vocabulary]
+        vector[term_ids] = 1.0
+        return vector
+
+    def scores(self, tokens):
+        """BM25 score of every FAQ entry for an already preprocessed list of tokens."""
+
+        return self.matrix @ self.query_vector(tokens)
+
+    def top_k_tokens(self, tokens, k=5):
+        scores = self.scores(tokens)
+        return self._top_k(scores, k)
+
+    def _top_k(self, scores, k):
+        return top_k_matches(scores, k, self.keys, self.answers, self.min_score)
+
+    def top_k(self, message, k=5):
+        """Returns up to k FaqMatch results scoring above min_score, best first."""
+
+        return self.top_k_tokens(self.preprocess(message).split(), k)
+
+    def match_tokens(self, tokens):
+        best = self.top_k_tokens(tokens, 1)
+        return best[0] if best else None
+
+    def match(self, message):
+        """Preprocesses a raw message and returns its best FaqMatch, or None."""
+
+        return self.match_tokens(self.preprocess(message).split())
+
+    def match_batch_tokens(self, token_lists):
+        """Best FaqMatch (or None) for each preprocessed query, scored in one sparse matrix product."""
+
+        scores = query_matrix(token_lists, self.vocabulary) @ self.matrix.T
+        return [
+            FaqMatch(self.keys[best[0]], self.answers[best[0]], best[1])
+            if best and best[1] > self.min_score else None
+            for best in best_per_row(scores)
+        ]
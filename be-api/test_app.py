@@ -0,0 +1,43 @@
+import pytest
+from nltk.corpus import wordnet
+
+from api import app
+
+try:
+    wordnet.ensure_loaded()
+except (LookupError, OSError):
+    pytest.skip("The WordNet corpus is not downloaded, see nltk_download.py", allow_module_level=True)
+
+MESSAGES = [
+    "What goes in the full name box of the registration form?",
+    "How do I apply for asylum?",
+    "Where can I get food?",
+    "How do I apply for asylum?",
+    "zebra quantum banana",
+    "  I feel lonely here  ",
+]
+
+
+@pytest.fixture
+def deterministic(monkeypatch):
+    # Without the model the generative tier would fall back anyway, only slower
+    monkeypatch.setattr(app.response_pipeline, "generation_enabled", False)
+
+
+def tier_delta(before, after):
+    return {tier: after[tier] - before[tier] for tier in after}
+
+
+@pytest.mark.parametrize("engine", ["overlap", "bm25"])
+def test_batch_answers_and_tiers_match_single_messages(deterministic, engine):
+    before = app.response_pipeline.tier_stats()
+    single = [app.generate_response(message, app.faq_data, engine=engine) for message in MESSAGES]
+    single_tiers = tier_delta(before, app.response_pipeline.tier_stats())
+
+    before = app.response_pipeline.tier_stats()
+    batch = app.generate_responses(MESSAGES, app.faq_data, engine=engine)
+    batch_tiers = tier_delta(before, app.response_pipeline.tier_stats())
+
+    assert [response for response, _ in batch] == single
+    assert batch_tiers == single_tiers
+    assert single_tiers[app.TIER_FORM_HELP] == 1
@@ -0,0 +1,76 @@
+import numpy as np
+
+from api.embeddings import EmbeddingCache, EmbeddingIndex
+
+WORDS = ["food", "clinic", "asylum", "school", "water", "documents"]
+
+
+class BagOfWordsEncoder:
+    """Unit vectors over a tiny fixed vocabulary, counting how often it encodes."""
+
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, batch_size=64):
+        self.encoded.extend(texts)
+        vectors = np.array([[text.split().count(word) for word in WORDS] for text in texts], dtype=np.float32)
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-9)
+
+    def encode_query(self, text):
+        return self.encode([text])[0]
+
+
+class ExactAnn:
+    """Answers knn_query like hnswlib's inner product space, by brute force."""
+
+    def __init__(self, matrix):
+        self.matrix = matrix
+        self.queries = 0
+
+    def knn_query(self, queries, k=1):
+        self.queries += 1
+        distances = 1.0 - np.atleast_2d(queries) @ self.matrix.T
+        labels = np.argsort(distances, axis=1)[:, :k]
+        return labels, np.take_along_axis(distances, labels, axis=1)
+
+
+KNOWLEDGE_BASE = {"food": "Food answer", "clinic": "Clinic answer", "asylum": "Asylum answer"}
+
+
+def test_cache_encodes_each_key_once_and_keeps_only_live_keys(tmp_path):
+    encoder = BagOfWordsEncoder()
+    cache = EmbeddingCache(str(tmp_path), "test/model")
+
+    cache.vectors(["food", "clinic"], encoder)
+    cache.vectors(["food", "clinic"], encoder)
+    assert encoder.encoded == ["food", "clinic"]
+
+    # "clinic" left the knowledge base; the rewrite for "school" drops it
+    vectors = cache.vectors(["food", "school"], encoder)
+    assert encoder.encoded == ["food", "clinic", "school"]
+    assert vectors.shape == (2, len(WORDS))
+    stored = np.load(cache.path)["hash"].tolist()
+    assert stored == [cache.content_hash("food"), cache.content_hash("school")]
+
+
+def test_match_batch_agrees_with_match(tmp_path):
+    index = EmbeddingIndex(KNOWLEDGE_BASE, BagOfWordsEncoder(), EmbeddingCache(str(tmp_path), "test/model"),
+                           min_score=0.1, ann_threshold=100)
+    messages = ["where is the clinic", "asylum asylum food", "nothing known"]
+
+    batch = index.match_batch(messages)
+
+    assert [m and m.key for m in batch] == [index.match(m) and index.match(m).key for m in messages]
+    assert [m and m.key for m in batch] == ["clinic", "asylum", None]
+
+
+def test_match_batch_uses_the_ann_index_when_there_is_one(tmp_path):
+    index = EmbeddingIndex(KNOWLEDGE_BASE, BagOfWordsEncoder(), EmbeddingCache(str(tmp_path), "test/model"),
+                           min_score=0.1, ann_threshold=100)
+    index.ann = ExactAnn(index.matrix)
+
+    batch = index.match_batch(["where is the clinic", "nothing known"])
+
+    assert index.ann.queries == 1
+    assert [m and m.key for m in batch] == ["clinic", None]
+    assert abs(batch[0].score - 1.0) < 1e-6
@@ -0,0 +1,73 @@
+import json
+import os
+import time
+
+import numpy as np
+
+from api.kb_snapshot import compile_faq, load_snapshot, read_faq_file, snapshot_for, write_snapshot
+
+FAQ = {
+    "How do I register?": "Go to the registration office.",
+    "Where can I get food?": "Food is handed out at the main tent.",
+    "I need a doctor": "The clinic is open every morning.",
+}
+
+
+def preprocess(text):
+    return " ".join(word.strip("?").lower() for word in text.split())
+
+
+def test_snapshot_round_trip(tmp_path):
+    compiled = compile_faq(FAQ, preprocess, source_hash="abc")
+    path = str(tmp_path / "faq.snap")
+    write_snapshot(compiled, path)
+    loaded = load_snapshot(path)
+
+    assert list(loaded.keys) == list(FAQ)
+    assert list(loaded.answers) == list(FAQ.values())
+    assert loaded.vocabulary == compiled.vocabulary
+    assert loaded.source_hash == "abc"
+    assert np.array_equal(loaded.tf.toarray(), compiled.tf.toarray())
+    assert np.array_equal(loaded.postings.toarray() > 0, compiled.postings.toarray() > 0)
+
+
+def test_read_faq_file_hashes_content(tmp_path):
+    path = tmp_path / "faq.json"
+    path.write_text(json.dumps(FAQ))
+    data, first_hash = read_faq_file(str(path))
+    assert data == FAQ
+
+    path.write_text(json.dumps({**FAQ, "Hi": "Hello!"}))
+    assert read_faq_file(str(path))[1] != first_hash
+
+
+def test_snapshot_is_reused_for_the_same_content_and_configuration(tmp_path):
+    calls = []
+
+    def counting_preprocess(text):
+        calls.append(text)
+        return preprocess(text)
+
+    first = snapshot_for(FAQ, "hash", str(tmp_path), counting_preprocess, "languages=en")
+    assert len(calls) == len(FAQ)
+    second = snapshot_for(FAQ, "hash", str(tmp_path), counting_preprocess, "languages=en")
+    assert len(calls) == len(FAQ)
+    assert first.path == second.path
+
+    # Another preprocessing configuration doesn't reuse tokens built under the first
+    third = snapshot_for(FAQ, "hash", str(tmp_path), counting_preprocess, "languages=en,fr")
+    assert len(calls) == 2 * len(FAQ)
+    assert third.path != first.path
+
+
+def test_old_snapshots_are_pruned(tmp_path):
+    paths = []
+    for i in range(5):
+        paths.append(snapshot_for(FAQ, f"hash{i}", str(tmp_path), preprocess).path)
+        # Distinct modification times, oldest first
+        os.utime(paths[-1], (time.time() - 100 + i, time.time() - 100 + i))
+
+    snapshot_for(FAQ, "hash0", str(tmp_path), preprocess)
+    remaining = sorted(name for name in os.listdir(tmp_path) if name.endswith(".snap"))
+    # The current one and the two most recently used others
+    assert remaining == sorted(os.path.basename(path) for path in (paths[0], paths[3], paths[4]))
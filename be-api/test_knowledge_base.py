@@ -0,0 +1,12 @@
+from api.knowledge_base import get_form_help
+
+
+def test_form_help_answers_registration_form_questions():
+    assert "Full Name" in get_form_help("What goes in the full name box of the registration form?")
+    assert "DD/MM/YYYY" in get_form_help("Which format for my DOB on the registration form?")
+    assert get_form_help("I need help with a form") == "Please tell me the name of the form you need help with."
+
+
+def test_form_help_returns_none_when_the_message_is_not_about_a_form():
+    assert get_form_help("Where can I find food?") is None
+
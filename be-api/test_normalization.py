@@ -0,0 +1,41 @@
+import pytest
+
+from api.normalization import DEFAULT_LANGUAGE, PROFILES, detect_language, english_profile, languages, register_language
+
+
+@pytest.fixture(autouse=True)
+def registered_languages():
+    saved = dict(languages)
+    languages.clear()
+    register_language(english_profile({"the", "a", "i", "is"}, lambda word: word))
+    for code in ("fr", "ar", "sw", "so"):
+        register_language(PROFILES[code]())
+    yield
+    languages.clear()
+    languages.update(saved)
+    detect_language.cache_clear()
+
+
+@pytest.mark.parametrize("text", [
+    "au pair job", "ah ok", "si", "ee", "oo", "hello", "I need help with the form",
+    # One marker word isn't enough, however short the message
+    "ninahitaji food", "waa", "je",
+])
+def test_english_is_the_default(text):
+    assert detect_language(text) == DEFAULT_LANGUAGE
+
+
+@pytest.mark.parametrize("text, code", [
+    ("J'ai besoin d'aide pour le logement", "fr"),
+    ("Je suis perdu, où est le bureau?", "fr"),
+    ("Ninahitaji msaada tafadhali", "sw"),
+    ("Waxaan u baahanahay caawimo fadlan", "so"),
+    ("أين مكتب التسجيل", "ar"),
+])
+def test_other_languages_need_two_markers(text, code):
+    assert detect_language(text) == code
+
+
+def test_english_wins_ties():
+    # One English and one French marker
+    assert detect_language("help pour") == DEFAULT_LANGUAGE
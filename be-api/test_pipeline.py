@@ -0,0 +1,65 @@
+import time
+
+from api.pipeline import TIER_FALLBACK, TIER_GENERATIVE, ResponsePipeline
+
+
+class NoMatch:
+    def match(self, message):
+        return None
+
+
+def make_pipeline(generator, budget_seconds=1.0):
+    return ResponsePipeline(
+        form_help=lambda message: None,
+        generator=generator,
+        persona_prompt="persona",
+        fallback_response="fallback",
+        budget_seconds=budget_seconds,
+    )
+
+
+def test_a_generated_reply_is_counted_as_generative():
+    pipeline = make_pipeline(lambda prompt, timeout: "generated")
+
+    result = pipeline.run("hello", NoMatch())
+
+    assert (result.response, result.tier, result.budget_exceeded) == ("generated", TIER_GENERATIVE, False)
+    assert pipeline.tier_stats()[TIER_GENERATIVE] == 1
+
+
+def test_a_failed_generation_is_an_error_not_a_budget_overrun():
+    def fail(prompt, timeout):
+        raise RuntimeError("model broke")
+
+    pipeline = make_pipeline(fail)
+
+    result = pipeline.run("hello", NoMatch())
+
+    assert (result.tier, result.budget_exceeded) == (TIER_FALLBACK, False)
+    stats = pipeline.tier_stats()
+    assert (stats["generation_errors"], stats["budget_exceeded"]) == (1, 0)
+
+
+def test_a_slow_generation_runs_out_of_budget():
+    def slow(prompt, timeout):
+        time.sleep(timeout + 0.2)
+        return "too late"
+
+    pipeline = make_pipeline(slow, budget_seconds=0.05)
+
+    result = pipeline.run("hello", NoMatch())
+
+    assert (result.tier, result.budget_exceeded) == (TIER_FALLBACK, True)
+    stats = pipeline.tier_stats()
+    assert (stats["generation_errors"], stats["budget_exceeded"]) == (0, 1)
+
+
+def test_streamed_replies_are_recorded_the_same_way():
+    pipeline = make_pipeline(lambda prompt, timeout: None)
+    fallback = pipeline._deterministic(None)
+
+    pipeline.record(fallback, error=True)
+    pipeline.record(fallback._replace(budget_exceeded=True))
+
+    stats = pipeline.tier_stats()
+    assert (stats[TIER_FALLBACK], stats["generation_errors"], stats["budget_exceeded"]) == (2, 1, 1)
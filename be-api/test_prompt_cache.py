@@ -0,0 +1,79 @@
+import re
+import threading
+
+from api.prompt_cache import PromptPrefixCache
+
+PERSONA = "You are a helpful assistant.\n\n"
+
+
+class WordTokenizer:
+    """Splits like a byte-level BPE pre-tokenizer: words keep one leading space,
+    other whitespace runs are tokens of their own."""
+
+    eos_token_id = 0
+
+    def __init__(self, leading_space=False):
+        self.leading_space = leading_space
+        self.vocab = {}
+        self.calls = 0
+
+    def __call__(self, text, add_special_tokens=True):
+        self.calls += 1
+        if self.leading_space and not text.startswith(" "):
+            text = " " + text
+        pieces = re.findall(r" ?\w+| ?[^\s\w]+|\s+", text)
+        return {"input_ids": [self.vocab.setdefault(piece, len(self.vocab) + 1) for piece in pieces]}
+
+
+def full_ids(tokenizer, prompt):
+    return tokenizer(prompt, add_special_tokens=False)["input_ids"] + [tokenizer.eos_token_id]
+
+
+def test_cached_prefix_ids_match_tokenizing_the_whole_prompt():
+    tokenizer = WordTokenizer()
+    cache = PromptPrefixCache([PERSONA])
+
+    for tail in ["Where is the clinic?", "I lost my papers.\nWhat now?"]:
+        prompt = PERSONA + tail
+        assert cache.token_ids(tokenizer, prompt, 512) == full_ids(tokenizer, prompt)
+
+    assert cache.stats() == {"hits": 2, "misses": 0, "prefixes": 1}
+
+
+def test_a_prefix_that_does_not_join_cleanly_is_not_cached():
+    tokenizer = WordTokenizer(leading_space=True)
+    cache = PromptPrefixCache([PERSONA])
+
+    for tail in ["Where is the clinic?", "Is there food?"]:
+        prompt = PERSONA + tail
+        assert cache.token_ids(tokenizer, prompt, 512) == full_ids(tokenizer, prompt)
+
+    assert cache.stats() == {"hits": 0, "misses": 2, "prefixes": 0}
+
+
+def test_long_prompts_keep_the_end_of_the_conversation():
+    tokenizer = WordTokenizer()
+    cache = PromptPrefixCache([PERSONA])
+    prompt = PERSONA + "one two three"
+
+    ids = cache.token_ids(tokenizer, prompt, 4)
+
+    assert ids == full_ids(tokenizer, prompt)[-4:]
+
+
+def test_counters_are_exact_under_concurrency():
+    tokenizer = WordTokenizer()
+    cache = PromptPrefixCache([PERSONA])
+
+    def ask():
+        for _ in range(200):
+            cache.token_ids(tokenizer, PERSONA + "hello", 512)
+            cache.token_ids(tokenizer, "no persona", 512)
+
+    threads = [threading.Thread(target=ask) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert cache.stats() == {"hits": 1600, "misses": 1600, "prefixes": 1}
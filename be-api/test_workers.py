@@ -0,0 +1,57 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from api.workers import BoundedExecutor, QueueFullError
+
+
+def test_a_cancelled_caller_keeps_its_slot_until_the_job_finishes():
+    pool = BoundedExecutor(ThreadPoolExecutor(max_workers=1), max_pending=1, name="test")
+    started, finish = threading.Event(), threading.Event()
+
+    def job():
+        started.set()
+        finish.wait(5)
+        return "done"
+
+    async def scenario():
+        task = asyncio.create_task(pool.run(job))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        # The job is still running, so the pool is still full
+        assert pool.depth == 1
+        with pytest.raises(QueueFullError):
+            await pool.run(job)
+
+        finish.set()
+        for _ in range(100):
+            if pool.depth == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert pool.depth == 0
+        assert await pool.run(lambda: 42) == 42
+
+    asyncio.run(scenario())
+    assert pool.stats()["rejected"] == 1
+    pool.shutdown()
+
+
+def test_run_returns_results_and_raises_errors():
+    pool = BoundedExecutor(ThreadPoolExecutor(max_workers=2), max_pending=2, name="test")
+
+    def fail():
+        raise ValueError("bad message")
+
+    async def scenario():
+        assert await pool.run(lambda a, b=0: a + b, 1, b=2) == 3
+        with pytest.raises(ValueError):
+            await pool.run(fail)
+
+    asyncio.run(scenario())
+    assert pool.depth == 0
+    pool.shutdown()
@@ -0,0 +1,102 @@
+# workers.py
+
+# Bounded worker pools that keep CPU-bound chat work off the FastAPI event loop.
+#   chat_pool: threads, for the response pipeline (torch releases the GIL)
+#   nlp_pool:  processes, for pure-Python NLTK preprocessing (optional)
+#   stream_pool: threads, one per streamed generation in flight
+# Each pool caps how many jobs may be queued or running at once. When it is
+# full, QueueFullError is raised straight away so the API can answer 503
+# instead of letting requests pile up behind a busy worker.
+
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from api.general_config import CHAT_QUEUE_MAX, CHAT_THREAD_WORKERS, NLP_PROCESS_WORKERS, STREAM_WORKERS
+
+
+class QueueFullError(RuntimeError):
+    """Raised when a pool already holds its maximum number of pending jobs."""
+
+
+class BoundedExecutor:
+    """Runs functions on an executor from async code, with a limit on pending jobs."""
+
+    def __init__(self, executor, max_pending, name):
+        self.executor = executor
+        self.max_pending = max_pending
+        self.name = name
+        self._pending = 0
+        self._rejected = 0
+        self._lock = threading.Lock()
+
+    @property
+    def depth(self):
+        """Jobs currently queued or running."""
+        return self._pending
+
+    def _acquire(self):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                raise QueueFullError(f"The {self.name} queue is full ({self.max_pending} pending jobs)")
+            self._pending += 1
+
+    def _release(self, *_):
+        with self._lock:
+            self._pending -= 1
+
+    async def run(self, fn, *args, **kwargs):
+        # The slot is freed when the job finishes, not when the caller stops
+        # waiting: a cancelled request's job may still be running
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def submit(self, fn, *args, **kwargs):
+        """Fire-and-forget variant of run() for background jobs; returns a concurrent Future."""
+
+        self._acquire()
+        try:
+            future = self.executor.submit(fn, *args, **kwargs)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def stats(self):
+        return {"depth": self._pending, "max_pending": self.max_pending, "rejected": self._rejected}
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+chat_pool = BoundedExecutor(
+    ThreadPoolExecutor(max_workers=CHAT_THREAD_WORKERS, thread_name_prefix="chat"),
+    max_pending=CHAT_QUEUE_MAX,
+    name="chat",
+)
+
+# Preprocessing only moves to separate processes when NLP_PROCESS_WORKERS > 0;
+# otherwise it runs inside the chat pool's threads
+nlp_pool = BoundedExecutor(
+    ProcessPoolExecutor(max_workers=NLP_PROCESS_WORKERS),
+    max_pending=CHAT_QUEUE_MAX,
+    name="nlp",
+) if NLP_PROCESS_WORKERS > 0 else None
+
+# Streamed generations hold a thread for their whole length, so there is no
+# queue: once STREAM_WORKERS streams are running, new ones are refused
+stream_pool = BoundedExecutor(
+    ThreadPoolExecutor(max_workers=STREAM_WORKERS, thread_name_prefix="stream"),
+    max_pending=STREAM_WORKERS,
+    name="stream",
+)
+
+
+def worker_stats():
+    """Queue depth and rejection counts for every pool."""
+
+    stats = {"chat": chat_pool.stats(), "stream": stream_pool.stats()}
+    if nlp_pool is not None:
+        stats["nlp"] = nlp_pool.stats()
+    return stats
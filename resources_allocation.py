@@ -3,6 +3,7 @@ import numpy as np
 from datetime import datetime, timedelta
 import uuid
 from prophet import Prophet
+from storage import write_table
 
 # Function to simulate camp resource and demographic data
 def simulate_camp_data(num_camps=10, days=180, start_date='2025-01-01'):
@@ -146,5 +147,8 @@ if depletion_date and depletion_date < pd.Timestamp('2025-07-01') + timedelta(da
     print(f"Alert: {resource_type} depletion predicted on {depletion_date} for Camp {camp_id}")
     print(f"Notify NGOs: {relevant_ngos['NGO Name'].tolist()}")
 
-# Save simulated data to CSV
-data.to_csv('simulated_camp_resource_data.csv', index=False)
\ No newline at end of file
+# Save simulated data as a Parquet dataset partitioned by camp and month (see storage.py)
+write_table(
+    data, 'simulated_camp_resource_data', camp_column='Camp_ID', date_column='Date',
+    categorical=['Camp_ID', 'Country', 'Resource_Type']
+)
\ No newline at end of file
@@ -0,0 +1,117 @@
+# storage.py
+
+# Columnar storage for the feedback and simulated camp datasets, shared by
+# RefugeeCampSentimentAnalysis.py, resources_allocation.py and the feedback app.
+# A table is written as a Parquet dataset partitioned by camp and date
+# (hive layout: <path>/camp=<id>/date=<YYYY-MM>/part-0.parquet), with the
+# string categoricals dictionary-encoded. Readers project columns and push
+# camp/date filters down to the partition directories and any other filter
+# down to the Parquet row groups, so a dashboard loads only the columns and
+# camps it needs instead of re-parsing a whole CSV with type inference.
+#
+# Needs pandas and pyarrow.
+
+import json
+import os
+import shutil
+import uuid
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+PARTITIONING = ds.partitioning(pa.schema([('camp', pa.string()), ('date', pa.string())]), flavor='hive')
+CAMP_ONLY_PARTITIONING = ds.partitioning(pa.schema([('camp', pa.string())]), flavor='hive')
+DATE_FORMATS = {'day': '%Y-%m-%d', 'month': '%Y-%m'}
+
+# Written next to the partitions; files starting with "_" are skipped by dataset discovery
+LAYOUT_FILE = '_layout.json'
+
+
+def write_table(df, path, camp_column, date_column=None, categorical=(), date_partition='month', mode='overwrite'):
+    """Writes df as a Parquet dataset under path, partitioned by camp_column and,
+    when given, date_column (per day or month, see DATE_FORMATS).
+
+    Columns in `categorical` are stored dictionary-encoded. mode 'overwrite'
+    replaces the dataset; 'append' adds new files next to the existing ones."""
+
+    if mode not in ('overwrite', 'append'):
+        raise ValueError(f"Unknown write mode '{mode}'. Choose 'overwrite' or 'append'")
+    if date_partition not in DATE_FORMATS:
+        raise ValueError(f"Unknown date partition '{date_partition}'. Choose 'day' or 'month'")
+
+    df = df.copy()
+    for column in categorical:
+        df[column] = df[column].astype('category')
+    df['camp'] = df[camp_column].astype(str).where(df[camp_column].notna(), 'unknown')
+    if date_column is not None:
+        df[date_column] = pd.to_datetime(df[date_column])
+        df['date'] = df[date_column].dt.strftime(DATE_FORMATS[date_partition]).fillna('unknown')
+
+    # Only a directory this module wrote (it has the layout file) is ever removed
+    if mode == 'overwrite' and os.path.exists(os.path.join(path, LAYOUT_FILE)):
+        shutil.rmtree(path)
+    os.makedirs(path, exist_ok=True)
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    ds.write_dataset(
+        table.replace_schema_metadata(None),
+        path,
+        format='parquet',
+        partitioning=PARTITIONING if date_column is not None else CAMP_ONLY_PARTITIONING,
+        # A fresh name per write, so appends never clobber earlier files
+        basename_template=f'part-{uuid.uuid4().hex[:8]}-{{i}}.parquet',
+        existing_data_behavior='overwrite_or_ignore',
+    )
+    with open(os.path.join(path, LAYOUT_FILE), 'w') as file:
+        json.dump({'camp_column': camp_column, 'date_column': date_column, 'date_partition': date_partition}, file)
+
+
+def read_layout(path):
+    with open(os.path.join(path, LAYOUT_FILE)) as file:
+        return json.load(file)
+
+
+def read_table(path, columns=None, camps=None, since=None, until=None, filter=None):
+    """Reads a dataset written by write_table into a DataFrame.
+
+    columns: the columns to load (all by default).
+    camps: only these camps; since/until: only rows with since <= date < until.
+    Both prune whole partitions before any file is opened. filter is an extra
+    pyarrow.dataset expression, e.g. ds.field('Sentiment') == 'Negative',
+    checked against the Parquet row group statistics."""
+
+    layout = read_layout(path)
+    date_column = layout['date_column']
+    dataset = ds.dataset(
+        path, format='parquet',
+        partitioning=PARTITIONING if date_column is not None else CAMP_ONLY_PARTITIONING,
+    )
+
+    conditions = []
+    if camps is not None:
+        conditions.append(ds.field('camp').isin([str(camp) for camp in camps]))
+    if since is not None or until is not None:
+        if date_column is None:
+            raise ValueError(f'{path} has no date column to filter on')
+        date_format = DATE_FORMATS[layout['date_partition']]
+        date_type = dataset.schema.field(date_column).type
+        if since is not None:
+            since = pd.Timestamp(since)
+            conditions.append(ds.field('date') >= since.strftime(date_format))
+            conditions.append(ds.field(date_column) >= pa.scalar(since.to_pydatetime(), type=date_type))
+        if until is not None:
+            until = pd.Timestamp(until)
+            conditions.append(ds.field('date') <= until.strftime(date_format))
+            conditions.append(ds.field(date_column) < pa.scalar(until.to_pydatetime(), type=date_type))
+    if filter is not None:
+        conditions.append(filter)
+
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+
+    # The partition keys only exist for pruning; they are returned only when asked for
+    if columns is None:
+        columns = [name for name in dataset.schema.names if name not in ('camp', 'date')]
+    return dataset.to_table(columns=list(columns), filter=expression).to_pandas()
@@ -0,0 +1,62 @@
+import os
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("pyarrow")
+
+import pyarrow.dataset as ds
+
+from storage import read_layout, read_table, write_table
+
+
+def feedback_frame():
+    return pd.DataFrame({
+        'Camp ID': ['a', 'a', 'b', 'c'],
+        'Timestamp': pd.to_datetime(['2025-01-05', '2025-02-10', '2025-01-20', '2025-03-01']),
+        'Sentiment': ['Negative', 'Positive', 'Negative', 'Neutral'],
+        'Score': [1, 2, 3, 4],
+    })
+
+
+def test_round_trip_keeps_rows_and_categoricals(tmp_path):
+    path = str(tmp_path / 'feedback')
+    write_table(feedback_frame(), path, camp_column='Camp ID', date_column='Timestamp', categorical=['Sentiment'])
+
+    table = read_table(path).sort_values('Score').reset_index(drop=True)
+
+    assert list(table['Score']) == [1, 2, 3, 4]
+    assert list(table['Camp ID']) == ['a', 'a', 'b', 'c']
+    assert str(table['Sentiment'].dtype) == 'category'
+    assert 'camp' not in table.columns and 'date' not in table.columns
+    assert read_layout(path)['date_partition'] == 'month'
+
+
+def test_reads_are_pruned_by_camp_date_and_columns(tmp_path):
+    path = str(tmp_path / 'feedback')
+    write_table(feedback_frame(), path, camp_column='Camp ID', date_column='Timestamp')
+
+    assert sorted(os.listdir(os.path.join(path, 'camp=a'))) == ['date=2025-01', 'date=2025-02']
+
+    by_camp = read_table(path, columns=['Score'], camps=['a'])
+    assert list(by_camp.columns) == ['Score']
+    assert sorted(by_camp['Score']) == [1, 2]
+
+    by_date = read_table(path, columns=['Score'], since='2025-01-10', until='2025-03-01')
+    assert sorted(by_date['Score']) == [2, 3]
+
+    negative = read_table(path, columns=['Score'], filter=ds.field('Sentiment') == 'Negative')
+    assert sorted(negative['Score']) == [1, 3]
+
+
+def test_append_adds_files_and_overwrite_replaces_them(tmp_path):
+    path = str(tmp_path / 'feedback')
+    write_table(feedback_frame(), path, camp_column='Camp ID')
+    write_table(feedback_frame(), path, camp_column='Camp ID', mode='append')
+    assert len(read_table(path)) == 8
+
+    write_table(feedback_frame(), path, camp_column='Camp ID')
+    assert len(read_table(path)) == 4
+
+    with pytest.raises(ValueError):
+        read_table(path, since='2025-01-01')